@@ -0,0 +1,153 @@
+"""Async serving of the API under an ASGI server.
+
+Django 3.0 has neither async views nor an async ORM, so the request
+itself still runs in a worker thread. The event loop reads requests and
+writes responses, so a slow client no longer holds a worker, and
+listings run their page query and their count query at the same time in
+separate threads.
+"""
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.handlers import asgi
+from django.db import close_old_connections, connections
+
+# Execute wrappers of the request, put again on the connections of the
+# worker threads its queries run in.
+query_wrappers = contextvars.ContextVar('query_wrappers', default=())
+
+
+class ASGIHandler(asgi.ASGIHandler):
+    """Give every request a worker thread of its own.
+
+    Newer asgiref versions run sync code in a single shared thread by
+    default, which would serve one request at a time.
+    """
+
+    async def get_response(self, request):
+        return await sync_to_async(
+            self.get_response_in_thread, thread_sensitive=False
+        )(request)
+
+    def get_response_in_thread(self, request):
+        try:
+            return super().get_response(request)
+        finally:
+            # request_finished runs in another thread under ASGI, so the
+            # connection of this one is released here.
+            close_old_connections()
+
+    async def send_response(self, response, send):
+        """Send streaming content read in a worker thread.
+
+        Streaming content, e.g. the catalog export, queries the database
+        as it is iterated, which the event loop may not do. One thread
+        reads all of it, as its cursors belong to the connection of that
+        thread.
+        """
+        if not response.streaming:
+            return await super().send_response(response, send)
+        executor = ThreadPoolExecutor(max_workers=1)
+
+        def in_thread(function):
+            return sync_to_async(function, thread_sensitive=False,
+                                 executor=executor)
+        try:
+            await send({
+                'type': 'http.response.start',
+                'status': response.status_code,
+                'headers': response_headers(response),
+            })
+            parts = iter(response)
+            while True:
+                part = await in_thread(next)(parts, None)
+                if part is None:
+                    break
+                for chunk, _ in self.chunk_bytes(part):
+                    await send({'type': 'http.response.body',
+                                'body': chunk, 'more_body': True})
+            await send({'type': 'http.response.body'})
+        finally:
+            await in_thread(close_streaming)(response)
+            executor.shutdown(wait=False)
+
+
+def response_headers(response):
+    """Headers and cookies of a response as ASGI sends them."""
+    headers = []
+    for header, value in response.items():
+        if isinstance(header, str):
+            header = header.encode('ascii')
+        if isinstance(value, str):
+            value = value.encode('latin1')
+        headers.append((bytes(header), bytes(value)))
+    for cookie in response.cookies.values():
+        headers.append(
+            (b'Set-Cookie', cookie.output(header='').encode('ascii').strip())
+        )
+    return headers
+
+
+def close_streaming(response):
+    response.close()
+    close_old_connections()
+
+
+def _wrapped_connections(wrappers):
+    stack = ExitStack()
+    for alias in connections:
+        for wrapper in wrappers:
+            stack.enter_context(connections[alias].execute_wrapper(wrapper))
+    return stack
+
+
+@contextmanager
+def wrap_queries(wrapper):
+    """Run the queries of the block, in this thread and in the workers
+    of run_concurrently, through an execute wrapper."""
+    token = query_wrappers.set(query_wrappers.get() + (wrapper,))
+    try:
+        with _wrapped_connections((wrapper,)):
+            yield
+    finally:
+        query_wrappers.reset(token)
+
+
+def is_async_request(request):
+    return isinstance(getattr(request, '_request', request),
+                      asgi.ASGIRequest)
+
+
+def _in_worker(function):
+    # Each call sees the context of the request, e.g. the replica it
+    # reads from, and leaves the connection of its thread as a request
+    # would.
+    context = contextvars.copy_context()
+
+    def run():
+        try:
+            return context.run(_with_query_wrappers, function)
+        finally:
+            close_old_connections()
+    return sync_to_async(run, thread_sensitive=False)
+
+
+def _with_query_wrappers(function):
+    with _wrapped_connections(query_wrappers.get()):
+        return function()
+
+
+def run_concurrently(*functions):
+    """Call the functions in worker threads at once, results in order.
+
+    Called from a request thread of an ASGI server; the waiting happens
+    on the event loop of the server.
+    """
+    async def gather():
+        return await asyncio.gather(
+            *(_in_worker(function)() for function in functions)
+        )
+    return async_to_sync(gather)()
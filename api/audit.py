@@ -0,0 +1,112 @@
+import logging
+import os
+import re
+import threading
+import time
+import traceback
+from collections import Counter
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+IN_LIST_RE = re.compile(r'\bIN \((?:\s*(?:%s|\?)\s*,?)+\)', re.IGNORECASE)
+SPACES_RE = re.compile(r'\s+')
+
+PROJECT_DIR = os.path.join(settings.BASE_DIR, '')
+
+
+def fingerprint(sql):
+    """The SQL of a query with literals and IN lists replaced.
+
+    Queries differing only in parameters get the same fingerprint.
+    """
+    sql = STRING_RE.sub('?', sql)
+    sql = NUMBER_RE.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = IN_LIST_RE.sub('IN (...)', sql)
+    return SPACES_RE.sub(' ', sql).strip()
+
+
+def stack_excerpt(depth=None):
+    """The innermost frames of project code, outside the libraries."""
+    depth = depth or settings.QUERY_AUDIT_STACK_DEPTH
+    frames = [
+        frame for frame in traceback.extract_stack()[:-2]
+        if frame.filename.startswith(PROJECT_DIR)
+        and 'site-packages' not in frame.filename
+        and frame.filename != __file__
+    ]
+    return ''.join(traceback.format_list(frames[-depth:]))
+
+
+class QueryAuditor:
+    """connection.execute_wrapper finding repeated and slow queries.
+
+    Stacks are taken only for flagged queries: when a fingerprint
+    reaches the duplicate threshold and when a query is over budget.
+    """
+
+    def __init__(self, duplicate_threshold=None, slow_ms=None):
+        self.duplicate_threshold = (
+            duplicate_threshold or settings.QUERY_AUDIT_DUPLICATE_THRESHOLD
+        )
+        self.slow_ms = slow_ms or settings.QUERY_AUDIT_SLOW_MS
+        self.counts = Counter()
+        self.duplicate_stacks = {}
+        self.slow = []
+        # Queries of one request may run in several threads under ASGI.
+        self.lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        key = fingerprint(sql)
+        with self.lock:
+            self.counts[key] += 1
+            duplicate = self.counts[key] == self.duplicate_threshold
+        if duplicate:
+            self.duplicate_stacks[key] = stack_excerpt()
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            if elapsed >= self.slow_ms:
+                self.slow.append((elapsed, key, stack_excerpt()))
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    @property
+    def duplicates(self):
+        """(count, fingerprint, stack) of queries over the threshold."""
+        return [
+            (self.counts[key], key, stack)
+            for key, stack in self.duplicate_stacks.items()
+        ]
+
+    def log(self, view_name):
+        for count, key, stack in self.duplicates:
+            logger.warning(
+                'Query repeated %s times in %s: %s\n%s',
+                count, view_name, key, stack,
+            )
+        for elapsed, key, stack in self.slow:
+            logger.warning(
+                'Slow query (%.1f ms) in %s: %s\n%s',
+                elapsed, view_name, key, stack,
+            )
+
+    def report(self):
+        lines = [f'{self.total} queries']
+        lines.extend(
+            f'x{count} {key}\n{stack}'
+            for count, key, stack in self.duplicates
+        )
+        lines.extend(
+            f'{elapsed:.1f} ms {key}\n{stack}'
+            for elapsed, key, stack in self.slow
+        )
+        return '\n'.join(lines)
@@ -0,0 +1,86 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (AuthenticationFailed,
+                                                 InvalidToken)
+from rest_framework_simplejwt.settings import api_settings
+
+User = get_user_model()
+
+USER_STATE_KEY = 'auth:user:{pk}'
+# What permissions and views read from request.user; the other fields
+# are deferred and loaded on first access.
+STATE_FIELDS = (
+    'id', 'username', 'email', 'role', 'is_staff', 'is_superuser',
+    'is_active',
+)
+ROLE_CLAIMS = ('role', 'is_staff', 'is_superuser')
+
+
+def add_role_claims(token, user):
+    """Put the role of the user into a token for its clients.
+
+    The server itself checks the current role, so a changed role takes
+    effect before the token expires.
+    """
+    for claim in ROLE_CLAIMS:
+        token[claim] = getattr(user, claim)
+    return token
+
+
+def forget_user(pk):
+    cache.delete(USER_STATE_KEY.format(pk=pk))
+
+
+def user_state(pk):
+    """Values of STATE_FIELDS of a user, cached for a short time."""
+    key = USER_STATE_KEY.format(pk=pk)
+    state = cache.get(key)
+    if state is None:
+        state = (User.objects
+                 .filter(pk=pk)
+                 .values_list(*STATE_FIELDS)
+                 .first())
+        if state is None:
+            return None
+        cache.set(key, state, settings.AUTH_USER_CACHE_TIMEOUT)
+    return state
+
+
+def user_from_state(state, using='default'):
+    """A user loaded with STATE_FIELDS only, as if by .only()."""
+    values = dict(zip(STATE_FIELDS, state))
+    names = [
+        field.attname for field in User._meta.concrete_fields
+        if field.attname in values
+    ]
+    return User.from_db(using, names, [values[name] for name in names])
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWT authentication resolving users from the cache.
+
+    Entries live AUTH_USER_CACHE_TIMEOUT seconds and are dropped when a
+    user is saved or deleted, so only cold requests query the database.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _('Token contained no recognizable user identification')
+            )
+        state = user_state(user_id)
+        if state is None:
+            raise AuthenticationFailed(
+                _('User not found'), code='user_not_found'
+            )
+        user = user_from_state(state)
+        if not user.is_active:
+            raise AuthenticationFailed(
+                _('User is inactive'), code='user_inactive'
+            )
+        return user
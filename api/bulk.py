@@ -0,0 +1,263 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import connections, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.relations import ManyRelatedField
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.validators import UniqueValidator
+
+from titles.signals import post_bulk_save
+
+from .serializers import SlugLookupField
+
+NOT_A_LIST_ERROR = 'Expected a list of at most {limit} items.'
+REPEATED_ERROR = 'Repeated in the batch.'
+NOT_FOUND_ERROR = 'Not found.'
+
+
+def _slug_fields(serializer):
+    """(name, SlugLookupField) pairs of single and many relations."""
+    for name, field in serializer.fields.items():
+        if isinstance(field, ManyRelatedField):
+            field = field.child_relation
+        if isinstance(field, SlugLookupField) and not field.read_only:
+            yield name, field
+
+
+def resolve_slugs(serializer, items):
+    """Load the objects of every slug in the batch, one query per field."""
+    resolved = {}
+    for name, field in _slug_fields(serializer):
+        slugs = set()
+        for item in items:
+            value = item.get(name) if isinstance(item, dict) else None
+            for slug in value if isinstance(value, list) else [value]:
+                if isinstance(slug, (str, int)):
+                    slugs.add(str(slug))
+        resolved[name] = {
+            str(getattr(obj, field.slug_field)): obj
+            for obj in field.get_queryset().filter(
+                **{f'{field.slug_field}__in': slugs}
+            )
+        }
+    return resolved
+
+
+def _take_unique_validators(serializer):
+    """Remove the UniqueValidators, one query per item each; return them
+    by field to check the batch as a whole instead."""
+    taken = {}
+    for name, field in serializer.fields.items():
+        unique = [validator for validator in field.validators
+                  if isinstance(validator, UniqueValidator)]
+        if unique:
+            field.validators = [validator for validator in field.validators
+                                if validator not in unique]
+            taken[name] = unique[0]
+    return taken
+
+
+class BulkUpsertMixin:
+    """Create or update a list of objects with one POST to ``bulk/``.
+
+    An item whose ``bulk_lookup`` value names an existing object updates
+    it, other items are created. The batch is validated as a whole with
+    related slugs resolved in one query per field; an invalid item
+    rejects the batch and errors are returned at the item positions.
+    Valid batches are written in one transaction with bulk queries, and
+    ``post_bulk_save`` replaces the skipped ``post_save`` signals.
+    """
+    bulk_lookup = None
+
+    def get_bulk_lookup(self):
+        return self.bulk_lookup or self.lookup_field
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request, *args, **kwargs):
+        items = request.data
+        limit = settings.BULK_MAX_ITEMS
+        if not isinstance(items, list) or not 0 < len(items) <= limit:
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    NOT_A_LIST_ERROR.format(limit=limit)
+                ],
+            })
+        serializers = self.validate_bulk(items)
+        with transaction.atomic():
+            results = self.perform_bulk_write(serializers)
+        return Response(results, status=status.HTTP_200_OK)
+
+    def bulk_key(self, model, item):
+        """The lookup value of an item, None for an item to create.
+
+        A value the lookup field can't parse raises a Django
+        ValidationError.
+        """
+        lookup = self.get_bulk_lookup()
+        value = item.get(lookup) if isinstance(item, dict) else None
+        if value is None:
+            return None
+        return model._meta.get_field(lookup).to_python(value)
+
+    def bulk_keys(self, model, items):
+        """Lookup values of the items and the errors of invalid ones."""
+        keys, errors = [], []
+        for item in items:
+            try:
+                keys.append(self.bulk_key(model, item))
+                errors.append([])
+            except DjangoValidationError as error:
+                keys.append(None)
+                errors.append(error.messages)
+        return keys, errors
+
+    def validate_bulk(self, items):
+        serializer_class = self.get_serializer_class()
+        model = serializer_class.Meta.model
+        lookup = self.get_bulk_lookup()
+        keys, key_errors = self.bulk_keys(model, items)
+        existing = model.objects.in_bulk(
+            {key for key in keys if key is not None}, field_name=lookup
+        )
+        context = self.get_serializer_context()
+        context['resolved_slugs'] = resolve_slugs(
+            serializer_class(context=context), items
+        )
+        by_pk = model._meta.get_field(lookup).primary_key
+
+        serializers, errors, seen = [], [], set()
+        for key, key_error, item in zip(keys, key_errors, items):
+            serializer = serializer_class(
+                instance=existing.get(key), data=item, context=context
+            )
+            unique = _take_unique_validators(serializer)
+            item_errors = {}
+            if not serializer.is_valid():
+                item_errors = dict(serializer.errors)
+            if key_error:
+                item_errors[lookup] = key_error
+            elif key is not None and key in seen:
+                item_errors.setdefault(lookup, []).append(REPEATED_ERROR)
+            elif by_pk and key is not None and key not in existing:
+                item_errors.setdefault(lookup, []).append(NOT_FOUND_ERROR)
+            seen.add(key)
+            serializers.append(serializer)
+            errors.append(item_errors)
+        # Items share their fields, so the validators of the last one do.
+        for name, validator in unique.items():
+            if name != lookup:
+                self.check_unique(model, name, validator, serializers, errors)
+        if any(errors):
+            raise ValidationError(errors)
+        return serializers
+
+    def check_unique(self, model, name, validator, serializers, errors):
+        """Report values of a unique field repeated in the batch or taken
+        by other objects, with one query."""
+        source = serializers[0].fields[name].source
+        values = {}
+        for position, serializer in enumerate(serializers):
+            if errors[position] or source not in serializer.validated_data:
+                continue
+            value = serializer.validated_data[source]
+            if value in values:
+                errors[position][name] = [REPEATED_ERROR]
+            values.setdefault(value, position)
+        owners = dict(model.objects.filter(
+            **{f'{source}__in': list(values)}
+        ).values_list(source, 'pk'))
+        for value, position in values.items():
+            instance = serializers[position].instance
+            if value in owners and (instance is None
+                                    or owners[value] != instance.pk):
+                errors[position][name] = [str(validator.message)]
+
+    def perform_bulk_write(self, serializers):
+        model = self.get_serializer_class().Meta.model
+        many_to_many = [field.name for field in model._meta.many_to_many]
+        created, updated, relations, fields = [], [], [], set()
+        need_pks = False
+        for serializer in serializers:
+            data = dict(serializer.validated_data)
+            related = {
+                name: data.pop(name) for name in many_to_many if name in data
+            }
+            instance = serializer.instance or model()
+            for attr, value in data.items():
+                setattr(instance, attr, value)
+            if serializer.instance is None:
+                created.append(instance)
+                need_pks = need_pks or bool(related)
+            else:
+                updated.append(instance)
+                fields.update(data)
+            relations.append((instance, related))
+
+        saved = self.bulk_create(model, created, need_pks)
+        self.bulk_update(model, updated, fields)
+        self.bulk_set_relations(model, relations)
+        # Instances saved one by one have had their post_save already.
+        instances = updated if saved else created + updated
+        if instances:
+            post_bulk_save.send(sender=model, instances=instances)
+
+        lookup = self.get_bulk_lookup()
+        return [
+            {
+                'status': 'updated' if serializer.instance else 'created',
+                lookup: getattr(instance, lookup),
+            }
+            for serializer, (instance, _) in zip(serializers, relations)
+        ]
+
+    def bulk_create(self, model, instances, need_pks):
+        """Insert the instances; return True if they were saved one by
+        one, sending post_save."""
+        features = connections[model.objects.db].features
+        if need_pks and not features.can_return_rows_from_bulk_insert:
+            # Without returned ids the relations can't be linked in bulk.
+            for instance in instances:
+                instance.save()
+            return True
+        model.objects.bulk_create(instances)
+        return False
+
+    def bulk_update(self, model, instances, fields):
+        if not instances:
+            return
+        fields = set(fields)
+        if any(field.name == 'updated_at' for field in model._meta.fields):
+            now = timezone.now()
+            for instance in instances:
+                instance.updated_at = now
+            fields.add('updated_at')
+        if fields:
+            model.objects.bulk_update(instances, sorted(fields))
+
+    def bulk_set_relations(self, model, relations):
+        """Replace many-to-many links with one delete and one insert."""
+        for field in model._meta.many_to_many:
+            through = field.remote_field.through
+            source = field.m2m_field_name()
+            target = field.m2m_reverse_field_name()
+            changed = [
+                (instance, related[field.name])
+                for instance, related in relations if field.name in related
+            ]
+            if not changed:
+                continue
+            through.objects.filter(**{
+                f'{source}__in': [instance.pk for instance, _ in changed],
+            }).delete()
+            through.objects.bulk_create(
+                through(**{
+                    f'{source}_id': instance.pk,
+                    f'{target}_id': obj.pk,
+                })
+                for instance, objects in changed
+                for obj in dict.fromkeys(objects)
+            )
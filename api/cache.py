@@ -0,0 +1,83 @@
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+
+from .routing import use_primary
+
+VERSION_KEY = 'catalog:{label}:version'
+STATS_KEY = 'catalog:stats:{event}'
+STATS_EVENTS = ('hit', 'miss', 'invalidation')
+
+
+def incr_counter(key):
+    """Increment a counter kept in the cache without a timeout."""
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def catalog_version(model):
+    """Current version of a cached catalog, changed on every write."""
+    return cache.get_or_set(
+        VERSION_KEY.format(label=model._meta.label_lower),
+        uuid.uuid4().hex,
+        None,
+    )
+
+
+def invalidate_catalog(model):
+    """Drop all cached responses of a catalog by switching its version.
+
+    A random version is used, so an evicted version key can never bring
+    back stale entries.
+    """
+    cache.set(
+        VERSION_KEY.format(label=model._meta.label_lower),
+        uuid.uuid4().hex,
+        None,
+    )
+    incr_counter(STATS_KEY.format(event='invalidation'))
+
+
+def catalog_cache_key(model, request):
+    url = hashlib.md5(
+        request.build_absolute_uri().encode('utf-8')
+    ).hexdigest()
+    return (f'catalog:{model._meta.label_lower}:'
+            f'{catalog_version(model)}:{url}')
+
+
+def catalog_cache_stats():
+    """Hit, miss and invalidation counters shared by all workers."""
+    keys = {STATS_KEY.format(event=event): event for event in STATS_EVENTS}
+    values = cache.get_many(keys)
+    return {event: values.get(key, 0) for key, event in keys.items()}
+
+
+class CachedListMixin:
+    """Serve the list action of a catalog from the cache.
+
+    Responses are cached per full URL and invalidated by the model
+    signals connected in api.signals on any create, update or delete,
+    in the cache shared by the workers and management commands.
+    Misses are read from the primary: a lagging replica would put the
+    data from before the invalidation back for the whole timeout.
+    """
+
+    def list(self, request, *args, **kwargs):
+        key = catalog_cache_key(self.get_queryset().model, request)
+        data = cache.get(key)
+        if data is not None:
+            incr_counter(STATS_KEY.format(event='hit'))
+            return Response(data)
+        incr_counter(STATS_KEY.format(event='miss'))
+        with use_primary():
+            response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, settings.CATALOG_CACHE_TIMEOUT)
+        return response
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.checks import Error, register
+
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.dummy.DummyCache',
+    'django.core.cache.backends.locmem.LocMemCache',
+)
+
+
+@register('caches', deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """Refuse a cache that every worker process keeps on its own.
+
+    Throttle buckets, used confirmation codes, the catalog cache and the
+    cached users would then be per worker: the limits multiply and
+    invalidations reach only the process that made the write.
+    """
+    backend = settings.CACHES['default']['BACKEND']
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [Error(
+        f'The default cache {backend} is not shared between processes.',
+        hint='Set CACHE_BACKEND and CACHE_LOCATION to a memcached server.',
+        id='api.E001',
+    )]
@@ -0,0 +1,63 @@
+import hashlib
+import secrets
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+from rest_framework import serializers
+from rest_framework.generics import get_object_or_404
+
+from .models import Code
+from .utils import generate_code
+
+INVALID_CODE_ERROR = 'Confirmation code is not valide'
+USED_KEY = 'confirmation:used:{digest}'
+
+
+def get_code_backend():
+    """The confirmation code backend chosen in the settings."""
+    return import_string(settings.CONFIRMATION_CODE_BACKEND)()
+
+
+class TableCodeBackend:
+    """Keep the last code of every email in the Code table."""
+
+    def issue(self, email):
+        Code.objects.filter(email=email).delete()
+        return Code.objects.create(
+            email=email, confirmation_code=generate_code()
+        ).confirmation_code
+
+    def verify(self, email, code):
+        code_obj = get_object_or_404(Code, email=email)
+        if code != code_obj.confirmation_code:
+            raise serializers.ValidationError(INVALID_CODE_ERROR)
+
+
+class SignedCodeBackend:
+    """Codes signed for an email, checked without the database.
+
+    A code is a random nonce with a timestamp and an HMAC of both and the
+    email, valid for CONFIRMATION_CODE_MAX_AGE seconds. Used codes are
+    remembered in the cache until they expire, so each works only once.
+    """
+    salt = 'api.codes.SignedCodeBackend'
+
+    def signer(self):
+        return signing.TimestampSigner(salt=self.salt)
+
+    def issue(self, email):
+        signed = self.signer().sign(f'{email}:{secrets.token_hex(4)}')
+        # The email is known at verification, only the rest is sent.
+        return signed[len(email) + 1:]
+
+    def verify(self, email, code):
+        max_age = settings.CONFIRMATION_CODE_MAX_AGE
+        try:
+            self.signer().unsign(f'{email}:{code}', max_age=max_age)
+        except signing.BadSignature:
+            raise serializers.ValidationError(INVALID_CODE_ERROR)
+        digest = hashlib.sha256(code.encode()).hexdigest()
+        if not cache.add(USED_KEY.format(digest=digest), True, max_age):
+            raise serializers.ValidationError(INVALID_CODE_ERROR)
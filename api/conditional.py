@@ -0,0 +1,92 @@
+import hashlib
+from calendar import timegm
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+CHANGED_AT_KEY = 'conditional:{label}:changed_at'
+
+
+def touch_model(model):
+    """Remember when rows of a model changed without their own
+    ``updated_at`` moving, e.g. categories embedded in titles or the
+    usernames of review authors.
+
+    Moments live CONDITIONAL_MOMENT_TIMEOUT seconds in the shared cache.
+    """
+    cache.set(
+        CHANGED_AT_KEY.format(label=model._meta.label_lower),
+        timezone.now(),
+        settings.CONDITIONAL_MOMENT_TIMEOUT,
+    )
+
+
+def model_changed_at(model):
+    # A lost key is replaced by now, which can only make clients refetch.
+    return cache.get_or_set(
+        CHANGED_AT_KEY.format(label=model._meta.label_lower),
+        timezone.now,
+        settings.CONDITIONAL_MOMENT_TIMEOUT,
+    )
+
+
+class ConditionalGetMixin:
+    """Answer conditional list and retrieve requests with 304.
+
+    The validators of a list come from the newest ``updated_at`` and the
+    row count of the rows under the route, with the filters left out so
+    one indexed aggregate serves every page. The change moments of the
+    model and of ``conditional_models`` are added, so nothing is
+    serialized for a 304.
+    """
+    conditional_models = ()
+
+    def list(self, request, *args, **kwargs):
+        stats = (self.get_queryset()
+                 .order_by()
+                 .aggregate(last=Max('updated_at'), count=Count('pk')))
+        return self.conditional_response(
+            request, stats['last'], stats['count'],
+            lambda: super(ConditionalGetMixin, self).list(
+                request, *args, **kwargs
+            ),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        return self.conditional_response(
+            request, instance.updated_at, instance.pk,
+            lambda: Response(self.get_serializer(instance).data),
+        )
+
+    def get_conditional_validators(self, request, updated_at, marker):
+        moments = [updated_at] + [
+            model_changed_at(model)
+            for model in (self.get_queryset().model,)
+            + tuple(self.conditional_models)
+        ]
+        last_modified = max(moment for moment in moments if moment)
+        digest = hashlib.sha1('|'.join(
+            [request.get_full_path(), str(marker)]
+            + [moment.isoformat() for moment in moments if moment]
+        ).encode('utf-8')).hexdigest()
+        return quote_etag(digest), timegm(last_modified.utctimetuple())
+
+    def conditional_response(self, request, updated_at, marker, render):
+        etag, last_modified = self.get_conditional_validators(
+            request, updated_at, marker
+        )
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = render()
+        if 200 <= response.status_code < 300 or response.status_code == 304:
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+        return response
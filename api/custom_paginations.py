@@ -1,8 +1,261 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import binascii
+import hashlib
+import json
+from collections import OrderedDict
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import InvalidPage, Page
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (BasePagination, LimitOffsetPagination,
+                                       PageNumberPagination, _positive_int)
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .async_read import is_async_request, run_concurrently
 
 
 class StandardResultsSetPagination(PageNumberPagination):
-    """A custom pagination inherited from PageNumberPagination."""
+    """A custom pagination inherited from PageNumberPagination.
+
+    Under ASGI the page and the count are queried at the same time.
+    """
     page_size = 100
     page_size_query_param = 'page_size'
     max_page_size = 1000
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_size = self.get_page_size(request)
+        number = request.query_params.get(self.page_query_param, 1)
+        try:
+            number = _positive_int(number, strict=True)
+        except ValueError:
+            # Last page and invalid numbers need the count first.
+            number = None
+        if not is_async_request(request) or not page_size or not number:
+            return super().paginate_queryset(queryset, request, view)
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        bottom = (number - 1) * page_size
+        _, rows = run_concurrently(
+            lambda: paginator.count,
+            lambda: list(queryset[bottom:bottom + page_size]),
+        )
+        try:
+            paginator.validate_number(number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(
+                page_number=number, message=str(exc)
+            ))
+        self.page = Page(rows, number, paginator)
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        self.request = request
+        return list(self.page)
+
+
+class KeysetPagination(BasePagination):
+    """Cursor pagination on an indexed date plus the id as a tiebreak.
+
+    The view sets ``keyset_ordering``, e.g. ``('-pub_date', '-id')``.
+    Pages are read with a range condition on the key instead of OFFSET,
+    and no COUNT(*) is run, so the cost doesn't grow with the position.
+    """
+    cursor_query_param = 'cursor'
+    mode_query_param = 'pagination'
+    mode = 'cursor'
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    invalid_cursor_message = 'Invalid cursor'
+
+    @classmethod
+    def is_requested(cls, request):
+        params = request.query_params
+        return (cls.cursor_query_param in params
+                or params.get(cls.mode_query_param) == cls.mode)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        ordering = view.keyset_ordering
+        self.key_field = ordering[0].lstrip('-')
+        self.descending = ordering[0].startswith('-')
+        position, reverse = self.decode_cursor(request)
+
+        backwards = self.descending != reverse
+        if reverse:
+            ordering = [self.invert(field) for field in ordering]
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self.after(position, backwards))
+        rows = list(queryset[:self.page_size + 1])
+
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+        self.has_next = has_more if not reverse else position is not None
+        self.has_previous = has_more if reverse else position is not None
+        self.rows = rows
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size,
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def get_next_link(self):
+        if not self.has_next or not self.rows:
+            return None
+        return self.encode_cursor(self.rows[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.rows:
+            return None
+        return self.encode_cursor(self.rows[0], reverse=True)
+
+    @staticmethod
+    def invert(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    def after(self, position, backwards):
+        value, pk = position
+        lookup = 'lt' if backwards else 'gt'
+        return (
+            Q(**{f'{self.key_field}__{lookup}': value})
+            | Q(**{self.key_field: value, f'pk__{lookup}': pk})
+        )
+
+    def encode_cursor(self, row, reverse):
+        # Rows are model instances or .values() dicts.
+        if isinstance(row, dict):
+            value, pk = row[self.key_field], row['id']
+        else:
+            value, pk = getattr(row, self.key_field), row.pk
+        payload = json.dumps({
+            'v': value.isoformat(),
+            'id': pk,
+            'r': int(reverse),
+        })
+        cursor = base64.urlsafe_b64encode(payload.encode('ascii'))
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.mode_query_param)
+        return replace_query_param(
+            url, self.cursor_query_param, cursor.decode('ascii')
+        )
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None, False
+        try:
+            payload = json.loads(
+                base64.urlsafe_b64decode(encoded.encode('ascii'))
+            )
+            value = parse_datetime(payload['v'])
+            pk = int(payload['id'])
+            reverse = bool(payload['r'])
+        except (TypeError, ValueError, KeyError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        if value is None:
+            raise NotFound(self.invalid_cursor_message)
+        return (value, pk), reverse
+
+
+class EstimatedCountPagination(LimitOffsetPagination):
+    """Limit/offset pagination that avoids repeating COUNT(*).
+
+    Counts are kept in the cache for a short time per path and filter
+    parameters. On PostgreSQL the planner estimate is used instead of
+    counting when it exceeds the configured threshold. The response tells
+    whether ``count`` is exact. Under ASGI a count that is not cached is
+    run at the same time as the page query.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.count_exact = True
+        self.limit = self.get_limit(request)
+        if (not is_async_request(request) or self.limit is None
+                or cache.get(self.get_count_cache_key(queryset)) is not None):
+            return super().paginate_queryset(queryset, request, view)
+
+        # Under ASGI the page is read while the rows are counted.
+        self.offset = self.get_offset(request)
+        self.count, rows = run_concurrently(
+            lambda: self.get_count(queryset),
+            lambda: list(queryset[self.offset:self.offset + self.limit]),
+        )
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+        if self.offset > self.count:
+            return []
+        return rows
+
+    def get_count(self, queryset):
+        key = self.get_count_cache_key(queryset)
+        count = cache.get(key)
+        if count is not None:
+            self.count_exact = False
+            return count
+        count = self.estimate_count(queryset)
+        if count is None or count < settings.PAGINATION_ESTIMATE_THRESHOLD:
+            count = super().get_count(queryset)
+        else:
+            self.count_exact = False
+        cache.set(key, count, settings.PAGINATION_COUNT_CACHE_TIMEOUT)
+        return count
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('count', self.count),
+            ('count_exact', self.count_exact),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_count_cache_key(self, queryset):
+        params = sorted(
+            (name, value)
+            for name, values in self.request.query_params.lists()
+            if name not in (self.limit_query_param, self.offset_query_param)
+            for value in values
+        )
+        digest = hashlib.md5(
+            f'{self.request.path}?{urlencode(params)}'.encode('utf-8')
+        ).hexdigest()
+        return f'count:{queryset.model._meta.label_lower}:{digest}'
+
+    @staticmethod
+    def estimate_count(queryset):
+        """Row estimate of the PostgreSQL planner, None elsewhere."""
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+        sql, params = queryset.order_by().query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
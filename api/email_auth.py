@@ -1,57 +1,39 @@
-import logging
-
 from django.contrib.auth import get_user_model
 
 from rest_framework import status
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, throttle_classes
 from rest_framework.response import Response
 
-from .models import Code
+from .codes import get_code_backend
+from .routing import pin_to_primary
 from .serializers import (
     CheckEmailCodeSerializer,
-    CodeSerializer,
     EmailSerializer,
     UserTokenSerializer,
 )
-from .utils import generate_code, get_tokens_for_user, send_message
+from .throttling import AuthEmailThrottle, AuthIPThrottle
+from .utils import get_tokens_for_user, send_message
 
 
 User = get_user_model()
 
-logging.basicConfig(
-    level=logging.ERROR,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    handlers=[
-        logging.FileHandler("debug.log"),
-        logging.StreamHandler()
-    ]
-)
-
 
 @api_view(['POST'])
+@throttle_classes([AuthIPThrottle, AuthEmailThrottle])
 def get_code(request):
     """Get a confirmation code when the email received during registration."""
     email = EmailSerializer(data=request.data)
     email.is_valid(raise_exception=True)
-    has_code = Code.objects.filter(email=email)
-    if has_code.exists():
-        has_code.delete()
+    address = email.validated_data['email']
+    confirmation_code = get_code_backend().issue(address)
 
-    confirmation_code = generate_code()
-    data = {
-        'email': request.data['email'],
-        'confirmation_code': confirmation_code,
-    }
-    code_serializer = CodeSerializer(data=data)
-    code_serializer.is_valid(raise_exception=True)
-    code_serializer.save()
-
-    message = send_message(request.data['email'], confirmation_code)
+    message = send_message(address, confirmation_code)
     response = Response(message, status=status.HTTP_200_OK)
     return response
 
 
 @api_view(['POST'])
+@throttle_classes([AuthIPThrottle, AuthEmailThrottle])
 def get_token(request):
     """Get tokens for data user's request."""
     incoming_data = CheckEmailCodeSerializer(data=request.data)
@@ -61,4 +43,7 @@ def get_token(request):
     user_serializer.is_valid(raise_exception=True)
     user = user_serializer.save()
     token = get_tokens_for_user(user)
-    return Response(token, status=status.HTTP_200_OK)
+    response = Response(token, status=status.HTTP_200_OK)
+    # The user may be missing on the replicas for a while.
+    pin_to_primary(request, response, user)
+    return response
@@ -0,0 +1,114 @@
+import csv
+import json
+
+from django.conf import settings
+from rest_framework.utils.encoders import JSONEncoder
+
+from titles.models import Genre, Review, Title
+
+from .serializers import TitleExportSerializer, with_author_username
+
+
+def _grouped(rows, key):
+    """Yield (key, [rows]) from rows already ordered by that key."""
+    current, group = None, []
+    for row in rows:
+        row_key = key(row)
+        if group and row_key != current:
+            yield current, group
+            group = []
+        current = row_key
+        group.append(row)
+    if group:
+        yield current, group
+
+
+class _Cursor:
+    """Forward-only reader of a grouped stream for a merge join."""
+
+    def __init__(self, groups):
+        self.groups = groups
+        self.head = next(groups, None)
+
+    def take(self, key):
+        """Rows of the key, skipping groups of keys left behind."""
+        while self.head is not None and self.head[0] < key:
+            self.head = next(self.groups, None)
+        if self.head is not None and self.head[0] == key:
+            rows = self.head[1]
+            self.head = next(self.groups, None)
+            return rows
+        return []
+
+
+def export_titles(chunk_size=None):
+    """Yield every title with its genres and reviews as a dict.
+
+    Titles, genre links and reviews are read with three cursors ordered
+    by title id and merged, so only one title is kept in memory at a time.
+    """
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    # Genres are few; their position keeps the API ordering of a title.
+    genres = {genre.pk: (position, genre)
+              for position, genre in enumerate(Genre.objects.all())}
+    links = _Cursor(_grouped(
+        Title.genre.through.objects
+        .order_by('title_id', 'id')
+        .values_list('title_id', 'genre_id')
+        .iterator(chunk_size=chunk_size),
+        key=lambda link: link[0],
+    ))
+    reviews = _Cursor(_grouped(
+        with_author_username(
+            Review.objects.order_by('title_id', '-pub_date', '-id')
+        ).iterator(chunk_size=chunk_size),
+        key=lambda review: review.title_id,
+    ))
+    serializer = TitleExportSerializer()
+    titles = (Title.objects
+              .select_related('category')
+              .defer('search_vector')
+              .order_by('pk')
+              .iterator(chunk_size=chunk_size))
+    for title in titles:
+        title.export_genres = [
+            genre for _, genre in sorted(
+                genres[genre_id] for _, genre_id in links.take(title.pk)
+            )
+        ]
+        title.export_reviews = reviews.take(title.pk)
+        yield serializer.to_representation(title)
+
+
+def ndjson_lines(rows):
+    encoder = JSONEncoder(ensure_ascii=False)
+    for row in rows:
+        yield encoder.encode(row) + '\n'
+
+
+class _Line:
+    """File-like object handing back what csv.writer writes."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    """CSV with the top level fields, nested values encoded as JSON."""
+    writer = csv.writer(_Line())
+    header = None
+    for row in rows:
+        if header is None:
+            header = list(row)
+            yield writer.writerow(header)
+        yield writer.writerow([
+            json.dumps(row[name], ensure_ascii=False, cls=JSONEncoder)
+            if isinstance(row[name], (dict, list)) else row[name]
+            for name in header
+        ])
+
+
+EXPORT_FORMATS = {
+    'ndjson': (ndjson_lines, 'application/x-ndjson'),
+    'csv': (csv_lines, 'text/csv'),
+}
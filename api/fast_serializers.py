@@ -0,0 +1,195 @@
+from collections import defaultdict
+from operator import itemgetter
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from rest_framework import serializers
+from rest_framework.response import Response
+
+
+class Unsupported(Exception):
+    """The serializer uses a field the row compiler doesn't know."""
+
+
+class RowSerializer:
+    """Read-only twin of a model serializer working on ``.values()`` rows.
+
+    Only the columns rendered by the serializer are selected, and each row
+    becomes a dict in one call of a function generated for the serializer
+    instead of walking its fields. Nested many-to-many serializers are
+    filled by one query per page, in the order prefetching would give.
+    The output equals the one of the serializer.
+
+    ``fieldset`` is a sparse fieldset the serializer is trimmed to, see
+    api.sparse.
+    """
+
+    def __init__(self, serializer_class, fieldset=None):
+        serializer = serializer_class(context={'sparse_fieldset': fieldset})
+        self.model = serializer.Meta.model
+        self.pk = self.model._meta.pk.attname
+        self.columns = [self.pk]
+        self.converters = []
+        self.many = []
+        entries = self.compile_fields(serializer, self.model, '')
+        source = 'def serialize_row(row, related):\n    return {%s}\n' % (
+            ', '.join(entries)
+        )
+        namespace = {f'convert{number}': convert
+                     for number, convert in enumerate(self.converters)}
+        exec(compile(source, f'<row serializer {serializer_class.__name__}>',
+                     'exec'), namespace)
+        self.serialize_row = namespace['serialize_row']
+
+    def column(self, name):
+        if name not in self.columns:
+            self.columns.append(name)
+        return repr(name)
+
+    def converter(self, convert):
+        self.converters.append(convert)
+        return f'convert{len(self.converters) - 1}'
+
+    def compile_fields(self, serializer, model, prefix):
+        if (type(serializer).to_representation
+                is not serializers.Serializer.to_representation):
+            raise Unsupported(type(serializer).__name__)
+        return [
+            f'{field.field_name!r}: {self.compile_field(field, model, prefix)}'
+            for field in serializer.fields.values() if not field.write_only
+        ]
+
+    def compile_field(self, field, model, prefix):
+        if '.' in field.source or field.source == '*':
+            raise Unsupported(field.source)
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            raise Unsupported(field.source)
+        path = f'{prefix}{field.source}'
+        if isinstance(field, (serializers.ListSerializer,
+                              serializers.ManyRelatedField)):
+            return self.compile_many(field, model_field)
+        if isinstance(field, (serializers.ModelSerializer,
+                              serializers.RelatedField)):
+            return self.compile_related(field, model_field, path)
+        if model_field.is_relation:
+            raise Unsupported(field.source)
+        if isinstance(field, serializers.CharField):
+            convert = str
+        elif type(field) is serializers.IntegerField:
+            convert = int
+        elif type(field) is serializers.FloatField:
+            convert = float
+        else:
+            convert = field.to_representation
+        column = self.column(path)
+        return (f'None if row[{column}] is None '
+                f'else {self.converter(convert)}(row[{column}])')
+
+    def compile_related(self, field, model_field, path):
+        if isinstance(field, serializers.ModelSerializer):
+            nested = self.compile_fields(
+                field, model_field.related_model, f'{path}__'
+            )
+            return (f'None if row[{self.column(path)}] is None '
+                    f'else {{{", ".join(nested)}}}')
+        if isinstance(field, serializers.SlugRelatedField):
+            return f'row[{self.column(f"{path}__{field.slug_field}")}]'
+        if (isinstance(field, serializers.PrimaryKeyRelatedField)
+                and field.pk_field is None):
+            return f'row[{self.column(path)}]'
+        raise Unsupported(field.source)
+
+    def compile_many(self, field, model_field):
+        if not isinstance(model_field, models.ManyToManyField):
+            raise Unsupported(field.source)
+        if isinstance(field, serializers.ManyRelatedField):
+            if not isinstance(field.child_relation,
+                              serializers.SlugRelatedField):
+                raise Unsupported(field.source)
+            slug_field = field.child_relation.slug_field
+            self.many.append((model_field, [slug_field],
+                              itemgetter(slug_field)))
+        else:
+            if not isinstance(field.child, serializers.ModelSerializer):
+                raise Unsupported(field.source)
+            child = RowSerializer(type(field.child))
+            if child.many:
+                raise Unsupported(field.source)
+            self.many.append((
+                model_field, child.columns,
+                lambda row: child.serialize_row(row, ()),
+            ))
+        return f'related[{len(self.many) - 1}].get(row[{self.pk!r}]) or []'
+
+    def rows(self, queryset, extra=()):
+        return queryset.prefetch_related(None).values(*self.columns, *extra)
+
+    def narrow(self, queryset, extra=()):
+        """Load only what the serializer renders, and the ``extra`` fields,
+        into model instances."""
+        joined = {column.rsplit('__', 1)[0]
+                  for column in self.columns if '__' in column}
+        return (queryset
+                .select_related(None).select_related(*joined)
+                .prefetch_related(None)
+                .prefetch_related(*(field.name for field, _, _ in self.many))
+                .only(*self.columns, *extra))
+
+    def related(self, model_field, columns, build, pks):
+        """Serialized targets of a many-to-many field by source pk."""
+        query_name = model_field.related_query_name()
+        targets = defaultdict(list)
+        rows = (model_field.related_model._default_manager
+                .filter(**{f'{query_name}__in': pks})
+                .values(query_name, *columns))
+        for row in rows:
+            targets[row[query_name]].append(build(row))
+        return targets
+
+    def serialize(self, rows):
+        pks = [row[self.pk] for row in rows]
+        related = tuple(
+            self.related(*many, pks) if pks else {} for many in self.many
+        )
+        return [self.serialize_row(row, related) for row in rows]
+
+
+_compiled = {}
+
+
+def get_row_serializer(serializer_class, fieldset=None):
+    """Compiled row serializer of a class, None if it can't be compiled."""
+    key = (serializer_class, fieldset)
+    if key not in _compiled:
+        try:
+            _compiled[key] = RowSerializer(serializer_class, fieldset)
+        except Unsupported:
+            _compiled[key] = None
+    return _compiled[key]
+
+
+class FastListMixin:
+    """Serve the list action from ``.values()`` rows.
+
+    Serializers the compiler doesn't support, and every action but list,
+    keep the regular serializers. FAST_LIST_SERIALIZERS turns it off.
+    """
+
+    def list(self, request, *args, **kwargs):
+        fieldset = self.get_serializer_context().get('sparse_fieldset')
+        row_serializer = settings.FAST_LIST_SERIALIZERS and get_row_serializer(
+            self.get_serializer_class(), fieldset
+        )
+        if not row_serializer:
+            return super().list(request, *args, **kwargs)
+        rows = row_serializer.rows(
+            self.filter_queryset(self.get_queryset()),
+            getattr(self, 'sparse_required_fields', ()),
+        )
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(row_serializer.serialize(page))
+        return Response(row_serializer.serialize(list(rows)))
@@ -1,6 +1,9 @@
 from django_filters import rest_framework as filters
+from rest_framework.filters import SearchFilter
 
 from titles.models import Title
+from titles.search import search_titles
+from users.search import search_users
 
 
 class TitlesFilter(filters.FilterSet):
@@ -8,7 +11,23 @@ class TitlesFilter(filters.FilterSet):
     name = filters.CharFilter(field_name='name', lookup_expr='contains')
     genre = filters.CharFilter(field_name='genre__slug')
     category = filters.CharFilter(field_name='category__slug')
+    q = filters.CharFilter(method='filter_full_text')
 
     class Meta:
         model = Title
-        fields = ('name', 'category', 'genre', 'year', )
+        fields = ('name', 'category', 'genre', 'year', 'q', )
+
+    def filter_full_text(self, queryset, name, value):
+        """Full-text search over name and description, best match first."""
+        return search_titles(queryset, value)
+
+
+class UsersSearchFilter(SearchFilter):
+    """The ?search= filter of users backed by trigram indexes."""
+
+    def filter_queryset(self, request, queryset, view):
+        search_fields = self.get_search_fields(view, request)
+        search_terms = self.get_search_terms(request)
+        if not search_fields or not search_terms:
+            return queryset
+        return search_users(queryset, search_terms, search_fields)
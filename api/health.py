@@ -0,0 +1,30 @@
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.http import JsonResponse
+
+
+def healthz(request):
+    """Liveness: the worker answers, no backing services are touched."""
+    return JsonResponse({'status': 'ok'})
+
+
+def readyz(request):
+    """Readiness: the primary database answers a query and the cache
+    works. Replicas are left out, reads fail over to the primary."""
+    checks = {}
+    try:
+        with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+            cursor.execute('SELECT 1')
+        checks['db'] = 'ok'
+    except DatabaseError as error:
+        checks['db'] = str(error)
+    try:
+        cache.get('readyz')
+        checks['cache'] = 'ok'
+    except Exception as error:
+        checks['cache'] = str(error)
+    ready = all(value == 'ok' for value in checks.values())
+    return JsonResponse(
+        {'status': 'ok' if ready else 'unavailable', 'checks': checks},
+        status=200 if ready else 503,
+    )
@@ -0,0 +1,86 @@
+import atexit
+import contextvars
+import copy
+import datetime
+import json
+import logging
+import queue
+from logging.config import ConvertingList
+from logging.handlers import QueueHandler, QueueListener
+
+request_id = contextvars.ContextVar('request_id', default=None)
+
+
+class RequestIdFilter(logging.Filter):
+    """Add the id of the current request to every record.
+
+    Django logs 4xx and 5xx responses after the middleware is done, so
+    their records carry the id on the request they come with.
+    """
+
+    def filter(self, record):
+        if not hasattr(record, 'request_id'):
+            record.request_id = request_id.get() or getattr(
+                getattr(record, 'request', None), 'request_id', None
+            )
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, for log collectors."""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.datetime.fromtimestamp(
+                record.created, datetime.timezone.utc
+            ).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'request_id': getattr(record, 'request_id', None),
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class QueueListenerHandler(QueueHandler):
+    """Hand records to a background thread writing to ``handlers``.
+
+    Request threads only put records into an in-memory queue, the slow
+    handlers (files, streams) run in the listener thread. In LOGGING the
+    targets are given as 'cfg://handlers.<name>'.
+    """
+
+    def __init__(self, handlers, maxsize=10000):
+        super().__init__(queue.Queue(maxsize))
+        if isinstance(handlers, ConvertingList):
+            # Indexing resolves the configured handler objects.
+            handlers = [handlers[index] for index in range(len(handlers))]
+        self.listener = QueueListener(
+            self.queue, *handlers, respect_handler_level=True
+        )
+        self.listener.start()
+        atexit.register(self.listener.stop)
+
+    def prepare(self, record):
+        # Format the message here, while args may still change, and keep
+        # the traceback text; formatting is left to the target handlers.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(
+                record.exc_info
+            )
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # Dropping a record is better than blocking a request.
+            pass
@@ -0,0 +1,156 @@
+import datetime
+import logging
+import smtplib
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connections, transaction
+from django.utils import timezone
+
+from .models import MailStatus, OutboxMessage
+
+logger = logging.getLogger(__name__)
+
+# Errors after which the SMTP connection is opened again.
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError)
+
+
+def enqueue_message(subject, body, to, from_email=None):
+    """Put an email into the outbox; send_queued_mail delivers it."""
+    return OutboxMessage.objects.create(
+        subject=subject,
+        body=body,
+        to=to,
+        from_email=from_email or '',
+    )
+
+
+def retry_delay(attempts):
+    """Exponential backoff after the given number of failed attempts."""
+    return datetime.timedelta(seconds=min(
+        settings.MAIL_RETRY_BACKOFF * 2 ** (attempts - 1),
+        settings.MAIL_RETRY_MAX_DELAY,
+    ))
+
+
+def _claim_messages(batch_size):
+    """Take a batch of due messages for this worker.
+
+    The claim commits at once, so no row lock is held while sending. A
+    claimed message is due again after MAIL_CLAIM_TIMEOUT, in case the
+    worker dies before recording the result.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        queryset = OutboxMessage.objects.filter(
+            status__in=[MailStatus.PENDING, MailStatus.SENDING],
+            next_attempt_at__lte=now,
+        )
+        if connections[queryset.db].features.has_select_for_update_skip_locked:
+            # Parallel workers take different batches.
+            queryset = queryset.select_for_update(skip_locked=True)
+        messages = list(
+            queryset.order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        for message in messages:
+            message.status = MailStatus.SENDING
+            message.attempts += 1
+            message.next_attempt_at = now + datetime.timedelta(
+                seconds=settings.MAIL_CLAIM_TIMEOUT
+            )
+        OutboxMessage.objects.bulk_update(
+            messages, ['status', 'attempts', 'next_attempt_at']
+        )
+    return messages
+
+
+def purge_outbox():
+    """Delete sent and failed messages older than MAIL_OUTBOX_RETENTION.
+
+    Return the number of deleted messages.
+    """
+    border = timezone.now() - datetime.timedelta(
+        seconds=settings.MAIL_OUTBOX_RETENTION
+    )
+    deleted, _ = OutboxMessage.objects.filter(
+        status__in=[MailStatus.SENT, MailStatus.FAILED],
+        created_at__lt=border,
+    ).delete()
+    return deleted
+
+
+class _Sender:
+    """Send over one SMTP connection, reopened when the server drops it."""
+
+    def __init__(self):
+        self.connection = get_connection(fail_silently=False)
+
+    def __enter__(self):
+        self.connection.open()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.connection.close()
+
+    def send(self, message):
+        mail = EmailMessage(
+            message.subject,
+            message.body,
+            message.from_email or settings.DEFAULT_FROM_EMAIL,
+            [message.to],
+            connection=self.connection,
+        )
+        try:
+            mail.send()
+        except CONNECTION_ERRORS:
+            self.connection.close()
+            self.connection.open()
+            mail.send()
+
+
+def _record_failure(message, error):
+    message.last_error = repr(error)
+    logger.warning(
+        'Outbox message %s, attempt %s failed: %r',
+        message.pk, message.attempts, error,
+    )
+    if message.attempts >= settings.MAIL_MAX_ATTEMPTS:
+        message.status = MailStatus.FAILED
+    else:
+        message.status = MailStatus.PENDING
+        message.next_attempt_at = (
+            timezone.now() + retry_delay(message.attempts)
+        )
+    message.save(update_fields=['status', 'next_attempt_at', 'last_error'])
+
+
+def _record_delivery(message):
+    message.status = MailStatus.SENT
+    message.sent_at = timezone.now()
+    # The body may hold a confirmation code, it isn't needed any more.
+    message.body = ''
+    message.save(update_fields=['status', 'sent_at', 'body'])
+
+
+def send_queued_mail(batch_size=None):
+    """Deliver one batch of due messages; return (sent, failed) counts.
+
+    Every result is saved as soon as the message is sent. A failed
+    message is retried with backoff until MAIL_MAX_ATTEMPTS.
+    """
+    batch_size = batch_size or settings.MAIL_QUEUE_BATCH_SIZE
+    sent = failed = 0
+    messages = _claim_messages(batch_size)
+    if not messages:
+        return sent, failed
+    with _Sender() as sender:
+        for message in messages:
+            try:
+                sender.send(message)
+            except (smtplib.SMTPException, OSError) as error:
+                failed += 1
+                _record_failure(message, error)
+            else:
+                sent += 1
+                _record_delivery(message)
+    return sent, failed
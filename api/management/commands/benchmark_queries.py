@@ -0,0 +1,87 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, setup_test_environment
+from rest_framework.test import APIClient
+
+from api.custom_paginations import StandardResultsSetPagination
+from titles.models import Comment, Review, Title
+
+User = get_user_model()
+
+DEFAULT_PAGE_SIZES = (10, 100, StandardResultsSetPagination.max_page_size)
+
+
+class Rollback(Exception):
+    """Raised to discard the benchmark data."""
+
+
+class Command(BaseCommand):
+    help = ('Measure queries issued by review and comment listings for '
+            'growing page sizes. All generated rows are rolled back.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--page-sizes', nargs='+', type=int,
+            default=DEFAULT_PAGE_SIZES,
+            help='Page sizes to measure.',
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        page_sizes = sorted(options['page_sizes'])
+        try:
+            with transaction.atomic():
+                self.run(page_sizes)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, page_sizes):
+        title, review = self.fill(max(page_sizes))
+        endpoints = (
+            ('reviews', f'/api/v1/titles/{title.id}/reviews/'),
+            ('comments', f'/api/v1/titles/{title.id}/reviews/'
+                         f'{review.id}/comments/'),
+        )
+        client = APIClient()
+        self.stdout.write(f'{"endpoint":<10}{"page":>8}{"queries":>10}'
+                          f'{"ms":>10}')
+        for name, url in endpoints:
+            for page_size in page_sizes:
+                queries, elapsed = self.measure(client, url, page_size)
+                self.stdout.write(f'{name:<10}{page_size:>8}{queries:>10}'
+                                  f'{elapsed * 1000:>10.1f}')
+
+    def fill(self, rows):
+        """Create a title with `rows` reviews and a review with comments."""
+        users = User.objects.bulk_create(
+            User(username=f'bench{i}', email=f'bench{i}@yamdb.fake')
+            for i in range(rows)
+        )
+        if users[0].pk is None:
+            users = list(User.objects.filter(username__startswith='bench'))
+        title = Title.objects.create(name='benchmark', year=2000)
+        Review.objects.bulk_create(
+            Review(title=title, author=user, text='text', score=5)
+            for user in users
+        )
+        review = title.reviews.first()
+        Comment.objects.bulk_create(
+            Comment(review=review, author=user, text='text')
+            for user in users
+        )
+        return title, review
+
+    def measure(self, client, url, page_size):
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            response = client.get(
+                url, {'limit': page_size, 'page_size': page_size}
+            )
+            elapsed = time.perf_counter() - started
+        if len(response.data['results']) != page_size:
+            raise CommandError(f'{url} did not return {page_size} rows.')
+        return len(context), elapsed
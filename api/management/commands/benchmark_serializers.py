@@ -0,0 +1,115 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from api.fast_serializers import get_row_serializer
+from api.renderers import FastJSONRenderer
+from api.serializers import (CommentSerializer, ReviewSerializer,
+                             TitleListSerializer)
+from titles.models import Category, Comment, Genre, Review, Title
+
+User = get_user_model()
+
+DEFAULT_PAGE_SIZES = (100, 1000)
+
+
+class Rollback(Exception):
+    """Raised to discard the benchmark data."""
+
+
+class Command(BaseCommand):
+    help = ('Compare the DRF serializers of title, review and comment '
+            'lists with the compiled row serializers, and JSONRenderer '
+            'with FastJSONRenderer. All generated rows are rolled back.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--page-sizes', nargs='+', type=int, default=DEFAULT_PAGE_SIZES,
+        )
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(sorted(options['page_sizes']), options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, page_sizes, repeat):
+        title, review = self.fill(max(page_sizes))
+        lists = (
+            ('titles', TitleListSerializer, Title.objects.all()),
+            ('reviews', ReviewSerializer, title.reviews.all()),
+            ('comments', CommentSerializer, review.comments.all()),
+        )
+        self.stdout.write(f'{"list":<10}{"page":>6}{"drf ms":>10}'
+                          f'{"rows ms":>10}{"json ms":>10}{"fast ms":>10}')
+        for name, serializer_class, queryset in lists:
+            for page_size in page_sizes:
+                self.stdout.write(f'{name:<10}{page_size:>6}' + ''.join(
+                    f'{timing * 1000:>10.1f}' for timing in self.measure(
+                        serializer_class, queryset, page_size, repeat
+                    )
+                ))
+
+    def fill(self, rows):
+        """Titles with genres, and reviews and comments of one title."""
+        category = Category.objects.create(name='benchmark', slug='bench')
+        genres = [
+            Genre.objects.create(name=f'bench{i}', slug=f'bench{i}')
+            for i in range(3)
+        ]
+        User.objects.bulk_create(
+            User(username=f'bench{i}', email=f'bench{i}@yamdb.fake')
+            for i in range(rows)
+        )
+        users = list(User.objects.filter(username__startswith='bench'))
+        Title.objects.bulk_create(
+            Title(name=f'benchmark {i}', year=2000, category=category,
+                  description='Описание произведения')
+            for i in range(rows)
+        )
+        titles = list(Title.objects.filter(name__startswith='benchmark'))
+        Title.genre.through.objects.bulk_create(
+            Title.genre.through(title=title, genre=genre)
+            for title in titles for genre in genres
+        )
+        title = titles[0]
+        Review.objects.bulk_create(
+            Review(title=title, author=user, text='text', score=5)
+            for user in users
+        )
+        review = title.reviews.first()
+        Comment.objects.bulk_create(
+            Comment(review=review, author=user, text='text')
+            for user in users
+        )
+        return title, review
+
+    def measure(self, serializer_class, queryset, page_size, repeat):
+        """Best times of both serializers and both renderers."""
+        setup = serializer_class.setup_eager_loading
+        row_serializer = get_row_serializer(serializer_class)
+        timings = [[], [], [], []]
+        for _ in range(repeat):
+            started = time.perf_counter()
+            data = serializer_class(
+                setup(queryset)[:page_size], many=True
+            ).data
+            timings[0].append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            rows = row_serializer.rows(setup(queryset))[:page_size]
+            row_serializer.serialize(list(rows))
+            timings[1].append(time.perf_counter() - started)
+
+            for timing, renderer in zip(timings[2:], (JSONRenderer(),
+                                                      FastJSONRenderer())):
+                started = time.perf_counter()
+                renderer.render(data)
+                timing.append(time.perf_counter() - started)
+        return [min(values) for values in timings]
@@ -0,0 +1,130 @@
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework import status
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Command(BaseCommand):
+    help = ('Compare running WSGI and ASGI deployments under concurrent '
+            'load while slow clients trickle their request headers, e.g. '
+            '"gunicorn api_yamdb.wsgi:application" against '
+            '"uvicorn api_yamdb.asgi:application". All requests come from '
+            'one client, so both servers must run with THROTTLING=false.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--wsgi-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--asgi-url', default='http://127.0.0.1:8001')
+        parser.add_argument('--path', default='/api/v1/titles/')
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--slow-clients', type=int, default=20)
+        parser.add_argument('--slow-delay', type=float, default=1.0,
+                            help='Seconds between header lines of a slow '
+                                 'client.')
+        parser.add_argument('--timeout', type=float, default=30.0)
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.stdout.write(f'{"server":<8}{"req/s":>10}{"p50 ms":>10}'
+                          f'{"p99 ms":>10}{"errors":>8}')
+        for name in ('wsgi', 'asgi'):
+            url = urlsplit(options[f'{name}_url'])
+            if not url.hostname:
+                raise CommandError(f'Invalid --{name}-url.')
+            rate, timings, errors = asyncio.run(self.measure(url))
+            if status.HTTP_429_TOO_MANY_REQUESTS in errors:
+                raise CommandError(
+                    f'The {name} server throttled the benchmark, start it '
+                    'with THROTTLING=false.'
+                )
+            errors = len(errors)
+            if not timings:
+                self.stdout.write(f'{name:<8}{"-":>10}{"-":>10}{"-":>10}'
+                                  f'{errors:>8}')
+                continue
+            self.stdout.write(
+                f'{name:<8}{rate:>10.1f}'
+                f'{percentile(timings, 0.5) * 1000:>10.1f}'
+                f'{percentile(timings, 0.99) * 1000:>10.1f}{errors:>8}'
+            )
+
+    async def measure(self, url):
+        stop = asyncio.Event()
+        slow = [
+            asyncio.ensure_future(self.slow_client(url, stop))
+            for _ in range(self.options['slow_clients'])
+        ]
+        # Let the slow clients take their connections first.
+        await asyncio.sleep(self.options['slow_delay'])
+        remaining = iter(range(self.options['requests']))
+        timings, errors = [], []
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            self.client(url, remaining, timings, errors)
+            for _ in range(self.options['concurrency'])
+        ))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await asyncio.gather(*slow, return_exceptions=True)
+        return len(timings) / elapsed, timings, errors
+
+    def request_lines(self, url):
+        return [
+            f'GET {self.options["path"]} HTTP/1.1\r\n',
+            f'Host: {url.netloc}\r\n',
+            'Accept: application/json\r\n',
+            'Connection: close\r\n',
+            '\r\n',
+        ]
+
+    async def fetch(self, url, lines, delay=0.0, stop=None):
+        reader, writer = await asyncio.open_connection(
+            url.hostname, url.port or 80
+        )
+        try:
+            for line in lines:
+                writer.write(line.encode('latin-1'))
+                await writer.drain()
+                if delay and not stop.is_set():
+                    await asyncio.sleep(delay)
+            status = await reader.readline()
+            await reader.read()
+        finally:
+            writer.close()
+        return int(status.split()[1])
+
+    async def client(self, url, remaining, timings, errors):
+        lines = self.request_lines(url)
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                code = await asyncio.wait_for(
+                    self.fetch(url, lines), self.options['timeout']
+                )
+            except (OSError, asyncio.TimeoutError, IndexError,
+                    ValueError) as error:
+                errors.append(error)
+                continue
+            if code != status.HTTP_200_OK:
+                errors.append(code)
+                continue
+            timings.append(time.perf_counter() - started)
+
+    async def slow_client(self, url, stop):
+        """Keep a connection busy sending headers until the run ends."""
+        lines = self.request_lines(url)
+        # Extra headers stretch the request over the whole run.
+        padding = [f'X-Padding-{number}: 1\r\n' for number in range(90)]
+        lines = lines[:-1] + padding + lines[-1:]
+        while not stop.is_set():
+            try:
+                await self.fetch(url, lines, self.options['slow_delay'], stop)
+            except (OSError, IndexError, ValueError):
+                await asyncio.sleep(self.options['slow_delay'])
@@ -0,0 +1,77 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from users.search import search_users
+
+User = get_user_model()
+
+SEARCHES = (
+    ('prefix', 'user0042'),
+    ('substring', '4217'),
+    ('typo', 'usre004217'),
+    ('email', 'yamdb'),
+)
+
+
+class Rollback(Exception):
+    """Raised to discard the synthetic users."""
+
+
+class Command(BaseCommand):
+    help = ('Time user search over a synthetic users table. The rows are '
+            'rolled back unless --keep is given.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000000)
+        parser.add_argument('--batch-size', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--keep', action='store_true')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.fill(options['users'], options['batch_size'])
+                self.measure(options['repeat'])
+                if not options['keep']:
+                    raise Rollback
+        except Rollback:
+            pass
+
+    def fill(self, total, batch_size):
+        started = time.perf_counter()
+        for offset in range(0, total, batch_size):
+            User.objects.bulk_create(
+                User(
+                    username=f'user{number:07d}',
+                    email=f'user{number:07d}@yamdb.fake',
+                )
+                for number in range(offset, min(offset + batch_size, total))
+            )
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE users_user')
+        self.stdout.write(
+            f'Inserted {total} users in '
+            f'{time.perf_counter() - started:.1f}s ({connection.vendor})'
+        )
+
+    def measure(self, repeat):
+        self.stdout.write(f'{"search":<12}{"term":<14}{"rows":>8}'
+                          f'{"best ms":>10}')
+        for name, term in SEARCHES:
+            fields = ('username', 'email') if name == 'email' else (
+                'username',
+            )
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                rows = list(
+                    search_users(User.objects.all(), [term], fields)
+                    .values_list('pk', flat=True)[:20]
+                )
+                timings.append(time.perf_counter() - started)
+            self.stdout.write(f'{name:<12}{term:<14}{len(rows):>8}'
+                              f'{min(timings) * 1000:>10.1f}')
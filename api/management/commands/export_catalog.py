@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.export import EXPORT_FORMATS, export_titles
+
+
+class Command(BaseCommand):
+    help = ('Write all titles with their genres and reviews to a file, '
+            'one title at a time.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument(
+            '--output', choices=tuple(EXPORT_FORMATS), default='ndjson'
+        )
+        parser.add_argument('--chunk-size', type=int)
+
+    def handle(self, *args, **options):
+        lines, _ = EXPORT_FORMATS[options['output']]
+        started = time.perf_counter()
+        written = 0
+        with open(options['path'], 'w', encoding='utf-8',
+                  newline='') as file:
+            for line in lines(export_titles(options['chunk_size'])):
+                file.write(line)
+                written += 1
+        self.stdout.write(
+            f'Wrote {written} lines to {options["path"]} in '
+            f'{time.perf_counter() - started:.1f}s'
+        )
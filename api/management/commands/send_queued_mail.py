@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.mail import purge_outbox, send_queued_mail
+
+
+class Command(BaseCommand):
+    help = ('Deliver emails from the outbox over one SMTP connection per '
+            'batch and delete old ones. With --loop keeps polling for new '
+            'messages.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int)
+        parser.add_argument('--loop', action='store_true')
+        parser.add_argument(
+            '--interval', type=float, default=2.0,
+            help='Seconds to wait when the outbox is empty.',
+        )
+
+    # Seconds between purges of the outbox in --loop mode.
+    purge_interval = 60 * 60
+
+    def handle(self, *args, **options):
+        purged_at = None
+        while True:
+            if purged_at is None or (
+                time.monotonic() - purged_at >= self.purge_interval
+            ):
+                purged_at = time.monotonic()
+                deleted = purge_outbox()
+                if deleted:
+                    self.stdout.write(f'Purged {deleted}.')
+            try:
+                sent, failed = send_queued_mail(options['batch_size'])
+            except OSError as error:
+                # The SMTP server is unreachable, the batch stays queued.
+                if not options['loop']:
+                    raise
+                self.stderr.write(f'Mail server error: {error!r}')
+                sent = failed = 0
+            if sent or failed:
+                self.stdout.write(f'Sent {sent}, failed {failed}.')
+            if not options['loop']:
+                return
+            if not sent and not failed:
+                time.sleep(options['interval'])
@@ -0,0 +1,167 @@
+import bisect
+import contextvars
+import threading
+import time
+from collections import defaultdict
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+HISTOGRAMS = {
+    'yamdb_request_duration_seconds': (
+        'Time to answer a request.', DURATION_BUCKETS,
+    ),
+    'yamdb_db_duration_seconds': (
+        'Time spent in database queries per request.', DURATION_BUCKETS,
+    ),
+    'yamdb_db_queries': ('Database queries per request.', COUNT_BUCKETS),
+    'yamdb_serialize_duration_seconds': (
+        'Time to serialize list and retrieve responses.', DURATION_BUCKETS,
+    ),
+    'yamdb_response_size_bytes': ('Size of response bodies.', SIZE_BUCKETS),
+}
+
+current_timings = contextvars.ContextVar('current_timings', default=None)
+
+
+class RequestTimings:
+    """What one request spent, filled while it runs."""
+    __slots__ = ('db_queries', 'db_time', 'serialize_time', 'lock')
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.serialize_time = None
+        # Queries of one request may run in several threads under ASGI.
+        self.lock = threading.Lock()
+
+
+def time_queries(execute, sql, params, many, context):
+    """connection.execute_wrapper counting queries of the request."""
+    timings = current_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        with timings.lock:
+            timings.db_time += elapsed
+            timings.db_queries += 1
+
+
+class Histogram:
+    """Cumulative buckets, sum and count of observed values."""
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Histograms per metric and labels, kept by every worker process."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = defaultdict(dict)
+
+    def observe(self, name, labels, value):
+        with self.lock:
+            histogram = self.histograms[name].get(labels)
+            if histogram is None:
+                histogram = Histogram(HISTOGRAMS[name][1])
+                self.histograms[name][labels] = histogram
+            histogram.observe(value)
+
+    def reset(self):
+        with self.lock:
+            self.histograms.clear()
+
+    def render(self):
+        lines = []
+        with self.lock:
+            for name, (help_text, _) in HISTOGRAMS.items():
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} histogram')
+                for labels, histogram in sorted(
+                        self.histograms[name].items()):
+                    lines.extend(_histogram_lines(name, labels, histogram))
+        return lines
+
+
+def _labels(pairs):
+    return ','.join(
+        '{}="{}"'.format(
+            key, str(value).replace('\\', '\\\\').replace('"', '\\"')
+        )
+        for key, value in pairs
+    )
+
+
+def _histogram_lines(name, labels, histogram):
+    cumulative = 0
+    for bound, count in zip(histogram.bounds + ('+Inf',), histogram.counts):
+        cumulative += count
+        pairs = labels + (('le', bound),)
+        yield f'{name}_bucket{{{_labels(pairs)}}} {cumulative}'
+    yield f'{name}_sum{{{_labels(labels)}}} {histogram.sum}'
+    yield f'{name}_count{{{_labels(labels)}}} {histogram.count}'
+
+
+registry = MetricsRegistry()
+
+
+def counter_lines(name, help_text, values, label):
+    """A Prometheus counter with one sample per labelled value."""
+    yield f'# HELP {name} {help_text}'
+    yield f'# TYPE {name} counter'
+    for key, value in sorted(values.items()):
+        yield f'{name}{{{_labels(((label, key),))}}} {value}'
+
+
+def pool_lines(connections):
+    """Gauges of the connection pools of this worker, if any."""
+    stats = {
+        alias: connections[alias].pool_stats() for alias in connections
+        if hasattr(connections[alias], 'pool_stats')
+    }
+    if not stats:
+        return
+    yield '# HELP yamdb_db_pool Connection pool state and counters.'
+    yield '# TYPE yamdb_db_pool gauge'
+    for alias, values in sorted(stats.items()):
+        for key, value in sorted(values.items()):
+            pairs = (('database', alias), ('value', key))
+            yield f'yamdb_db_pool{{{_labels(pairs)}}} {value}'
+
+
+class SerializationTimingMixin:
+    """Time list and retrieve actions of a viewset minus their queries.
+
+    Querysets are evaluated in there too, so what is left is mostly the
+    serializers turning objects into data.
+    """
+    timed_actions = ('list', 'retrieve')
+
+    def dispatch(self, request, *args, **kwargs):
+        timings = current_timings.get()
+        if timings is None:
+            return super().dispatch(request, *args, **kwargs)
+        started, db_time = time.perf_counter(), timings.db_time
+        response = super().dispatch(request, *args, **kwargs)
+        if getattr(self, 'action', None) in self.timed_actions:
+            timings.serialize_time = max(0.0, (
+                time.perf_counter() - started
+                - (timings.db_time - db_time)
+            ))
+        return response
@@ -0,0 +1,107 @@
+import re
+import time
+import uuid
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .async_read import wrap_queries
+from .audit import QueryAuditor
+from .log import request_id
+from .metrics import (RequestTimings, current_timings, registry,
+                      time_queries)
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+VALID_REQUEST_ID = re.compile(r'^[\w.-]{1,64}$')
+
+
+class RequestIdMiddleware:
+    """Tag the logs of a request with an id, taken from the X-Request-ID
+    header of a proxy or generated, and return it in the response."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        incoming = request.META.get('HTTP_X_REQUEST_ID', '')
+        value = (incoming if VALID_REQUEST_ID.match(incoming)
+                 else uuid.uuid4().hex)
+        request.request_id = value
+        token = request_id.set(value)
+        try:
+            response = self.get_response(request)
+        finally:
+            request_id.reset(token)
+        response[REQUEST_ID_HEADER] = value
+        return response
+
+
+class PerformanceMiddleware:
+    """Measure every request: wall time, database queries and their
+    time, serialization and response size.
+
+    Values go to Server-Timing headers and to per-route histograms
+    served by the metrics endpoint. Without PERF_METRICS_ENABLED the
+    middleware removes itself at startup.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PERF_METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        started = time.perf_counter()
+        try:
+            with wrap_queries(time_queries):
+                response = self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        total = time.perf_counter() - started
+        self.record(request, response, timings, total)
+        return response
+
+    def record(self, request, response, timings, total):
+        match = request.resolver_match
+        labels = (
+            ('route', match.view_name if match else 'unmatched'),
+            ('method', request.method),
+        )
+        registry.observe('yamdb_request_duration_seconds', labels, total)
+        registry.observe('yamdb_db_duration_seconds', labels,
+                         timings.db_time)
+        registry.observe('yamdb_db_queries', labels, timings.db_queries)
+        spans = [
+            f'db;dur={timings.db_time * 1000:.1f};'
+            f'desc="{timings.db_queries} queries"',
+        ]
+        if timings.serialize_time is not None:
+            registry.observe('yamdb_serialize_duration_seconds', labels,
+                             timings.serialize_time)
+            spans.append(f'serialize;dur={timings.serialize_time * 1000:.1f}')
+        spans.append(f'total;dur={total * 1000:.1f}')
+        if not response.streaming:
+            registry.observe('yamdb_response_size_bytes', labels,
+                             len(response.content))
+        response['Server-Timing'] = ', '.join(spans)
+
+
+class QueryAuditMiddleware:
+    """Log repeated and slow queries of every request with the view name
+    and the project frames that ran them. Enabled by QUERY_AUDIT_ENABLED.
+    """
+
+    def __init__(self, get_response):
+        if not settings.QUERY_AUDIT_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        auditor = QueryAuditor()
+        with wrap_queries(auditor):
+            response = self.get_response(request)
+        match = request.resolver_match
+        auditor.log(match.view_name if match else request.path)
+        return response
@@ -0,0 +1,18 @@
+# Generated by Django 3.0.5 on 2026-10-18 03:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_outboxmessage'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='code',
+            name='confirmation_code',
+            field=models.CharField(max_length=32),
+        ),
+    ]
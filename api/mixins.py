@@ -0,0 +1,58 @@
+from rest_framework.generics import get_object_or_404
+
+from .custom_paginations import KeysetPagination
+
+
+class EagerLoadingMixin:
+    """Shape the queryset of a viewset for the serializer in use.
+
+    A serializer may define a ``setup_eager_loading`` static method
+    adding the joins and prefetches needed to render it.
+    """
+
+    def get_queryset(self):
+        return self.setup_eager_loading(super().get_queryset())
+
+    def setup_eager_loading(self, queryset):
+        serializer_class = self.get_serializer_class()
+        setup = getattr(serializer_class, 'setup_eager_loading', None)
+        if setup is None:
+            return queryset
+        return setup(queryset)
+
+
+class NestedParentMixin:
+    """Resolve the parent objects of a nested route once per request.
+
+    ``parent_lookups`` maps a parent name to its model and to the model
+    fields filled from the URL kwargs. A viewset instance lives for one
+    request, so permissions, serializers and saving share the object.
+    """
+    parent_lookups = {}
+
+    def get_parent(self, name):
+        parents = self.__dict__.setdefault('_parents', {})
+        if name not in parents:
+            model, lookups = self.parent_lookups[name]
+            parents[name] = get_object_or_404(model, **{
+                field: self.kwargs[kwarg]
+                for field, kwarg in lookups.items()
+            })
+        return parents[name]
+
+
+class KeysetPaginationMixin:
+    """Switch to keyset pagination when the client asks for it.
+
+    Clients opt in with ``?pagination=cursor`` and then follow the
+    ``cursor`` links; other requests keep the default paginator.
+    """
+    keyset_pagination_class = KeysetPagination
+    keyset_ordering = ('-pub_date', '-id')
+
+    @property
+    def paginator(self):
+        if ('_paginator' not in self.__dict__
+                and self.keyset_pagination_class.is_requested(self.request)):
+            self._paginator = self.keyset_pagination_class()
+        return super().paginator
@@ -1,7 +1,46 @@
 from django.db import models
+from django.utils import timezone
 
 
 class Code(models.Model):
     """The model of code. Inherited from models.Model."""
     email = models.EmailField(unique=True)
-    confirmation_code = models.CharField(max_length=12, blank=False)
+    confirmation_code = models.CharField(max_length=32, blank=False)
+
+
+class MailStatus(models.TextChoices):
+    """Delivery states of a queued email."""
+    PENDING = 'pending'
+    SENDING = 'sending'
+    SENT = 'sent'
+    FAILED = 'failed'
+
+
+class OutboxMessage(models.Model):
+    """An email waiting in the outbox for the send_queued_mail worker."""
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254, blank=True, default='')
+    to = models.EmailField()
+    status = models.CharField(
+        max_length=10,
+        choices=MailStatus.choices,
+        default=MailStatus.PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['next_attempt_at', 'id']
+        indexes = [
+            models.Index(
+                fields=['status', 'next_attempt_at'],
+                name='outbox_due_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.subject} to {self.to} ({self.status})'
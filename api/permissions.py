@@ -1,18 +1,10 @@
-import logging
+import hmac
 
+from django.conf import settings
 from rest_framework import permissions
 
 from users.models import Role
 
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    handlers=[
-        logging.FileHandler("debug.log"),
-        logging.StreamHandler()
-    ]
-)
-
 
 class IsAdminPermission(permissions.BasePermission):
     """Custom permission to only allow owners of an object to edit it."""
@@ -64,3 +56,17 @@ class AuthorOrManageSiteRolesPermission(permissions.BasePermission):
             obj.author == request.user
             or (request.user.is_admin or request.user.is_moderator)
         )
+
+
+class MetricsTokenPermission(permissions.BasePermission):
+    """Allow scrapers presenting the static METRICS_TOKEN as a bearer
+    token; nobody while the setting is empty."""
+
+    def has_permission(self, request, view):
+        token = settings.METRICS_TOKEN
+        scheme, _, credentials = request.META.get(
+            'HTTP_AUTHORIZATION', ''
+        ).partition(' ')
+        return bool(token) and scheme.lower() == 'bearer' and (
+            hmac.compare_digest(credentials.encode(), token.encode())
+        )
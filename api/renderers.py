@@ -0,0 +1,38 @@
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSON renderer encoding with orjson when it is installed.
+
+    Output is the same as the one of JSONRenderer with the default
+    settings: compact, UTF-8, U+2028 and U+2029 escaped. Datetimes and
+    other objects orjson would format differently go through the encoder
+    of DRF; only floats may be written in another exponent notation.
+    Indented output and a missing orjson fall back to JSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        indent = self.get_indent(accepted_media_type or '',
+                                 renderer_context or {})
+        if (orjson is None or data is None or indent is not None
+                or self.ensure_ascii or not self.compact):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            content = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=(orjson.OPT_NON_STR_KEYS
+                        | orjson.OPT_PASSTHROUGH_DATETIME
+                        | orjson.OPT_PASSTHROUGH_DATACLASS),
+            )
+        except orjson.JSONEncodeError:
+            # E.g. integers beyond 64 bits.
+            return super().render(data, accepted_media_type, renderer_context)
+        return (content
+                .replace('\u2028'.encode(), b'\\u2028')
+                .replace('\u2029'.encode(), b'\\u2029'))
@@ -0,0 +1,133 @@
+import contextvars
+import itertools
+import logging
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from rest_framework.permissions import SAFE_METHODS
+
+logger = logging.getLogger(__name__)
+
+PIN_COOKIE = 'yamdb_primary'
+PIN_USER_KEY = 'routing:pin:user:{pk}'
+
+# Alias of the replica the current request reads from, None for the
+# primary.
+read_database = contextvars.ContextVar('read_database', default=None)
+
+_turn = itertools.count()
+_down_until = {}
+
+
+def is_available(alias):
+    """Connect to a replica unless it failed within REPLICA_RETRY_AFTER."""
+    if _down_until.get(alias, 0) > time.monotonic():
+        return False
+    try:
+        connections[alias].ensure_connection()
+    except DatabaseError as error:
+        logger.warning('Replica %s is unavailable: %s', alias, error)
+        _down_until[alias] = time.monotonic() + settings.REPLICA_RETRY_AFTER
+        return False
+    _down_until.pop(alias, None)
+    return True
+
+
+def choose_replica():
+    """Next available replica in round-robin order, None if there is none.
+
+    One replica serves a whole request, so its queries see one snapshot.
+    """
+    replicas = settings.REPLICA_DATABASES
+    start = next(_turn)
+    for offset in range(len(replicas)):
+        alias = replicas[(start + offset) % len(replicas)]
+        if is_available(alias):
+            return alias
+    return None
+
+
+@contextmanager
+def use_primary():
+    token = read_database.set(None)
+    try:
+        yield
+    finally:
+        read_database.reset(token)
+
+
+def is_pinned(request):
+    """Whether the client wrote recently and must read its own writes."""
+    if PIN_COOKIE in request.COOKIES:
+        return True
+    user = request.user
+    return (user.is_authenticated
+            and cache.get(PIN_USER_KEY.format(pk=user.pk)) is not None)
+
+
+def pin_to_primary(request, response, user=None):
+    """Read the next requests of the client from the primary.
+
+    ``user`` is the one the client acts as from now on, e.g. the user a
+    token was just issued for; the user of the request by default.
+    """
+    seconds = settings.REPLICA_PIN_SECONDS
+    response.set_cookie(PIN_COOKIE, '1', max_age=seconds, httponly=True)
+    # Token clients often drop cookies, so the user is pinned as well.
+    user = user or request.user
+    if user.is_authenticated:
+        cache.set(PIN_USER_KEY.format(pk=user.pk), 1, seconds)
+
+
+class ReplicaRouter:
+    """Send reads to the replica chosen for the request, writes to the
+    primary."""
+
+    def db_for_read(self, model, **hints):
+        return read_database.get() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # Django writes an object back to the database it was read from.
+        instance = hints.get('instance')
+        if (instance is not None
+                and instance._state.db in settings.REPLICA_DATABASES):
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.REPLICA_DATABASES}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+
+class ReplicaReadMixin:
+    """Read safe requests of a viewset from a replica.
+
+    Authentication and permissions run on the primary first. A client
+    that has just written is pinned to the primary for
+    REPLICA_PIN_SECONDS so it sees its own changes.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        token = read_database.set(None)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            read_database.reset(token)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if (settings.REPLICA_DATABASES
+                and request.method in SAFE_METHODS
+                and not is_pinned(request)):
+            read_database.set(choose_replica())
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if (request.method not in SAFE_METHODS
+                and response.status_code < 400):
+            pin_to_primary(request, response)
+        return super().finalize_response(request, response, *args, **kwargs)
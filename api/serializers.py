@@ -1,25 +1,52 @@
 import logging
 
 from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
-from rest_framework.generics import get_object_or_404
+from rest_framework.settings import api_settings
 from rest_framework.validators import UniqueValidator
 
 from titles.models import Category, Comment, Genre, Review, Title
 
+from .codes import get_code_backend
 from .models import Code
+from .sparse import SparseFieldsetSerializerMixin
 
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    handlers=[
-        logging.FileHandler("debug.log"),
-        logging.StreamHandler()
-    ]
-)
+logger = logging.getLogger(__name__)
 
 User = get_user_model()
 
+DUPLICATE_REVIEW_ERROR = 'You already have a review for this work.'
+
+
+def with_author_username(queryset):
+    """Join the author and load only the username rendered for it."""
+    own_fields = [
+        field.attname for field in queryset.model._meta.concrete_fields
+        if field.name != 'author'
+    ]
+    return (queryset
+            .select_related('author')
+            .only(*own_fields, 'author__username'))
+
+
+class SlugLookupField(serializers.SlugRelatedField):
+    """Slug related field taking objects resolved for a whole batch
+       from the ``resolved_slugs`` context, if there are any."""
+
+    def to_internal_value(self, data):
+        name = self.field_name or self.parent.field_name
+        resolved = self.context.get('resolved_slugs', {}).get(name)
+        if resolved is None:
+            return super().to_internal_value(data)
+        if not isinstance(data, (str, int)):
+            self.fail('invalid')
+        try:
+            return resolved[str(data)]
+        except KeyError:
+            self.fail('does_not_exist', slug_name=self.slug_field,
+                      value=str(data))
+
 
 class EmailSerializer(serializers.Serializer):
     """Serializer for incoming registration email."""
@@ -45,7 +72,7 @@ class CheckEmailCodeSerializer(serializers.ModelSerializer):
     """Serializer for checking email and code exist in code model
        with default functional of ModelSerializer."""
     email = serializers.EmailField()
-    confirmation_code = serializers.CharField(max_length=32)
+    confirmation_code = serializers.CharField(max_length=64)
 
     class Meta:
         fields = '__all__'
@@ -55,18 +82,12 @@ class CheckEmailCodeSerializer(serializers.ModelSerializer):
         """
         Checking email - code combination is exists and code is correct.
         """
-
-        code_obj = get_object_or_404(Code, email=data['email'])
-        incoming_code = data['confirmation_code']
-        true_code = code_obj.confirmation_code
-        if incoming_code != true_code:
-            raise serializers.ValidationError(
-                'Confirmation code is not valide'
-            )
+        get_code_backend().verify(data['email'], data['confirmation_code'])
         return data
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsetSerializerMixin,
+                     serializers.ModelSerializer):
     """Serializer for user model with default
        functional of ModelSerializer."""
     email = serializers.EmailField(
@@ -94,7 +115,8 @@ class UserTokenSerializer(serializers.ModelSerializer):
         fields = ('username', 'email', 'password',)
 
 
-class MeSerializer(serializers.ModelSerializer):
+class MeSerializer(SparseFieldsetSerializerMixin,
+                   serializers.ModelSerializer):
     """Serializer to change your data with default
        functional of ModelSerializer."""
     email = serializers.EmailField(
@@ -114,7 +136,8 @@ class MeSerializer(serializers.ModelSerializer):
         )
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(SparseFieldsetSerializerMixin,
+                       serializers.ModelSerializer):
     """Serializer for review model with default
        functional of ModelSerializer."""
     author = serializers.SlugRelatedField(
@@ -123,29 +146,31 @@ class ReviewSerializer(serializers.ModelSerializer):
     )
 
     def validate(self, data):
-        author = self.context['request'].user
-        logging.debug(
-            f'ReviewSerializer. Validate. Checking author - {author}'
-        )
-        title_id = self.context['request']. \
-            parser_context['kwargs']['title_id']
-        logging.debug(
-            f'ReviewSerializer. Validate. Checking title id - {title_id}'
+        # Resolves the title shared with the view, a missing one is 404.
+        title = self.context['view'].get_parent('title')
+        logger.debug(
+            'ReviewSerializer. Validate. Checking title id - %s', title.pk
         )
-        title = get_object_or_404(Title, id=title_id)
-        review_exists = Review.objects.filter(
-            author=author,
-            title=title
-        ).exists()
-        if review_exists:
-            error_message = 'You already have a review for this work.'
-            raise serializers.ValidationError(error_message)
         return data
 
+    def create(self, validated_data):
+        """Create a review relying on the unique author and title pair."""
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [DUPLICATE_REVIEW_ERROR],
+            })
+
     class Meta:
         model = Review
         read_only_fields = ('title',)
-        fields = '__all__'
+        exclude = ('updated_at',)
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        return with_author_username(queryset)
 
 
 class ReviewUpdateSerializer(serializers.ModelSerializer):
@@ -159,10 +184,15 @@ class ReviewUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Review
         read_only_fields = ('title',)
-        fields = '__all__'
+        exclude = ('updated_at',)
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        return with_author_username(queryset)
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(SparseFieldsetSerializerMixin,
+                         serializers.ModelSerializer):
     """Serializer for category model with default
        functional of ModelSerializer."""
     class Meta:
@@ -170,7 +200,8 @@ class CategorySerializer(serializers.ModelSerializer):
         exclude = ('id',)
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(SparseFieldsetSerializerMixin,
+                      serializers.ModelSerializer):
     """Serializer for genre model with default
        functional of ModelSerializer."""
     class Meta:
@@ -181,35 +212,66 @@ class GenreSerializer(serializers.ModelSerializer):
 class TitleCreateSerializer(serializers.ModelSerializer):
     """Serializer for title model when creating with default
        functional of ModelSerializer."""
-    category = serializers.SlugRelatedField(
+    category = SlugLookupField(
         slug_field='slug',
         queryset=Category.objects.all()
     )
-    genre = serializers.SlugRelatedField(
+    genre = SlugLookupField(
         many=True,
         slug_field='slug',
         queryset=Genre.objects.all()
     )
-    rating = serializers.IntegerField(read_only=True,)
+    rating = serializers.FloatField(read_only=True)
 
     class Meta:
         model = Title
-        fields = '__all__'
+        exclude = (
+            'rating_sum', 'rating_count', 'updated_at', 'search_vector',
+        )
 
+    @staticmethod
+    def setup_eager_loading(queryset):
+        return (queryset
+                .select_related('category')
+                .prefetch_related('genre')
+                .defer('search_vector'))
 
-class TitleListSerializer(serializers.ModelSerializer):
+
+class TitleListSerializer(SparseFieldsetSerializerMixin,
+                          serializers.ModelSerializer):
     """Serializer for title model when we send a list of
        objects with default functional of ModelSerializer."""
     category = CategorySerializer()
     genre = GenreSerializer(many=True)
-    rating = serializers.IntegerField(read_only=True,)
+    rating = serializers.FloatField(read_only=True)
 
     class Meta:
         model = Title
-        fields = '__all__'
+        exclude = (
+            'rating_sum', 'rating_count', 'updated_at', 'search_vector',
+        )
+        expandable_fields = {'category': 'slug', 'genre': 'slug'}
 
+    @staticmethod
+    def setup_eager_loading(queryset):
+        return (queryset
+                .select_related('category')
+                .prefetch_related('genre')
+                .defer('search_vector'))
 
-class CommentSerializer(serializers.ModelSerializer):
+
+class TitleExportSerializer(TitleListSerializer):
+    """Serializer for the catalog export: a listed title with
+       its reviews, related objects are attached by the exporter."""
+    genre = GenreSerializer(many=True, source='export_genres')
+    reviews = ReviewSerializer(many=True, source='export_reviews')
+
+    class Meta(TitleListSerializer.Meta):
+        pass
+
+
+class CommentSerializer(SparseFieldsetSerializerMixin,
+                        serializers.ModelSerializer):
     """Serializer for comment model with default
        functional of ModelSerializer."""
     author = serializers.SlugRelatedField(
@@ -218,6 +280,10 @@ class CommentSerializer(serializers.ModelSerializer):
     )
 
     class Meta:
-        fields = '__all__'
+        exclude = ('updated_at',)
         read_only_fields = ('review',)
         model = Comment
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        return with_author_username(queryset)
@@ -0,0 +1,40 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from titles.models import Category, Comment, Genre, Review
+from titles.signals import post_bulk_save
+
+from .authentication import forget_user
+from .cache import invalidate_catalog
+from .conditional import touch_model
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+@receiver(post_bulk_save, sender=Category)
+@receiver(post_bulk_save, sender=Genre)
+def invalidate_catalog_cache(sender, **kwargs):
+    invalidate_catalog(sender)
+    # Titles embed categories and genres.
+    touch_model(sender)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def touch_authored(sender, **kwargs):
+    # Reviews and comments show the username, or nothing once the author
+    # is gone, without their updated_at moving.
+    touch_model(Review)
+    touch_model(Comment)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_authenticated_user(sender, instance, **kwargs):
+    """Drop the cached state of a user whose role may have changed."""
+    forget_user(instance.pk)
@@ -0,0 +1,114 @@
+from collections import namedtuple
+
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+
+from .fast_serializers import get_row_serializer
+
+FIELDS_PARAM = 'fields'
+EXPAND_PARAM = 'expand'
+
+# Names of the fields to render and of the nested objects to expand,
+# None when the client didn't restrict them.
+Fieldset = namedtuple('Fieldset', 'fields expand')
+
+
+def _names(request, param):
+    value = request.query_params.get(param)
+    if value is None:
+        return None
+    return frozenset(name.strip() for name in value.split(',')
+                     if name.strip())
+
+
+def _unknown(param, names):
+    return ValidationError({param: [
+        f'Unknown fields: {", ".join(sorted(names))}.'
+    ]})
+
+
+class SparseFieldsetSerializerMixin:
+    """Trim a serializer to the ``sparse_fieldset`` of its context.
+
+    ``Meta.expandable_fields`` maps nested objects to the slug field
+    they are rendered as when ?expand= is given without them. Nested
+    serializers render all of their fields.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        fieldset = self.context.get('sparse_fieldset')
+        if fieldset is None or not self.is_outermost():
+            return fields
+        if fieldset.fields is not None:
+            if fieldset.fields - set(fields):
+                raise _unknown(FIELDS_PARAM, fieldset.fields - set(fields))
+            for name in list(fields):
+                if name not in fieldset.fields:
+                    del fields[name]
+        if fieldset.expand is not None:
+            expandable = getattr(self.Meta, 'expandable_fields', {})
+            if fieldset.expand - set(expandable):
+                raise _unknown(EXPAND_PARAM, fieldset.expand - set(expandable))
+            for name, slug_field in expandable.items():
+                if name in fields and name not in fieldset.expand:
+                    fields[name] = serializers.SlugRelatedField(
+                        slug_field=slug_field, read_only=True,
+                        source=fields[name].source,
+                        many=isinstance(fields[name],
+                                        serializers.ListSerializer),
+                    )
+        return fields
+
+    def is_outermost(self):
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+
+class SparseFieldsetMixin:
+    """Answer ``?fields=a,b`` and ``?expand=c`` on safe requests.
+
+    Only the listed fields are rendered, and the queryset selects just
+    their columns, plus ``sparse_required_fields`` the view itself reads,
+    and prefetches just the relations they need.
+    """
+
+    def get_sparse_fieldset(self):
+        if '_sparse_fieldset' not in self.__dict__:
+            request = self.request
+            fieldset = None
+            if request is not None and request.method in SAFE_METHODS:
+                fieldset = Fieldset(_names(request, FIELDS_PARAM),
+                                    _names(request, EXPAND_PARAM))
+                if fieldset == (None, None):
+                    fieldset = None
+            self._sparse_fieldset = fieldset
+        return self._sparse_fieldset
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self.get_sparse_fieldset() is not None:
+            # Unknown names are a 400 before anything is queried.
+            self.get_serializer().fields
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['sparse_fieldset'] = self.get_sparse_fieldset()
+        return context
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fieldset = self.get_sparse_fieldset()
+        if fieldset is None:
+            return queryset
+        row_serializer = get_row_serializer(
+            self.get_serializer_class(), fieldset
+        )
+        if row_serializer is None:
+            return queryset
+        return row_serializer.narrow(
+            queryset, getattr(self, 'sparse_required_fields', ())
+        )
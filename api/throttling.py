@@ -0,0 +1,152 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+from .cache import incr_counter
+
+BUCKET_KEY = 'throttle:{scope}:{ident}'
+REJECTED_KEY = 'throttle:rejected:{scope}'
+
+
+def refill(state, now, capacity, rate):
+    """Take one token from a bucket state; return (allowed, new state)."""
+    tokens, updated = state if state is not None else (capacity, now)
+    tokens = min(capacity, tokens + (now - updated) * rate)
+    if tokens < 1:
+        return False, (tokens, now)
+    return True, (tokens - 1, now)
+
+
+class LocalBucketStore:
+    """Buckets in the memory of this process, for single-process runs.
+
+    The least recently used buckets are dropped over MAX_BUCKETS.
+    """
+    MAX_BUCKETS = 100000
+    _buckets = OrderedDict()
+    _lock = threading.Lock()
+
+    def consume(self, key, capacity, rate, now):
+        with self._lock:
+            allowed, state = refill(
+                self._buckets.pop(key, None), now, capacity, rate
+            )
+            self._buckets[key] = state
+            if len(self._buckets) > self.MAX_BUCKETS:
+                self._buckets.popitem(last=False)
+        return allowed, state
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._buckets.clear()
+
+
+class CacheBucketStore:
+    """Buckets in the Django cache, shared by all gunicorn workers.
+
+    Shared only with a shared backend such as memcached, which
+    api.checks requires on deploy.
+
+    The read and the write aren't atomic, so concurrent requests of one
+    client may occasionally get a token more than the rate allows.
+    """
+
+    def consume(self, key, capacity, rate, now):
+        allowed, state = refill(cache.get(key), now, capacity, rate)
+        # A bucket left alone until it is full again isn't needed.
+        cache.set(key, state, math.ceil(capacity / rate) + 1)
+        return allowed, state
+
+
+def get_bucket_store():
+    return import_string(settings.THROTTLE_BUCKET_STORE)()
+
+
+def throttle_rejections():
+    """Rejected requests of every configured scope."""
+    scopes = api_settings.DEFAULT_THROTTLE_RATES
+    keys = {REJECTED_KEY.format(scope=scope): scope for scope in scopes}
+    values = cache.get_many(keys)
+    return {scope: values.get(key, 0) for key, scope in keys.items()}
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """Token bucket per client: a rate of '5/min' holds up to five
+    tokens and gets one back every twelve seconds.
+
+    Unlike the history list of SimpleRateThrottle, a bucket is two
+    numbers, so every check is O(1) whatever the rate.
+    """
+
+    def get_rate(self):
+        # DRF copies the rates at import, changed settings are read here.
+        return api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+
+    def allow_request(self, request, view):
+        if self.rate is None or not settings.THROTTLING_ENABLED:
+            return True
+        ident = self.get_cache_key(request, view)
+        if ident is None:
+            return True
+        capacity, rate = self.num_requests, self.num_requests / self.duration
+        allowed, (self.tokens, _) = get_bucket_store().consume(
+            BUCKET_KEY.format(scope=self.scope, ident=ident),
+            capacity, rate, time.time(),
+        )
+        self.refill_rate = rate
+        if not allowed:
+            incr_counter(REJECTED_KEY.format(scope=self.scope))
+        return allowed
+
+    def wait(self):
+        return (1 - self.tokens) / self.refill_rate
+
+
+class AnonBucketThrottle(TokenBucketThrottle):
+    """Anonymous requests per client IP."""
+    scope = 'anon'
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return None
+        return self.get_ident(request)
+
+
+class UserBucketThrottle(TokenBucketThrottle):
+    """Authenticated requests per user."""
+    scope = 'user'
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return request.user.pk
+        return None
+
+
+class AuthIPThrottle(TokenBucketThrottle):
+    """Sign-up requests per client IP."""
+    scope = 'auth_ip'
+
+    def get_cache_key(self, request, view):
+        return self.get_ident(request)
+
+
+class AuthEmailThrottle(TokenBucketThrottle):
+    """Sign-up requests per email, whatever IPs they come from."""
+    scope = 'auth_email'
+
+    def get_cache_key(self, request, view):
+        if not isinstance(request.data, dict):
+            # A list or a scalar body; the view rejects it, count the IP.
+            return self.get_ident(request)
+        email = request.data.get('email')
+        if not isinstance(email, str) or not email:
+            return None
+        return email.strip().lower()
@@ -7,7 +7,8 @@ from rest_framework_simplejwt.views import (TokenObtainPairView,
 
 from .email_auth import get_code, get_token
 from .views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                    ReviewsViewSet, TitleViewSet, UsersViewSet)
+                    ReviewsViewSet, TitleViewSet, UsersViewSet, cache_stats,
+                    export_catalog, metrics, throttle_stats)
 
 v1_router = DefaultRouter()
 v1_router.register('users', UsersViewSet, basename='users')
@@ -38,5 +39,9 @@ AUTH_URLS = [
 urlpatterns = [
     path('v1/token/', include(TOKEN_URLS)),
     path('v1/auth/', include(AUTH_URLS)),
+    path('v1/cache/stats/', cache_stats, name='cache_stats'),
+    path('v1/throttle/stats/', throttle_stats, name='throttle_stats'),
+    path('v1/metrics/', metrics, name='metrics'),
+    path('v1/export/titles/', export_catalog, name='export_catalog'),
     path('v1/', include(v1_router.urls)),
 ]
@@ -1,37 +1,27 @@
-import logging
 import uuid
-from smtplib import SMTPException
 
 from django.conf import settings
-from django.core.mail import EmailMessage
 
 from rest_framework_simplejwt.tokens import RefreshToken
 
-logging.basicConfig(
-    level=logging.ERROR,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    handlers=[
-        logging.FileHandler("debug.log"),
-        logging.StreamHandler()
-    ]
-)
+from .authentication import add_role_claims
+from .mail import enqueue_message
 
 
 def send_message(email, generated_code):
-    """Send a message to email with generated code."""
-    mail = EmailMessage(
+    """Queue a message to email with generated code.
+
+    The send_queued_mail worker delivers it, so the request doesn't wait
+    for the SMTP server.
+    """
+    enqueue_message(
         'Confirm your email',
         generated_code,
-        settings.EMAIL_HOST_USER,
-        [email, ]
+        email,
+        from_email=settings.EMAIL_HOST_USER,
     )
-
-    try:
-        mail.send()
-        result = f'message was sended to {email} with confirmation code.'
-        return result
-    except SMTPException as e:
-        logging.exception("Exception occurred", e)
+    result = f'message was sended to {email} with confirmation code.'
+    return result
 
 
 def generate_code():
@@ -41,7 +31,7 @@ def generate_code():
 
 
 def get_tokens_for_user(user):
-    refresh = RefreshToken.for_user(user)
+    refresh = add_role_claims(RefreshToken.for_user(user), user)
     return {
         'refresh': str(refresh),
         'access': str(refresh.access_token),
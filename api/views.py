@@ -1,40 +1,51 @@
 import logging
 
 from django.contrib.auth import get_user_model
-from django.db.models import Avg
+from django.db import connections
+from django.http import HttpResponse, StreamingHttpResponse
 
 from django_filters.rest_framework import DjangoFilterBackend
 
 from rest_framework import (filters, mixins, permissions,
-                            status, viewsets)
-from rest_framework.decorators import action
-from rest_framework.generics import get_object_or_404
+                            serializers, status, viewsets)
+from rest_framework.decorators import (action, api_view,
+                                       authentication_classes,
+                                       permission_classes)
 from rest_framework.response import Response
 
 from titles.models import Category, Genre, Review, Title
 
-from .custom_paginations import StandardResultsSetPagination
-from .filters import TitlesFilter
+from .bulk import BulkUpsertMixin
+from .cache import CachedListMixin, catalog_cache_stats
+from .conditional import ConditionalGetMixin
+from .custom_paginations import (EstimatedCountPagination,
+                                 StandardResultsSetPagination)
+from .export import EXPORT_FORMATS, export_titles
+from .fast_serializers import FastListMixin
+from .filters import TitlesFilter, UsersSearchFilter
+from .metrics import (SerializationTimingMixin, counter_lines,
+                      pool_lines, registry)
+from .mixins import (EagerLoadingMixin, KeysetPaginationMixin,
+                     NestedParentMixin)
 from .permissions import (AuthorOrManageSiteRolesPermission, IsAdminPermission,
-                          IsSuperUserOrReadOnlyPermission)
+                          IsSuperUserOrReadOnlyPermission,
+                          MetricsTokenPermission)
+from .routing import ReplicaReadMixin
 from .serializers import (CategorySerializer, CommentSerializer,
                           GenreSerializer, MeSerializer, ReviewSerializer,
                           ReviewUpdateSerializer, TitleCreateSerializer,
                           TitleListSerializer, UserSerializer)
+from .sparse import SparseFieldsetMixin
+from .throttling import throttle_rejections
 
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    handlers=[
-        logging.FileHandler("debug.log"),
-        logging.StreamHandler()
-    ]
-)
+logger = logging.getLogger(__name__)
 
 User = get_user_model()
 
 
-class CategoryViewSet(viewsets.GenericViewSet,
+class CategoryViewSet(SerializationTimingMixin, ReplicaReadMixin,
+                      SparseFieldsetMixin, BulkUpsertMixin, CachedListMixin,
+                      viewsets.GenericViewSet,
                       mixins.CreateModelMixin,
                       mixins.DestroyModelMixin,
                       mixins.ListModelMixin):
@@ -49,7 +60,9 @@ class CategoryViewSet(viewsets.GenericViewSet,
     search_fields = ['=name']
 
 
-class GenreViewSet(viewsets.GenericViewSet,
+class GenreViewSet(SerializationTimingMixin, ReplicaReadMixin,
+                   SparseFieldsetMixin, BulkUpsertMixin, CachedListMixin,
+                   viewsets.GenericViewSet,
                    mixins.CreateModelMixin,
                    mixins.DestroyModelMixin,
                    mixins.ListModelMixin):
@@ -65,24 +78,31 @@ class GenreViewSet(viewsets.GenericViewSet,
     search_fields = ['=name']
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(SerializationTimingMixin, ReplicaReadMixin,
+                   SparseFieldsetMixin, BulkUpsertMixin,
+                   ConditionalGetMixin, EagerLoadingMixin,
+                   FastListMixin, viewsets.ModelViewSet):
     """A viewset for title model with default actions
        inherited from viewsets.ModelViewSet."""
-    queryset = (Title.objects
-                     .annotate(rating=Avg('reviews__score'))
-                     .order_by('-year'))
+    queryset = Title.objects.order_by('-year')
     permission_classes = [IsSuperUserOrReadOnlyPermission]
     filter_backends = [filters.SearchFilter, DjangoFilterBackend]
     search_fields = ('name', 'year', 'category', 'genre', )
     filterset_class = TitlesFilter
+    pagination_class = EstimatedCountPagination
+    conditional_models = (Category, Genre)
+    # Read by conditional GET when ?fields= leaves them out.
+    sparse_required_fields = ('updated_at',)
+    bulk_lookup = 'id'
 
     def get_serializer_class(self):
-        if self.action in ('create', 'update', 'partial_update'):
+        if self.action in ('create', 'update', 'partial_update', 'bulk'):
             return TitleCreateSerializer
         return TitleListSerializer
 
 
-class UsersViewSet(viewsets.ModelViewSet):
+class UsersViewSet(SerializationTimingMixin, ReplicaReadMixin,
+                   SparseFieldsetMixin, viewsets.ModelViewSet):
     """A viewset for user model with default actions
        inherited from viewsets.ModelViewSet."""
     queryset = User.objects.all()
@@ -91,10 +111,16 @@ class UsersViewSet(viewsets.ModelViewSet):
         permissions.IsAuthenticated,
         IsAdminPermission,
     ]
-    filter_backends = [filters.SearchFilter]
+    filter_backends = [UsersSearchFilter]
     search_fields = ['username', ]
+    pagination_class = EstimatedCountPagination
     lookup_field = 'username'
 
+    def get_serializer_class(self):
+        if self.action == 'me':
+            return MeSerializer
+        return super().get_serializer_class()
+
     @action(detail=False,
             methods=['patch', 'GET'],
             permission_classes=[permissions.IsAuthenticated],
@@ -103,13 +129,13 @@ class UsersViewSet(viewsets.ModelViewSet):
         if request.user.is_authenticated:
             user = User.objects.filter(pk=request.user.pk).first()
             if request.method == 'GET':
-                user_serializer = MeSerializer(user)
+                user_serializer = self.get_serializer(user)
                 return Response(
                     user_serializer.data, status=status.HTTP_200_OK
                 )
 
             if request.method == 'PATCH':
-                user_serializer = MeSerializer(
+                user_serializer = self.get_serializer(
                     user,
                     data=request.data,
                     partial=True
@@ -129,7 +155,11 @@ class UsersViewSet(viewsets.ModelViewSet):
         )
 
 
-class ReviewsViewSet(viewsets.ModelViewSet):
+class ReviewsViewSet(SerializationTimingMixin, ReplicaReadMixin,
+                     SparseFieldsetMixin, ConditionalGetMixin,
+                     EagerLoadingMixin, KeysetPaginationMixin,
+                     NestedParentMixin, FastListMixin,
+                     viewsets.ModelViewSet):
     """A viewset for review model with default actions
        inherited from viewsets.ModelViewSet."""
     permission_classes = [
@@ -138,29 +168,39 @@ class ReviewsViewSet(viewsets.ModelViewSet):
     ]
     filter_backends = [filters.SearchFilter, ]
     search_fields = ['title_id', ]
+    pagination_class = EstimatedCountPagination
+    # Conditional GET and the cursor read them when ?fields= leaves them
+    # out.
+    sparse_required_fields = ('updated_at', 'pub_date')
     lookup_fields = ['title_id', 'review_id', ]
+    parent_lookups = {
+        'title': (Title, {'pk': 'title_id'}),
+    }
 
     def get_serializer_class(self):
-        logging.debug(
-            f'ReviewsViewSet. get_serializer_class. Action - {self.action}'
+        logger.debug(
+            'ReviewsViewSet. get_serializer_class. Action - %s', self.action
         )
         if self.action == 'partial_update':
             return ReviewUpdateSerializer
         return ReviewSerializer
 
     def get_queryset(self):
-        title_id = self.kwargs.get('title_id')
-        title = get_object_or_404(Title, pk=title_id)
-        logging.debug(f'ReviewsViewSet, get_queryset. Title - {title}')
-        return title.reviews.all()
+        title = self.get_parent('title')
+        logger.debug('ReviewsViewSet, get_queryset. Title - %s', title)
+        return self.setup_eager_loading(title.reviews.all())
 
     def perform_create(self, serializer):
-        title_id = self.kwargs.get('title_id')
-        title = get_object_or_404(Title, id=title_id)
-        serializer.save(author=self.request.user, title=title)
+        serializer.save(
+            author=self.request.user, title=self.get_parent('title')
+        )
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(SerializationTimingMixin, ReplicaReadMixin,
+                     SparseFieldsetMixin, ConditionalGetMixin,
+                     EagerLoadingMixin, KeysetPaginationMixin,
+                     NestedParentMixin, FastListMixin,
+                     viewsets.ModelViewSet):
     """A viewset for comment model with default actions
        inherited from viewsets.ModelViewSet."""
     serializer_class = CommentSerializer
@@ -169,20 +209,81 @@ class CommentViewSet(viewsets.ModelViewSet):
         AuthorOrManageSiteRolesPermission,
     ]
     pagination_class = StandardResultsSetPagination
+    keyset_ordering = ('pub_date', 'id')
+    sparse_required_fields = ('updated_at', 'pub_date')
     lookup_fields = ['title_id', 'review_id', 'comment_id', ]
+    parent_lookups = {
+        'review': (Review, {'pk': 'review_id', 'title_id': 'title_id'}),
+    }
 
     def get_queryset(self):
-        review_id = self.kwargs.get('review_id')
-        title_id = self.kwargs.get('title_id')
-        review = get_object_or_404(
-            Review, id=review_id, title__id=title_id
-        )
-        return review.comments.all()
+        review = self.get_parent('review')
+        return self.setup_eager_loading(review.comments.all())
 
     def perform_create(self, serializer):
-        review_id = self.kwargs.get('review_id')
-        title_id = self.kwargs.get('title_id')
-        review = get_object_or_404(
-            Review, id=review_id, title__id=title_id
+        serializer.save(
+            author=self.request.user, review=self.get_parent('review')
+        )
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated, IsAdminPermission])
+def cache_stats(request):
+    """Hit and miss counters of the catalog cache for monitoring."""
+    return Response(catalog_cache_stats(), status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated, IsAdminPermission])
+def throttle_stats(request):
+    """Requests rejected by every throttle scope for monitoring."""
+    return Response(throttle_rejections(), status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated, IsAdminPermission])
+def export_catalog(request):
+    """Stream all titles with genres and reviews as NDJSON or CSV."""
+    output = request.query_params.get('output', 'ndjson')
+    if output not in EXPORT_FORMATS:
+        raise serializers.ValidationError(
+            {'output': f'Choose one of: {", ".join(EXPORT_FORMATS)}.'}
         )
-        serializer.save(author=self.request.user, review=review)
+    lines, content_type = EXPORT_FORMATS[output]
+    response = StreamingHttpResponse(
+        lines(export_titles()), content_type=content_type
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="titles.{output}"'
+    )
+    return response
+
+
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([MetricsTokenPermission])
+def metrics(request):
+    """Request histograms of this worker with the cache and throttle
+       counters, in the Prometheus text format.
+
+    Histograms and pool gauges are per worker process: every scrape
+    reaches one gunicorn worker, so sum them up over the instance label
+    of each worker or run a single worker per container. The cache and
+    throttle counters are shared.
+    """
+    lines = registry.render()
+    lines.extend(counter_lines(
+        'yamdb_catalog_cache_events_total',
+        'Catalog cache hits, misses and invalidations.',
+        catalog_cache_stats(), 'event',
+    ))
+    lines.extend(counter_lines(
+        'yamdb_throttle_rejections_total',
+        'Requests rejected by throttles.',
+        throttle_rejections(), 'scope',
+    ))
+    lines.extend(pool_lines(connections))
+    return HttpResponse(
+        '\n'.join(lines) + '\n',
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
@@ -0,0 +1,72 @@
+"""PostgreSQL backend taking connections from a per-process pool.
+
+Select it with ENGINE 'api_yamdb.pooled_postgresql' and size the pool
+with the POOL key of the database settings. Closing a connection at the
+end of a request (CONN_MAX_AGE = 0) hands it back to the pool.
+"""
+import os
+import threading
+
+from django.db.backends.postgresql import base
+
+from .pool import ConnectionPool, PoolTimeout
+
+POOL_DEFAULTS = {
+    'MIN_SIZE': 1,
+    'MAX_SIZE': 10,
+    'MAX_LIFETIME': 30 * 60,
+    'TIMEOUT': 10,
+    'CHECK_IDLE': 10,
+}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    _pools = {}
+    _pools_lock = threading.Lock()
+
+    @property
+    def pool(self):
+        with self._pools_lock:
+            pool = self._pools.get(self.alias)
+            # A forked worker must not share the sockets of its parent.
+            if pool is None or pool.pid != os.getpid():
+                options = {
+                    **POOL_DEFAULTS, **self.settings_dict.get('POOL', {}),
+                }
+                pool = self._pools[self.alias] = ConnectionPool(
+                    min_size=options['MIN_SIZE'],
+                    max_size=options['MAX_SIZE'],
+                    max_lifetime=options['MAX_LIFETIME'],
+                    timeout=options['TIMEOUT'],
+                    check_idle=options['CHECK_IDLE'],
+                )
+            return pool
+
+    def get_new_connection(self, conn_params):
+        pool = self.pool
+
+        def connect():
+            return super(DatabaseWrapper, self).get_new_connection(
+                conn_params
+            )
+
+        pool.fill(connect)
+        try:
+            connection = pool.getconn(connect)
+        except PoolTimeout as error:
+            raise base.Database.OperationalError(str(error)) from error
+        self.isolation_level = self.settings_dict['OPTIONS'].get(
+            'isolation_level', connection.isolation_level
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is None:
+            return
+        with self.wrap_database_errors:
+            if self.errors_occurred and not self.is_usable():
+                self.connection.close()
+            self.pool.putconn(self.connection)
+
+    def pool_stats(self):
+        return self.pool.stats()
@@ -0,0 +1,158 @@
+import collections
+import os
+import threading
+import time
+
+IdleConnection = collections.namedtuple(
+    'IdleConnection', 'connection created_at released_at'
+)
+
+
+class PoolTimeout(Exception):
+    """No connection became free within the pool timeout."""
+
+
+class ConnectionPool:
+    """Thread-safe pool of DB-API connections of one worker process.
+
+    Up to ``max_size`` connections are open at a time; a caller finding
+    them all busy waits up to ``timeout`` seconds. Connections older than
+    ``max_lifetime`` are closed instead of reused, and ones idle longer
+    than ``check_idle`` seconds are checked with a query first.
+    """
+
+    def __init__(self, min_size=1, max_size=10, max_lifetime=30 * 60,
+                 timeout=10, check_idle=10):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.timeout = timeout
+        self.check_idle = check_idle
+        self.pid = os.getpid()
+        self._idle = collections.deque()
+        self._created_at = {}
+        self._size = 0
+        self._condition = threading.Condition()
+        self.counters = collections.Counter()
+
+    def _reserve(self):
+        """An idle connection, or None after reserving room for a new one.
+
+        Waits while the pool is full.
+        """
+        deadline = time.monotonic() + self.timeout
+        waited_since = None
+        with self._condition:
+            while not self._idle and self._size >= self.max_size:
+                if waited_since is None:
+                    waited_since = time.monotonic()
+                    self.counters['waits'] += 1
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.counters['timeouts'] += 1
+                    raise PoolTimeout(
+                        f'No free connection in {self.timeout} seconds.'
+                    )
+                self._condition.wait(remaining)
+            if waited_since is not None:
+                self.counters['wait_seconds'] += (
+                    time.monotonic() - waited_since
+                )
+            if self._idle:
+                # The most recently used connection is the least likely
+                # to be dropped by the server.
+                return self._idle.pop()
+            self._size += 1
+            return None
+
+    def getconn(self, connect):
+        """A healthy connection, opened with ``connect()`` if needed."""
+        while True:
+            idle = self._reserve()
+            if idle is None:
+                return self._open(connect)
+            if self._is_healthy(idle):
+                self.counters['reused'] += 1
+                return idle.connection
+            self._discard(idle.connection)
+
+    def fill(self, connect):
+        """Open connections up to min_size."""
+        while True:
+            with self._condition:
+                if self._size >= self.min_size:
+                    return
+                self._size += 1
+            self.putconn(self._open(connect))
+
+    def _open(self, connect):
+        try:
+            connection = connect()
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+        self._created_at[id(connection)] = time.monotonic()
+        self.counters['opened'] += 1
+        return connection
+
+    def _is_expired(self, connection):
+        created_at = self._created_at.get(id(connection), 0)
+        return time.monotonic() - created_at > self.max_lifetime
+
+    def _is_healthy(self, idle):
+        connection = idle.connection
+        if connection.closed:
+            return False
+        if self._is_expired(connection):
+            self.counters['recycled'] += 1
+            return False
+        if time.monotonic() - idle.released_at < self.check_idle:
+            return True
+        self.counters['checks'] += 1
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+        except Exception:
+            return False
+        return True
+
+    def putconn(self, connection):
+        """Take a connection back; broken or expired ones are closed."""
+        if connection.closed or self._is_expired(connection):
+            self._discard(connection)
+            return
+        if not connection.autocommit:
+            try:
+                connection.rollback()
+            except Exception:
+                self._discard(connection)
+                return
+        with self._condition:
+            self._idle.append(IdleConnection(
+                connection, self._created_at[id(connection)],
+                time.monotonic(),
+            ))
+            self._condition.notify()
+
+    def _discard(self, connection):
+        self._created_at.pop(id(connection), None)
+        try:
+            connection.close()
+        except Exception:
+            pass
+        with self._condition:
+            self._size -= 1
+            self.counters['closed'] += 1
+            self._condition.notify()
+
+    def stats(self):
+        with self._condition:
+            idle = len(self._idle)
+            return dict(
+                self.counters,
+                size=self._size,
+                idle=idle,
+                in_use=self._size - idle,
+            )
@@ -28,6 +28,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'corsheaders',
     'django_filters',
@@ -36,6 +37,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.RequestIdMiddleware',
+    'api.middleware.PerformanceMiddleware',
+    'api.middleware.QueryAuditMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -48,6 +52,66 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'api_yamdb.urls'
 
+PERF_METRICS_ENABLED = os.getenv('PERF_METRICS', 'false').lower() == 'true'
+
+# Bearer token of the Prometheus scraper for /api/v1/metrics/; the
+# endpoint is closed while it is empty.
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+QUERY_AUDIT_ENABLED = os.getenv('QUERY_AUDIT', 'false').lower() == 'true'
+
+QUERY_AUDIT_DUPLICATE_THRESHOLD = 3
+
+QUERY_AUDIT_SLOW_MS = 100
+
+QUERY_AUDIT_STACK_DEPTH = 5
+
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json': {
+            '()': 'api.log.JsonFormatter',
+        },
+    },
+    'filters': {
+        'request_id': {
+            '()': 'api.log.RequestIdFilter',
+        },
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'json',
+        },
+        'queue': {
+            '()': 'api.log.QueueListenerHandler',
+            'handlers': ['cfg://handlers.console'],
+            'filters': ['request_id'],
+        },
+    },
+    'root': {
+        'handlers': ['queue'],
+        'level': 'WARNING',
+    },
+    'loggers': {
+        'django': {
+            'level': os.getenv('DJANGO_LOG_LEVEL', 'INFO'),
+        },
+        'api': {
+            'level': LOG_LEVEL,
+        },
+        'titles': {
+            'level': LOG_LEVEL,
+        },
+        'users': {
+            'level': LOG_LEVEL,
+        },
+    },
+}
+
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 TEMPLATES = [
     {
@@ -67,31 +131,144 @@ TEMPLATES = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
+    ],
+
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
     ],
 
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
 
     'PAGE_SIZE': 3,
+
+    # nginx appends the client address to X-Forwarded-For; addresses
+    # before it come from the client and are not trusted by throttles.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', 1)),
+
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api.throttling.AnonBucketThrottle',
+        'api.throttling.UserBucketThrottle',
+    ],
+
+    'DEFAULT_THROTTLE_RATES': {
+        'anon': '300/min',
+        'user': '1200/min',
+        'auth_ip': '20/min',
+        'auth_email': '5/min',
+    },
 }
 
+# THROTTLING=false lets every request through, e.g. for load tests.
+THROTTLING_ENABLED = os.getenv('THROTTLING', 'true').lower() == 'true'
+
+THROTTLE_BUCKET_STORE = os.getenv(
+    'THROTTLE_BUCKET_STORE', 'api.throttling.CacheBucketStore'
+)
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=10),
 }
 
+# Saves drop the entry in the shared cache; the timeout only bounds
+# writes that bypass the signals, such as queryset updates.
+AUTH_USER_CACHE_TIMEOUT = 60
+
 WSGI_APPLICATION = 'api_yamdb.wsgi.application'
 
+# DB_ENGINE=api_yamdb.pooled_postgresql takes connections from a pool
+# of every worker, use it with CONN_MAX_AGE=0.
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': os.environ.get(
+            'DB_ENGINE', 'django.db.backends.postgresql'
+        ),
         'NAME': os.environ.get('DB_NAME'),
         'USER': os.environ.get('POSTGRES_USER'),
         'PASSWORD': os.environ.get('POSTGRES_PASSWORD'),
         'HOST': os.environ.get('DB_HOST'),
         'PORT': os.environ.get('DB_PORT'),
+        'CONN_MAX_AGE': int(os.environ.get('CONN_MAX_AGE', 60)),
+        'POOL': {
+            'MIN_SIZE': int(os.environ.get('DB_POOL_MIN_SIZE', 1)),
+            'MAX_SIZE': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+            'MAX_LIFETIME': int(os.environ.get('DB_POOL_MAX_LIFETIME', 1800)),
+            'TIMEOUT': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        },
+    }
+}
+
+# Comma-separated hosts of read replicas of the default database.
+REPLICA_DATABASES = []
+for number, host in enumerate(
+        filter(None, os.environ.get('DB_REPLICA_HOSTS', '').split(',')), 1):
+    alias = f'replica_{number}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST': host.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+    REPLICA_DATABASES.append(alias)
+
+DATABASE_ROUTERS = ['api.routing.ReplicaRouter']
+
+# Clients read from the primary for this long after they write.
+REPLICA_PIN_SECONDS = int(os.environ.get('REPLICA_PIN_SECONDS', 5))
+
+# A replica that failed to connect is skipped for this long.
+REPLICA_RETRY_AFTER = 30
+
+# Throttle buckets, used confirmation codes, the catalog and the
+# authenticated users must be seen by every worker: `check --deploy`
+# fails on a process-local backend.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'yamdb'),
     }
 }
 
+CATALOG_CACHE_TIMEOUT = 60 * 60
+
+# Change moments of models behind conditional GET validators.
+CONDITIONAL_MOMENT_TIMEOUT = 24 * 60 * 60
+
+PAGINATION_COUNT_CACHE_TIMEOUT = 30
+
+PAGINATION_ESTIMATE_THRESHOLD = 100000
+
+EXPORT_CHUNK_SIZE = 2000
+
+# List actions render .values() rows without the DRF field machinery.
+FAST_LIST_SERIALIZERS = (
+    os.getenv('FAST_LIST_SERIALIZERS', 'true').lower() == 'true'
+)
+
+BULK_MAX_ITEMS = 1000
+
+MAIL_QUEUE_BATCH_SIZE = 100
+
+MAIL_MAX_ATTEMPTS = 5
+
+MAIL_RETRY_BACKOFF = 30
+
+MAIL_RETRY_MAX_DELAY = 60 * 60
+
+# A claimed message no worker reported on is sent again after this.
+MAIL_CLAIM_TIMEOUT = 10 * 60
+
+# Sent and failed messages are deleted from the outbox after this.
+MAIL_OUTBOX_RETENTION = 7 * 24 * 60 * 60
+
+CONFIRMATION_CODE_BACKEND = os.getenv(
+    'CONFIRMATION_CODE_BACKEND', 'api.codes.TableCodeBackend'
+)
+
+CONFIRMATION_CODE_MAX_AGE = 60 * 60 * 24
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -137,8 +314,8 @@ AUTH_USER_MODEL = 'users.User'
 
 load_dotenv()
 
-EMAIL_HOST = 'smtp.gmail.com'
-EMAIL_PORT = 587
-EMAIL_USE_TLS = True
+EMAIL_HOST = os.getenv('EMAIL_HOST', 'smtp.gmail.com')
+EMAIL_PORT = int(os.getenv('EMAIL_PORT', 587))
+EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'true').lower() == 'true'
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
@@ -2,12 +2,15 @@ from django.contrib import admin
 from django.urls import include, path
 from django.views.generic import TemplateView
 
+from api.health import healthz, readyz
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView)
 
 urlpatterns = [
     path(r'admindesert/', admin.site.urls),
+    path('healthz', healthz, name='healthz'),
+    path('readyz', readyz, name='readyz'),
     path('api/', include('api.urls')),
     path('redoc/', TemplateView.as_view(template_name='redoc.html'),
          name='redoc'),
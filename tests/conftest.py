@@ -1,9 +1,21 @@
 import sys
 from os.path import abspath, dirname
 
+import pytest
+
 root_dir = dirname(dirname(abspath(__file__)))
 sys.path.append(root_dir)
 
 
 pytest_plugins = [
+    'tests.fixtures.fixture_query_audit',
+    'tests.fixtures.fixture_shared_cache',
 ]
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import cache
+    cache.clear()
+    yield
+    cache.clear()
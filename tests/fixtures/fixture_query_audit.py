@@ -0,0 +1,40 @@
+from contextlib import ExitStack, contextmanager
+
+import pytest
+from django.db import connections
+
+from api.audit import QueryAuditor
+
+
+@pytest.fixture
+def query_audit():
+    """Assert a query budget for the code in the block.
+
+        with query_audit(max_queries=4):
+            client.get('/api/v1/titles/')
+
+    Repeated queries fail the test from ``max_duplicates`` + 1 runs of
+    one fingerprint on; slow ones when ``slow_ms`` is given.
+    """
+
+    @contextmanager
+    def audit(max_queries=None, max_duplicates=1, slow_ms=None):
+        auditor = QueryAuditor(
+            duplicate_threshold=max_duplicates + 1,
+            slow_ms=slow_ms or float('inf'),
+        )
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(
+                    connections[alias].execute_wrapper(auditor)
+                )
+            yield auditor
+        problems = auditor.duplicates or auditor.slow or (
+            max_queries is not None and auditor.total > max_queries
+        )
+        assert not problems, (
+            f'Query budget exceeded (max {max_queries}):\n'
+            f'{auditor.report()}'
+        )
+
+    return audit
@@ -0,0 +1,36 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from django.conf import settings as django_settings
+
+BACKEND = 'django.core.cache.backends.filebased.FileBasedCache'
+
+
+@pytest.fixture
+def other_process(settings, tmp_path):
+    """Share the cache with another process and run code in it.
+
+        other_process('from api.authentication import forget_user; '
+                      'forget_user(1)')
+
+    Both processes use a file based cache in a temporary directory, as
+    gunicorn workers share memcached.
+    """
+    location = str(tmp_path / 'cache')
+    settings.CACHES = {'default': {'BACKEND': BACKEND, 'LOCATION': location}}
+
+    def run(code):
+        env = dict(
+            os.environ,
+            DJANGO_SETTINGS_MODULE='tests.settings_qa',
+            CACHE_BACKEND=BACKEND,
+            CACHE_LOCATION=location,
+        )
+        subprocess.run(
+            [sys.executable, '-c', f'import django; django.setup(); {code}'],
+            cwd=django_settings.BASE_DIR, env=env, check=True,
+        )
+
+    return run
@@ -4,5 +4,15 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
-    }
+    },
+    # Used as a replica by the routing tests only.
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'replica.sqlite3'),
+    },
 }
+
+REPLICA_DATABASES = []
+
+# Outbox tests read delivered mail from django.core.mail.outbox.
+EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
@@ -0,0 +1,169 @@
+import contextvars
+import json
+import re
+import threading
+
+import pytest
+from asgiref.sync import async_to_sync
+from asgiref.testing import ApplicationCommunicator
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from api import custom_paginations
+from api.async_read import ASGIHandler, run_concurrently
+from api.utils import get_tokens_for_user
+from titles.models import Comment, Review, Title
+
+User = get_user_model()
+
+
+def asgi_request(path, query='', headers=()):
+    """Status, headers and body of a GET served by the ASGI application."""
+    scope = {
+        'type': 'http', 'http_version': '1.1', 'scheme': 'http',
+        'method': 'GET', 'path': path, 'root_path': '',
+        'query_string': query.encode(),
+        'headers': [(b'host', b'testserver'), *headers],
+        'server': ('testserver', 80), 'client': ('127.0.0.1', 5000),
+    }
+
+    async def communicate():
+        communicator = ApplicationCommunicator(ASGIHandler(), scope)
+        await communicator.send_input({'type': 'http.request', 'body': b''})
+        start = await communicator.receive_output(5)
+        body = b''
+        while True:
+            message = await communicator.receive_output(5)
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                break
+        await communicator.wait()
+        headers = {name.decode().lower(): value.decode()
+                   for name, value in start['headers']}
+        return start['status'], headers, body
+    return async_to_sync(communicate)()
+
+
+def asgi_get(path, query=''):
+    status, _, body = asgi_request(path, query)
+    return status, json.loads(body)
+
+
+def queries(server_timing):
+    return int(re.search(r'"(\d+) queries"', server_timing).group(1))
+
+
+def wsgi_get(path, query=''):
+    data = APIClient().get(f'{path}?{query}').json()
+    # The ASGI request must count again instead of reading the cache.
+    cache.clear()
+    return data
+
+
+@pytest.fixture
+def review():
+    title = Title.objects.create(name='Сталкер', year=1979)
+    for number in range(3):
+        Title.objects.create(name=f'Фильм {number}', year=1990 + number)
+    author = User.objects.create(username='author', email='a@yamdb.fake')
+    review = Review.objects.create(
+        title=title, author=author, text='Хорошо', score=9
+    )
+    for number in range(5):
+        Comment.objects.create(
+            review=review, author=author, text=f'Комментарий {number}'
+        )
+    return review
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAsyncRead:
+
+    @pytest.mark.parametrize('query', ['', 'limit=2&offset=1', 'offset=50'])
+    def test_titles_match_wsgi(self, review, query):
+        expected = wsgi_get('/api/v1/titles/', query)
+        assert asgi_get('/api/v1/titles/', query) == (200, expected), (
+            'Проверьте, что под ASGI список произведений совпадает с WSGI'
+        )
+
+    def test_reviews_match_wsgi(self, review):
+        path = f'/api/v1/titles/{review.title_id}/reviews/'
+        expected = wsgi_get(path)
+        assert asgi_get(path) == (200, expected)
+
+    @pytest.mark.parametrize('query', ['page_size=2', 'page_size=2&page=3',
+                                       'page=last&page_size=2'])
+    def test_comments_match_wsgi(self, review, query):
+        path = (f'/api/v1/titles/{review.title_id}/reviews/'
+                f'{review.id}/comments/')
+        expected = wsgi_get(path, query)
+        assert asgi_get(path, query) == (200, expected)
+
+    def test_count_runs_with_page_query(self, review, monkeypatch):
+        calls = []
+
+        def spy(*functions):
+            calls.append(len(functions))
+            return run_concurrently(*functions)
+
+        monkeypatch.setattr(custom_paginations, 'run_concurrently', spy)
+        asgi_get('/api/v1/titles/')
+        APIClient().get('/api/v1/titles/?limit=1')
+        assert calls == [2], (
+            'Проверьте, что под ASGI подсчёт идёт одновременно с выборкой '
+            'страницы, а под WSGI порядок не изменился'
+        )
+
+    def test_page_out_of_range(self, review):
+        path = (f'/api/v1/titles/{review.title_id}/reviews/'
+                f'{review.id}/comments/')
+        status, _ = asgi_get(path, 'page=9')
+        assert status == 404
+
+    def test_export_streams(self, review):
+        admin = User.objects.create(
+            username='root', email='root@yamdb.fake', is_staff=True
+        )
+        token = get_tokens_for_user(admin)['access']
+        status, _, body = asgi_request(
+            '/api/v1/export/titles/',
+            headers=[(b'authorization', f'Bearer {token}'.encode())],
+        )
+        rows = [json.loads(line) for line in body.decode().splitlines()]
+        assert status == 200
+        assert [row['id'] for row in rows] == sorted(
+            Title.objects.values_list('id', flat=True)
+        ), 'Проверьте, что под ASGI выгрузка каталога отдаёт все строки'
+        assert rows[0]['reviews'][0]['text'] == 'Хорошо'
+
+    def test_worker_queries_are_measured(self, review, settings):
+        settings.PERF_METRICS_ENABLED = True
+        path = f'/api/v1/titles/{review.title_id}/reviews/'
+        expected = queries(APIClient().get(path)['Server-Timing'])
+        cache.clear()
+        _, headers, _ = asgi_request(path)
+        assert queries(headers['server-timing']) == expected, (
+            'Проверьте, что под ASGI учитываются запросы рабочих потоков'
+        )
+
+
+class TestRunConcurrently:
+
+    def test_functions_overlap(self):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def meet():
+            # Passes only when the other function runs at the same time.
+            return barrier.wait() is not None
+
+        assert run_concurrently(meet, meet) == [True, True], (
+            'Проверьте, что функции выполняются одновременно'
+        )
+
+    def test_context_is_passed(self):
+        variable = contextvars.ContextVar('variable')
+        variable.set('запрос')
+        assert run_concurrently(variable.get, variable.get) == [
+            'запрос', 'запрос',
+        ]
@@ -0,0 +1,156 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save
+from rest_framework.test import APIClient
+
+from titles.models import Category, Genre, Title
+from titles.signals import post_bulk_save
+
+User = get_user_model()
+
+
+@pytest.fixture
+def client():
+    client = APIClient()
+    client.force_authenticate(User.objects.create(
+        username='root', email='root@yamdb.fake', is_superuser=True
+    ))
+    return client
+
+
+@pytest.fixture
+def catalog():
+    Category.objects.create(name='Фильм', slug='movie')
+    Genre.objects.create(name='Драма', slug='drama')
+    Genre.objects.create(name='Криминал', slug='crime')
+
+
+@pytest.mark.django_db
+class TestBulkUpsert:
+
+    def test_categories_are_created_and_updated(self, client, catalog):
+        response = client.post('/api/v1/categories/bulk/', [
+            {'name': 'Кино', 'slug': 'movie'},
+            {'name': 'Книга', 'slug': 'book'},
+        ], format='json')
+        assert response.status_code == 200, response.json()
+        assert response.json() == [
+            {'status': 'updated', 'slug': 'movie'},
+            {'status': 'created', 'slug': 'book'},
+        ]
+        assert dict(Category.objects.values_list('slug', 'name')) == {
+            'movie': 'Кино', 'book': 'Книга',
+        }, 'Проверьте, что пакетная запись создаёт и обновляет категории'
+
+    def test_titles_in_constant_queries(self, client, catalog,
+                                        django_assert_max_num_queries):
+        existing = Title.objects.create(name='Старое', year=1990)
+        items = [
+            {'name': f'Фильм {number}', 'year': 2000 + number,
+             'category': 'movie', 'genre': ['drama', 'crime']}
+            for number in range(20)
+        ]
+        items.append({'id': existing.id, 'name': 'Новое', 'year': 1991,
+                      'category': 'movie', 'genre': ['crime']})
+        # Creating titles one by one is the fallback without RETURNING.
+        with django_assert_max_num_queries(16 + 20 * 2):
+            response = client.post('/api/v1/titles/bulk/', items,
+                                   format='json')
+        assert response.status_code == 200, response.json()
+        existing.refresh_from_db()
+        assert (existing.name, existing.year) == ('Новое', 1991)
+        assert list(existing.genre.values_list('slug', flat=True)) == [
+            'crime'
+        ], 'Проверьте, что жанры произведения заменяются'
+        assert Title.genre.through.objects.count() == 41
+        listed = client.get('/api/v1/titles/?name=Фильм 7').json()
+        assert listed['results'][0]['category']['slug'] == 'movie'
+
+    def test_errors_are_reported_per_item(self, client, catalog):
+        response = client.post('/api/v1/titles/bulk/', [
+            {'name': 'Хорошее', 'year': 2000, 'category': 'movie',
+             'genre': ['drama']},
+            {'name': 'Плохое', 'year': 2000, 'category': 'none',
+             'genre': ['drama', 'unknown']},
+            {'id': 999, 'name': 'Нет', 'year': 2000, 'category': 'movie',
+             'genre': []},
+            {'id': 'abc', 'name': 'Новое', 'year': 2000,
+             'category': 'movie', 'genre': []},
+        ], format='json')
+        assert response.status_code == 400
+        errors = response.json()
+        assert errors[0] == {}
+        assert set(errors[1]) == {'category', 'genre'}, (
+            'Проверьте, что ошибки возвращаются для каждого элемента'
+        )
+        assert 'id' in errors[2]
+        assert 'id' in errors[3], (
+            'Проверьте, что неверный id не превращает элемент в новый'
+        )
+        assert not Title.objects.exists(), (
+            'Проверьте, что пакет с ошибками не записывается'
+        )
+
+    def test_titles_are_signalled_once(self, client, catalog):
+        signalled = []
+
+        def on_save(sender, instance, **kwargs):
+            signalled.append(instance.name)
+
+        def on_bulk_save(sender, instances, **kwargs):
+            signalled.extend(instance.name for instance in instances)
+
+        post_save.connect(on_save, sender=Title)
+        post_bulk_save.connect(on_bulk_save, sender=Title)
+        try:
+            response = client.post('/api/v1/titles/bulk/', [
+                {'name': name, 'year': 2000, 'category': 'movie',
+                 'genre': ['drama']}
+                for name in ('Первое', 'Второе')
+            ], format='json')
+        finally:
+            post_save.disconnect(on_save, sender=Title)
+            post_bulk_save.disconnect(on_bulk_save, sender=Title)
+        assert response.status_code == 200, response.json()
+        assert sorted(signalled) == ['Второе', 'Первое'], (
+            'Проверьте, что каждое произведение получает один сигнал '
+            'о сохранении'
+        )
+
+    def test_repeated_slug(self, client):
+        response = client.post('/api/v1/genres/bulk/', [
+            {'name': 'Драма', 'slug': 'drama'},
+            {'name': 'Драма 2', 'slug': 'drama'},
+        ], format='json')
+        assert response.status_code == 400
+        assert 'slug' in response.json()[1]
+
+    def test_unique_names(self, client, catalog,
+                          django_assert_max_num_queries):
+        Category.objects.create(name='Музыка', slug='music')
+        with django_assert_max_num_queries(4):
+            response = client.post('/api/v1/categories/bulk/', [
+                {'name': 'Музыка', 'slug': 'new'},
+                {'name': 'Книга', 'slug': 'book'},
+                {'name': 'Книга', 'slug': 'other'},
+                {'name': 'Фильм', 'slug': 'movie'},
+            ], format='json')
+        assert response.status_code == 400, (
+            'Проверьте, что занятое имя категории даёт ошибку, а не 500'
+        )
+        errors = response.json()
+        assert list(errors[0]) == ['name']
+        assert errors[1] == {}
+        assert errors[2] == {'name': ['Repeated in the batch.']}
+        assert errors[3] == {}, (
+            'Проверьте, что категория может сохранить своё имя'
+        )
+        assert Category.objects.count() == 2
+
+    def test_requires_list_and_admin(self, client):
+        response = client.post('/api/v1/genres/bulk/', {'name': 'x'},
+                               format='json')
+        assert response.status_code == 400
+        assert APIClient().post(
+            '/api/v1/genres/bulk/', [], format='json'
+        ).status_code == 401
@@ -0,0 +1,90 @@
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.utils import get_tokens_for_user
+
+User = get_user_model()
+
+
+@pytest.fixture
+def admin():
+    return User.objects.create(
+        username='root', email='root@yamdb.fake', role='admin'
+    )
+
+
+def client_for(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {get_tokens_for_user(user)["access"]}'
+    )
+    return client
+
+
+@pytest.mark.django_db
+class TestCachedJWTAuthentication:
+
+    def test_token_carries_role_claims(self, admin):
+        token = AccessToken(get_tokens_for_user(admin)['access'])
+        assert (token['role'], token['is_staff'], token['is_superuser']) == (
+            'admin', False, False
+        ), 'Проверьте, что роль пользователя записана в токен'
+
+    def test_no_auth_queries_when_cached(self, admin,
+                                         django_assert_num_queries):
+        client = client_for(admin)
+        client.get('/api/v1/categories/')
+        with django_assert_num_queries(0):
+            response = client.get('/api/v1/categories/')
+        assert response.status_code == 200, (
+            'Проверьте, что пользователь берётся из кэша без запросов к БД'
+        )
+
+    def test_role_change_applies_at_once(self, admin):
+        moderator = User.objects.create(
+            username='moder', email='moder@yamdb.fake', role='moderator'
+        )
+        moderator_client = client_for(moderator)
+        assert moderator_client.get('/api/v1/users/').status_code == 403
+
+        response = client_for(admin).patch(
+            '/api/v1/users/moder/', {'role': 'admin'}, format='json'
+        )
+        assert response.status_code == 200
+        assert moderator_client.get('/api/v1/users/').status_code == 200, (
+            'Проверьте, что смена роли сбрасывает кэш пользователя'
+        )
+
+    def test_deleted_and_inactive_users(self, admin):
+        user = User.objects.create(username='gone', email='g@yamdb.fake')
+        client = client_for(user)
+        assert client.get('/api/v1/users/me/').status_code == 200
+        user.is_active = False
+        user.save()
+        assert client.get('/api/v1/users/me/').status_code == 401
+        user.delete()
+        assert client.get('/api/v1/users/me/').status_code == 401
+
+    def test_request_user_loads_other_fields_lazily(self, admin):
+        admin.bio = 'Администратор'
+        admin.save()
+        response = client_for(admin).get('/api/v1/users/me/')
+        assert response.json()['bio'] == 'Администратор'
+
+    def test_ban_in_other_process_applies_at_once(self, admin,
+                                                  other_process):
+        client = client_for(admin)
+        assert client.get('/api/v1/users/').status_code == 200
+
+        # Saved by another worker: its post_save reaches only its cache.
+        User.objects.filter(pk=admin.pk).update(is_active=False)
+        other_process(
+            'from api.authentication import forget_user; '
+            f'forget_user({admin.pk})'
+        )
+
+        assert client.get('/api/v1/users/').status_code == 401, (
+            'Проверьте, что бан в другом процессе сразу отзывает доступ'
+        )
@@ -0,0 +1,91 @@
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from api.cache import catalog_cache_stats
+from titles.models import Category, Genre
+
+User = get_user_model()
+
+
+@pytest.fixture
+def superuser_client():
+    user = User.objects.create(
+        username='root', email='root@yamdb.fake', is_superuser=True
+    )
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+@pytest.mark.django_db
+class TestCatalogCache:
+
+    def test_list_is_served_from_cache(self, django_assert_num_queries):
+        Genre.objects.create(name='Драма', slug='drama')
+        client = APIClient()
+
+        first = client.get('/api/v1/genres/')
+        with django_assert_num_queries(0):
+            second = client.get('/api/v1/genres/')
+
+        assert first.json() == second.json(), (
+            'Проверьте, что кэшированный ответ совпадает с исходным'
+        )
+        stats = catalog_cache_stats()
+        assert (stats['hit'], stats['miss']) == (1, 1), (
+            'Проверьте, что счётчики попаданий и промахов кэша растут'
+        )
+
+    def test_query_string_is_part_of_key(self):
+        Genre.objects.create(name='Драма', slug='drama')
+        Genre.objects.create(name='Комедия', slug='comedy')
+        client = APIClient()
+
+        client.get('/api/v1/genres/')
+        response = client.get('/api/v1/genres/', {'slug': 'drama'})
+
+        assert response.json()['count'] == 1, (
+            'Проверьте, что ответы кэшируются отдельно для каждого запроса'
+        )
+
+    def test_api_create_invalidates(self, superuser_client):
+        superuser_client.get('/api/v1/categories/')
+        superuser_client.post(
+            '/api/v1/categories/', {'name': 'Фильм', 'slug': 'movie'}
+        )
+
+        response = superuser_client.get('/api/v1/categories/')
+        assert response.json()['count'] == 1, (
+            'Проверьте, что создание категории сбрасывает кэш'
+        )
+
+    def test_model_delete_invalidates(self):
+        category = Category.objects.create(name='Фильм', slug='movie')
+        client = APIClient()
+        client.get('/api/v1/categories/')
+
+        Category.objects.filter(pk=category.pk).delete()
+
+        response = client.get('/api/v1/categories/')
+        assert response.json()['count'] == 0, (
+            'Проверьте, что удаление категории (в том числе из админки) '
+            'сбрасывает кэш'
+        )
+
+    def test_invalidation_reaches_other_processes(self, other_process):
+        client = APIClient()
+        client.get('/api/v1/categories/')
+
+        # Written and invalidated by another worker or import_csv.
+        Category.objects.bulk_create([Category(name='Фильм', slug='movie')])
+        other_process(
+            'from api.cache import invalidate_catalog; '
+            'from titles.models import Category; '
+            'invalidate_catalog(Category)'
+        )
+
+        response = client.get('/api/v1/categories/')
+        assert response.json()['count'] == 1, (
+            'Проверьте, что кэш каталога общий для всех процессов'
+        )
@@ -0,0 +1,95 @@
+import csv
+import io
+import json
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from titles.models import Category, Genre, Review, Title
+
+User = get_user_model()
+
+
+@pytest.fixture
+def catalog():
+    movie = Category.objects.create(name='Фильм', slug='movie')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    crime = Genre.objects.create(name='Криминал', slug='crime')
+    author = User.objects.create(username='critic', email='c@yamdb.fake')
+    titles = []
+    for number in range(4):
+        title = Title.objects.create(
+            name=f'Фильм {number}', year=2000 + number, category=movie
+        )
+        title.genre.set([drama, crime][:number % 3])
+        titles.append(title)
+    for title in titles[1::2]:
+        Review.objects.create(
+            title=title, author=author, text='Хорошо', score=8
+        )
+    return titles
+
+
+@pytest.fixture
+def admin_client():
+    client = APIClient()
+    client.force_authenticate(User.objects.create(
+        username='root', email='root@yamdb.fake', is_staff=True
+    ))
+    return client
+
+
+def streamed(response):
+    return b''.join(response.streaming_content).decode()
+
+
+@pytest.mark.django_db
+class TestCatalogExport:
+
+    def test_ndjson_matches_api_shapes(self, catalog, admin_client):
+        response = admin_client.get('/api/v1/export/titles/')
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'application/x-ndjson'
+        rows = [json.loads(line) for line in streamed(response).splitlines()]
+
+        assert [row['id'] for row in rows] == [title.id for title in catalog]
+        for row in rows:
+            listed = admin_client.get(f'/api/v1/titles/{row["id"]}/').json()
+            reviews = admin_client.get(
+                f'/api/v1/titles/{row["id"]}/reviews/'
+            ).json()['results']
+            assert row == dict(listed, reviews=reviews), (
+                'Проверьте, что выгрузка повторяет формат произведений и '
+                'отзывов из API'
+            )
+
+    def test_csv(self, catalog, admin_client):
+        response = admin_client.get('/api/v1/export/titles/?output=csv')
+        rows = list(csv.DictReader(io.StringIO(streamed(response))))
+        assert len(rows) == len(catalog)
+        assert {genre['slug'] for genre in json.loads(rows[2]['genre'])} == {
+            'drama', 'crime',
+        }, 'Проверьте, что вложенные значения CSV записаны в JSON'
+
+    def test_constant_number_of_queries(self, catalog, admin_client,
+                                        django_assert_max_num_queries):
+        with django_assert_max_num_queries(8):
+            streamed(admin_client.get('/api/v1/export/titles/'))
+
+    def test_admin_only(self, catalog):
+        client = APIClient()
+        assert client.get('/api/v1/export/titles/').status_code == 401
+        client.force_authenticate(
+            User.objects.create(username='user', email='u@yamdb.fake')
+        )
+        assert client.get('/api/v1/export/titles/').status_code == 403, (
+            'Проверьте, что выгрузка доступна только администратору'
+        )
+
+    def test_command_writes_file(self, catalog, tmp_path):
+        path = tmp_path / 'titles.ndjson'
+        call_command('export_catalog', str(path), stdout=io.StringIO())
+        lines = path.read_text(encoding='utf-8').splitlines()
+        assert len(lines) == len(catalog)
@@ -0,0 +1,158 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from titles.models import Genre, Review, Title
+
+User = get_user_model()
+
+
+@pytest.fixture
+def title():
+    return Title.objects.create(name='Крестный отец', year=1972)
+
+
+@pytest.fixture
+def review(title):
+    author = User.objects.create(username='author', email='a@yamdb.fake')
+    return Review.objects.create(
+        title=title, author=author, text='text', score=9
+    )
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+
+    @pytest.mark.parametrize('url', [
+        '/api/v1/titles/',
+        '/api/v1/titles/{title.id}/',
+        '/api/v1/titles/{title.id}/reviews/',
+        '/api/v1/titles/{title.id}/reviews/{review.id}/comments/',
+    ])
+    def test_repeat_request_is_not_modified(self, url, title, review):
+        client = APIClient()
+        url = url.format(title=title, review=review)
+
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.has_header('ETag'), (
+            f'Проверьте, что {url} отдаёт заголовок ETag'
+        )
+        assert response.has_header('Last-Modified'), (
+            f'Проверьте, что {url} отдаёт заголовок Last-Modified'
+        )
+
+        repeated = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert repeated.status_code == 304, (
+            f'Проверьте, что {url} отвечает 304 на совпадающий ETag'
+        )
+        assert not repeated.content
+
+        since = client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        assert since.status_code == 304, (
+            f'Проверьте, что {url} учитывает If-Modified-Since'
+        )
+
+    def test_new_review_changes_etag(self, title, review):
+        client = APIClient()
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        etag = client.get(url)['ETag']
+
+        author = User.objects.create(username='other', email='o@yamdb.fake')
+        Review.objects.create(
+            title=title, author=author, text='text', score=1
+        )
+
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что новый отзыв меняет ETag списка отзывов'
+        )
+        title_response = client.get('/api/v1/titles/')
+        assert title_response.json()['results'][0]['rating'] == 5
+
+    def test_deletion_and_genre_change_invalidate(self, title, review):
+        client = APIClient()
+        etag = client.get('/api/v1/titles/')['ETag']
+
+        Genre.objects.create(name='Драма', slug='drama')
+        assert client.get(
+            '/api/v1/titles/', HTTP_IF_NONE_MATCH=etag
+        ).status_code == 200, (
+            'Проверьте, что изменение жанров меняет ETag произведений'
+        )
+
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        etag = client.get(url)['ETag']
+        review.delete()
+        assert client.get(
+            url, HTTP_IF_NONE_MATCH=etag
+        ).status_code == 200, (
+            'Проверьте, что удаление отзыва меняет ETag списка отзывов'
+        )
+
+    def test_validators_come_from_one_aggregate(self, title, review):
+        with CaptureQueriesContext(connection) as context:
+            response = APIClient().get(
+                f'/api/v1/titles/{title.id}/reviews/?pagination=cursor'
+            )
+        assert response.has_header('ETag')
+        aggregates = [query['sql'] for query in context.captured_queries
+                      if 'MAX(' in query['sql']]
+        assert len(aggregates) == 1 and 'title_id' in aggregates[0], (
+            'Проверьте, что ETag строится одним запросом по отзывам '
+            'произведения'
+        )
+
+    def test_writes_without_signals_change_etag(self, title, review):
+        client = APIClient()
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        etag = client.get(url)['ETag']
+        # E.g. another worker or an import: nothing reaches this cache.
+        Review.objects.bulk_create([Review(
+            title=title, text='text', score=2,
+            author=User.objects.create(username='o', email='o@yamdb.fake'),
+        )])
+        cache.clear()
+        assert client.get(
+            url, HTTP_IF_NONE_MATCH=etag
+        ).status_code == 200, (
+            'Проверьте, что ETag строится по данным базы, а не по кэшу'
+        )
+
+    def test_author_rename_changes_etag(self, title, review):
+        client = APIClient()
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        etag = client.get(url)['ETag']
+        review.author.username = 'renamed'
+        review.author.save()
+        assert client.get(
+            url, HTTP_IF_NONE_MATCH=etag
+        ).status_code == 200, (
+            'Проверьте, что смена имени автора меняет ETag отзывов'
+        )
+
+    def test_reviews_change_only_their_title(self, title, review):
+        client = APIClient()
+        other = Title.objects.create(name='Сталкер', year=1979)
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        etag = client.get(url)['ETag']
+        titles_etag = client.get('/api/v1/titles/')['ETag']
+
+        Review.objects.create(
+            title=other, author=review.author, text='text', score=3
+        )
+        assert client.get(
+            url, HTTP_IF_NONE_MATCH=etag
+        ).status_code == 304, (
+            'Проверьте, что отзыв к другому произведению не меняет ETag'
+        )
+        assert client.get(
+            '/api/v1/titles/', HTTP_IF_NONE_MATCH=titles_etag
+        ).status_code == 200, (
+            'Проверьте, что изменение рейтинга меняет ETag произведений'
+        )
@@ -0,0 +1,65 @@
+import pytest
+from rest_framework.test import APIClient
+
+from api.codes import SignedCodeBackend
+from api.models import Code, OutboxMessage
+
+SIGNED = 'api.codes.SignedCodeBackend'
+
+
+def request_code(email):
+    response = APIClient().post('/api/v1/auth/email/', {'email': email})
+    assert response.status_code == 200
+    return OutboxMessage.objects.filter(to=email).latest('id').body
+
+
+def request_token(email, code, username='newbie'):
+    return APIClient().post('/api/v1/auth/token/', {
+        'email': email, 'confirmation_code': code, 'username': username,
+    })
+
+
+@pytest.mark.django_db
+class TestConfirmationCodes:
+
+    def test_table_backend_is_default(self, settings):
+        assert settings.CONFIRMATION_CODE_BACKEND == (
+            'api.codes.TableCodeBackend'
+        )
+        first = request_code('new@yamdb.fake')
+        second = request_code('new@yamdb.fake')
+        assert Code.objects.get().confirmation_code == second != first, (
+            'Проверьте, что повторный запрос заменяет код'
+        )
+        response = request_token('new@yamdb.fake', second)
+        assert response.status_code == 200
+        assert 'access' in response.json()
+
+    def test_signed_backend_issues_without_queries(
+            self, settings, django_assert_num_queries):
+        settings.CONFIRMATION_CODE_BACKEND = SIGNED
+        with django_assert_num_queries(0):
+            code = SignedCodeBackend().issue('new@yamdb.fake')
+        assert len(code) <= 64
+        assert not Code.objects.exists()
+
+    def test_signed_code_works_once(self, settings):
+        settings.CONFIRMATION_CODE_BACKEND = SIGNED
+        code = request_code('new@yamdb.fake')
+        assert not Code.objects.exists(), (
+            'Проверьте, что подписанные коды не хранятся в таблице'
+        )
+        assert request_token('new@yamdb.fake', code).status_code == 200
+        response = request_token('new@yamdb.fake', code, username='again')
+        assert response.status_code == 400, (
+            'Проверьте, что код подтверждения можно использовать один раз'
+        )
+
+    def test_signed_code_is_bound_to_email_and_age(self, settings):
+        settings.CONFIRMATION_CODE_BACKEND = SIGNED
+        code = request_code('new@yamdb.fake')
+        assert request_token('other@yamdb.fake', code).status_code == 400
+        settings.CONFIRMATION_CODE_MAX_AGE = -1
+        assert request_token('new@yamdb.fake', code).status_code == 400, (
+            'Проверьте, что просроченный код отклоняется'
+        )
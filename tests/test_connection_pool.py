@@ -0,0 +1,124 @@
+import threading
+import time
+
+import pytest
+from django.test import Client
+
+from api_yamdb.pooled_postgresql.pool import ConnectionPool, PoolTimeout
+
+
+class FakeCursor:
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def execute(self, sql):
+        if self.connection.broken:
+            raise RuntimeError('server closed the connection')
+
+
+class FakeConnection:
+
+    def __init__(self):
+        self.closed = False
+        self.broken = False
+        self.autocommit = False
+        self.rollbacks = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+class TestConnectionPool:
+
+    def test_reuses_returned_connection(self):
+        pool = ConnectionPool(min_size=0, max_size=2)
+        first = pool.getconn(FakeConnection)
+        pool.putconn(first)
+        assert pool.getconn(FakeConnection) is first, (
+            'Проверьте, что возвращённое в пул соединение используется снова'
+        )
+        assert pool.counters['opened'] == 1
+        assert pool.counters['reused'] == 1
+
+    def test_rolls_back_on_return(self):
+        pool = ConnectionPool(min_size=0)
+        connection = pool.getconn(FakeConnection)
+        pool.putconn(connection)
+        assert connection.rollbacks == 1, (
+            'Проверьте, что незавершённая транзакция откатывается при '
+            'возврате соединения в пул'
+        )
+
+    def test_waits_for_free_connection(self):
+        pool = ConnectionPool(min_size=0, max_size=1, timeout=2)
+        connection = pool.getconn(FakeConnection)
+        timer = threading.Timer(0.05, pool.putconn, [connection])
+        timer.start()
+        assert pool.getconn(FakeConnection) is connection
+        timer.join()
+        assert pool.counters['waits'] == 1
+
+    def test_times_out_when_exhausted(self):
+        pool = ConnectionPool(min_size=0, max_size=1, timeout=0.05)
+        pool.getconn(FakeConnection)
+        with pytest.raises(PoolTimeout):
+            pool.getconn(FakeConnection)
+        assert pool.counters['timeouts'] == 1
+        assert pool.stats()['size'] == 1
+
+    def test_recycles_old_connections(self):
+        pool = ConnectionPool(min_size=0, max_lifetime=0)
+        old = pool.getconn(FakeConnection)
+        time.sleep(0.01)
+        pool.putconn(old)
+        assert old.closed, (
+            'Проверьте, что соединение старше max_lifetime закрывается'
+        )
+        assert pool.getconn(FakeConnection) is not old
+
+    def test_health_check_drops_broken_connection(self):
+        pool = ConnectionPool(min_size=0, check_idle=0)
+        broken = pool.getconn(FakeConnection)
+        pool.putconn(broken)
+        broken.broken = True
+        fresh = pool.getconn(FakeConnection)
+        assert fresh is not broken and broken.closed, (
+            'Проверьте, что соединение, не прошедшее проверку, закрывается'
+        )
+        assert pool.stats()['size'] == 1
+
+    def test_fill_opens_min_size(self):
+        pool = ConnectionPool(min_size=2, max_size=4)
+        pool.fill(FakeConnection)
+        assert pool.stats() == dict(
+            pool.counters, size=2, idle=2, in_use=0
+        )
+
+
+@pytest.mark.django_db
+class TestHealthChecks:
+
+    def test_liveness(self):
+        response = Client().get('/healthz')
+        assert response.status_code == 200
+        assert response.json() == {'status': 'ok'}
+
+    def test_readiness(self):
+        response = Client().get('/readyz')
+        assert response.status_code == 200, (
+            'Проверьте, что /readyz отвечает 200, когда база доступна'
+        )
+        assert response.json()['checks']['db'] == 'ok'
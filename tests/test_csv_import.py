@@ -0,0 +1,123 @@
+import csv
+import io
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+
+from titles.csv_import import IdSet
+from titles.models import Comment, Genre, Review, Title
+from titles.ratings import inconsistent_ratings
+
+DATA_DIR = settings.BASE_DIR + '/data'
+
+
+def csv_rows(name):
+    with open(f'{DATA_DIR}/{name}', encoding='utf-8', newline='') as file:
+        return list(csv.DictReader(file))
+
+
+@pytest.mark.django_db
+class TestCsvImport:
+
+    def test_imports_seed_files(self):
+        out = io.StringIO()
+        call_command('import_csv', data_dir=DATA_DIR, batch_size=7,
+                     stdout=out)
+
+        assert Title.objects.count() == len(csv_rows('titles.csv'))
+        assert Genre.objects.count() == len(csv_rows('genre.csv'))
+        reviews = {(row['author'], row['title_id'])
+                   for row in csv_rows('review.csv')}
+        assert Review.objects.count() == len(reviews), (
+            'Проверьте, что импорт загружает по одному отзыву автора на '
+            'произведение'
+        )
+        assert Comment.objects.count() == len(csv_rows('comments.csv'))
+        assert not inconsistent_ratings(Title.objects.all()).exists(), (
+            'Проверьте, что после импорта рейтинги произведений пересчитаны'
+        )
+        first = csv_rows('review.csv')[0]
+        review = Review.objects.get(pk=first['id'])
+        assert review.pub_date.isoformat().startswith(
+            first['pub_date'][:19]
+        ), 'Проверьте, что импорт сохраняет дату публикации из файла'
+        assert 'rows/s' in out.getvalue()
+
+    def test_can_run_again(self):
+        call_command('import_csv', data_dir=DATA_DIR, stdout=io.StringIO())
+        counts = [model.objects.count() for model in (Title, Review, Comment)]
+        out = io.StringIO()
+        call_command('import_csv', data_dir=DATA_DIR, batch_size=7,
+                     stdout=out)
+
+        assert [model.objects.count()
+                for model in (Title, Review, Comment)] == counts, (
+            'Проверьте, что повторный импорт пропускает загруженные строки'
+        )
+        rows = len(csv_rows('review.csv'))
+        assert f'review.csv: 0 rows, {rows} skipped' in out.getvalue()
+
+    def test_skips_rows_with_unknown_references(self, tmp_path):
+        (tmp_path / 'genre.csv').write_text(
+            'id,name,slug\n1,Драма,drama\n', encoding='utf-8'
+        )
+        (tmp_path / 'titles.csv').write_text(
+            'id,name,year,category\n1,Побег,1994,\n2,Мост,1957,\n',
+            encoding='utf-8',
+        )
+        (tmp_path / 'genre_title.csv').write_text(
+            'id,title_id,genre_id\n1,1,1\n2,2,9\n3,5,1\n', encoding='utf-8'
+        )
+        for name, header in (('users.csv', 'id,username,email,role,'
+                              'description,first_name,last_name'),
+                             ('category.csv', 'id,name,slug'),
+                             ('review.csv', 'id,title_id,text,author,'
+                              'score,pub_date'),
+                             ('comments.csv', 'id,review_id,text,author,'
+                              'pub_date')):
+            (tmp_path / name).write_text(header + '\n', encoding='utf-8')
+
+        out = io.StringIO()
+        call_command('import_csv', data_dir=str(tmp_path), stdout=out)
+
+        assert list(Title.genre.through.objects.values_list('id', flat=True)
+                    ) == [1], (
+            'Проверьте, что строки со ссылками на несуществующие объекты '
+            'пропускаются'
+        )
+        assert 'genre_title.csv: 1 rows, 2 skipped' in out.getvalue()
+
+    def test_skips_rows_without_dates(self, tmp_path):
+        files = {
+            'users.csv': 'id,username,email,role,description,first_name,'
+                         'last_name\n1,bingobongo,b@yamdb.fake,user,,,\n',
+            'category.csv': 'id,name,slug\n',
+            'genre.csv': 'id,name,slug\n',
+            'titles.csv': 'id,name,year,category\n1,Побег,1994,\n'
+                          '2,Мост,1957,\n',
+            'genre_title.csv': 'id,title_id,genre_id\n',
+            'review.csv': 'id,title_id,text,author,score,pub_date\n'
+                          '1,1,text,1,5,2019-09-24T21:08:21.567Z\n'
+                          '2,2,text,1,7,\n',
+            'comments.csv': 'id,review_id,text,author,pub_date\n'
+                            '1,1,text,1,\n',
+        }
+        for name, text in files.items():
+            (tmp_path / name).write_text(text, encoding='utf-8')
+
+        out = io.StringIO()
+        call_command('import_csv', data_dir=str(tmp_path), stdout=out)
+
+        assert list(Review.objects.values_list('id', flat=True)) == [1], (
+            'Проверьте, что отзывы без даты не импортируются'
+        )
+        assert not Comment.objects.exists()
+        assert 'review.csv: 1 rows, 1 skipped' in out.getvalue()
+
+    def test_id_set(self):
+        ids = IdSet()
+        for value in (1, 8, 1000):
+            ids.add(value)
+        assert 8 in ids and 1000 in ids
+        assert 2 not in ids and 10 ** 6 not in ids
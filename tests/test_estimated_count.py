@@ -0,0 +1,29 @@
+import pytest
+from rest_framework.test import APIClient
+
+from titles.models import Title
+
+
+@pytest.mark.django_db
+class TestEstimatedCount:
+
+    def test_count_is_cached_per_filter(self):
+        Title.objects.create(name='Побег из Шоушенка', year=1994)
+        client = APIClient()
+
+        first = client.get('/api/v1/titles/').json()
+        assert (first['count'], first['count_exact']) == (1, True), (
+            'Проверьте, что первый ответ содержит точное число записей'
+        )
+
+        Title.objects.create(name='Крестный отец', year=1972)
+        cached = client.get('/api/v1/titles/', {'offset': 1}).json()
+        assert (cached['count'], cached['count_exact']) == (1, False), (
+            'Проверьте, что число записей берётся из кэша и помечается '
+            'как неточное'
+        )
+
+        filtered = client.get('/api/v1/titles/', {'year': 1972}).json()
+        assert (filtered['count'], filtered['count_exact']) == (1, True), (
+            'Проверьте, что кэш числа записей учитывает параметры фильтра'
+        )
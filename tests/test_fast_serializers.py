@@ -0,0 +1,121 @@
+import datetime
+import decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from api.fast_serializers import get_row_serializer
+from api.renderers import FastJSONRenderer
+from api.serializers import TitleExportSerializer, TitleListSerializer
+from titles.models import Category, Comment, Genre, Review, Title
+
+User = get_user_model()
+
+
+@pytest.fixture
+def catalog():
+    film = Category.objects.create(name='Фильм', slug='film')
+    genres = [
+        Genre.objects.create(name=name, slug=slug)
+        for name, slug in (('Драма', 'drama'), ('Комедия', 'comedy'),
+                           ('Фантастика', 'sci-fi'))
+    ]
+    authors = [
+        User.objects.create(username=f'author{number}',
+                            email=f'a{number}@yamdb.fake')
+        for number in range(3)
+    ]
+    titles = []
+    for number in range(4):
+        title = Title.objects.create(
+            name=f'Фильм {number}', year=1990 + number,
+            category=film if number % 2 else None,
+            description='Описание строкой' if number == 1 else None,
+        )
+        title.genre.set(genres[:number])
+        titles.append(title)
+    for author in authors:
+        review = Review.objects.create(
+            title=titles[1], author=author, text='Текст', score=7
+        )
+        Comment.objects.create(review=review, author=author, text='Да')
+    return titles[1]
+
+
+def both(url):
+    """Response bodies with the fast path turned on and off."""
+    bodies = []
+    for enabled in (True, False):
+        # Both requests count instead of one reading the cached count.
+        cache.clear()
+        with override_settings(FAST_LIST_SERIALIZERS=enabled):
+            response = APIClient().get(url)
+            assert response.status_code == 200
+            bodies.append(response.content)
+    return bodies
+
+
+@pytest.mark.django_db
+class TestFastListSerializers:
+
+    @pytest.mark.parametrize('query', ['', '?limit=2&offset=1',
+                                       '?genre=drama', '?category=film'])
+    def test_titles_are_identical(self, catalog, query):
+        fast, regular = both(f'/api/v1/titles/{query}')
+        assert fast == regular, (
+            'Проверьте, что быстрый список произведений совпадает '
+            'побайтно с обычным'
+        )
+
+    @pytest.mark.parametrize('query', ['', '?pagination=cursor&page_size=2'])
+    def test_reviews_are_identical(self, catalog, query):
+        fast, regular = both(f'/api/v1/titles/{catalog.id}/reviews/{query}')
+        assert fast == regular
+
+    def test_comments_are_identical(self, catalog):
+        review = catalog.reviews.first()
+        fast, regular = both(
+            f'/api/v1/titles/{catalog.id}/reviews/{review.id}/comments/'
+        )
+        assert fast == regular
+
+    def test_titles_page_queries(self, catalog, django_assert_num_queries):
+        # Validators for conditional GET, count, page and the genres of
+        # the page.
+        with django_assert_num_queries(4):
+            APIClient().get('/api/v1/titles/')
+
+    def test_unsupported_serializer_falls_back(self):
+        assert get_row_serializer(TitleListSerializer) is not None
+        assert get_row_serializer(TitleExportSerializer) is None, (
+            'Проверьте, что сериализаторы с неизвестными полями остаются '
+            'на обычном пути'
+        )
+
+
+class TestFastJSONRenderer:
+
+    def test_output_matches_json_renderer(self):
+        data = {
+            'text': 'Кино   и "кавычки"',
+            'date': datetime.datetime(
+                2021, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc
+            ),
+            'price': decimal.Decimal('1.50'),
+            'nested': [{'id': 1, 'none': None, 'flag': True}],
+            3: 'число',
+        }
+        assert FastJSONRenderer().render(data) == (
+            JSONRenderer().render(data)
+        ), 'Проверьте, что быстрый рендерер выдаёт тот же JSON'
+
+    def test_indent_falls_back(self):
+        data = {'id': 1}
+        context = {'indent': 4}
+        assert FastJSONRenderer().render(data, None, context) == (
+            JSONRenderer().render(data, None, context)
+        )
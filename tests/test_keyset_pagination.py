@@ -0,0 +1,105 @@
+import datetime
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from titles.models import Comment, Review, Title
+
+User = get_user_model()
+
+
+@pytest.fixture
+def title():
+    return Title.objects.create(name='Крестный отец', year=1972)
+
+
+@pytest.fixture
+def reviews(title):
+    moment = timezone.now()
+    reviews = []
+    for number in range(7):
+        author = User.objects.create(
+            username=f'author{number}', email=f'a{number}@yamdb.fake'
+        )
+        reviews.append(Review.objects.create(
+            title=title, author=author, text='text', score=5
+        ))
+        # Pairs of reviews share a date to exercise the id tiebreak.
+        Review.objects.filter(pk=reviews[-1].pk).update(
+            pub_date=moment + datetime.timedelta(seconds=number // 2)
+        )
+    return reviews
+
+
+def walk(client, url, link):
+    pages = []
+    while url:
+        data = client.get(url).json()
+        pages.append([row['id'] for row in data['results']])
+        url = data[link]
+    return pages
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+
+    def test_default_pagination_is_unchanged(self, title, reviews):
+        data = APIClient().get(f'/api/v1/titles/{title.id}/reviews/').json()
+        assert 'count' in data, (
+            'Проверьте, что без ?pagination=cursor ответ не изменился'
+        )
+
+    def test_walks_reviews_forward_and_back(self, title, reviews):
+        client = APIClient()
+        expected = list(
+            Review.objects.order_by('-pub_date', '-id')
+            .values_list('id', flat=True)
+        )
+
+        pages = walk(
+            client,
+            f'/api/v1/titles/{title.id}/reviews/'
+            f'?pagination=cursor&page_size=3',
+            'next',
+        )
+        assert [len(page) for page in pages] == [3, 3, 1]
+        assert sum(pages, []) == expected, (
+            'Проверьте, что курсорная пагинация отдаёт все отзывы по '
+            'порядку без пропусков и повторов'
+        )
+
+        last_page = client.get(
+            f'/api/v1/titles/{title.id}/reviews/'
+            f'?pagination=cursor&page_size=3'
+        ).json()
+        second = client.get(last_page['next']).json()
+        back = client.get(second['previous']).json()
+        assert [row['id'] for row in back['results']] == expected[:3], (
+            'Проверьте, что ссылка previous возвращает на прошлую страницу'
+        )
+        assert back['previous'] is None
+
+    def test_walks_comments(self, title, reviews):
+        review = reviews[0]
+        for number in range(5):
+            Comment.objects.create(
+                review=review, author=review.author, text=str(number)
+            )
+        pages = walk(
+            APIClient(),
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+            f'?pagination=cursor&page_size=2',
+            'next',
+        )
+        assert sum(pages, []) == list(
+            Comment.objects.order_by('pub_date', 'id')
+            .values_list('id', flat=True)
+        )
+
+    def test_broken_cursor(self, title):
+        response = APIClient().get(
+            f'/api/v1/titles/{title.id}/reviews/?cursor=broken'
+        )
+        assert response.status_code == 404
@@ -0,0 +1,67 @@
+import json
+import logging
+
+import pytest
+from rest_framework.test import APIClient
+
+from api.log import JsonFormatter, RequestIdFilter, request_id
+
+
+def make_record(message, *args):
+    return logging.LogRecord(
+        'api.views', logging.INFO, __file__, 1, message, args, None
+    )
+
+
+class TestStructuredLogging:
+
+    def test_json_line_with_request_id(self):
+        token = request_id.set('abc123')
+        try:
+            record = make_record('Title - %s', 'Крестный отец')
+            RequestIdFilter().filter(record)
+        finally:
+            request_id.reset(token)
+        entry = json.loads(JsonFormatter().format(record))
+        assert entry['message'] == 'Title - Крестный отец'
+        assert (entry['level'], entry['logger'], entry['request_id']) == (
+            'INFO', 'api.views', 'abc123'
+        ), 'Проверьте, что запись содержит уровень, логгер и id запроса'
+
+    def test_records_go_through_queue(self):
+        # pytest adds its own capturing handlers to the root logger.
+        names = {type(handler).__name__
+                 for handler in logging.getLogger().handlers}
+        assert 'QueueListenerHandler' in names, (
+            'Проверьте, что логи пишутся через очередь'
+        )
+        assert 'FileHandler' not in names
+        assert logging.getLogger('api').getEffectiveLevel() == logging.INFO
+
+
+@pytest.mark.django_db
+class TestRequestIdMiddleware:
+
+    def test_request_id_is_returned(self):
+        response = APIClient().get(
+            '/api/v1/genres/', HTTP_X_REQUEST_ID='edge-42'
+        )
+        assert response['X-Request-ID'] == 'edge-42'
+        generated = APIClient().get(
+            '/api/v1/genres/', HTTP_X_REQUEST_ID='bad id\n'
+        )['X-Request-ID']
+        assert len(generated) == 32, (
+            'Проверьте, что некорректный id запроса заменяется новым'
+        )
+
+    def test_request_id_of_error_responses(self, caplog):
+        caplog.handler.addFilter(RequestIdFilter())
+        with caplog.at_level(logging.WARNING, logger='django.request'):
+            response = APIClient().get(
+                '/api/v1/titles/0/', HTTP_X_REQUEST_ID='edge-404'
+            )
+        assert response.status_code == 404
+        assert [record.request_id for record in caplog.records
+                if record.name == 'django.request'] == ['edge-404'], (
+            'Проверьте, что записи об ответах 4xx содержат id запроса'
+        )
@@ -0,0 +1,132 @@
+import smtplib
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.mail import enqueue_message, send_queued_mail
+from api.models import MailStatus, OutboxMessage
+
+
+class CountingBackend(EmailBackend):
+    """Locmem backend counting the opened connections."""
+    opened = 0
+
+    def open(self):
+        CountingBackend.opened += 1
+        return True
+
+
+class BrokenBackend(EmailBackend):
+
+    def send_messages(self, messages):
+        raise smtplib.SMTPRecipientsRefused({})
+
+
+@pytest.mark.django_db
+class TestMailQueue:
+
+    def test_get_code_only_enqueues(self):
+        response = APIClient().post(
+            '/api/v1/auth/email/', {'email': 'new@yamdb.fake'}
+        )
+        assert response.status_code == 200
+        assert 'new@yamdb.fake' in response.json()
+        assert mail.outbox == [], (
+            'Проверьте, что письмо не отправляется во время запроса'
+        )
+        message = OutboxMessage.objects.get()
+        assert (message.to, message.status) == (
+            'new@yamdb.fake', MailStatus.PENDING
+        )
+
+        call_command('send_queued_mail')
+        assert [sent.to for sent in mail.outbox] == [['new@yamdb.fake']]
+        message.refresh_from_db()
+        assert message.status == MailStatus.SENT
+
+    def test_batch_uses_one_connection(self, settings):
+        settings.EMAIL_BACKEND = 'tests.test_mail_queue.CountingBackend'
+        CountingBackend.opened = 0
+        for number in range(5):
+            enqueue_message('Code', 'x', f'user{number}@yamdb.fake')
+
+        assert send_queued_mail(batch_size=3) == (3, 0)
+        assert send_queued_mail(batch_size=3) == (2, 0)
+        assert CountingBackend.opened == 2, (
+            'Проверьте, что пачка писем отправляется через одно соединение'
+        )
+        assert len(mail.outbox) == 5
+
+    def test_failed_message_is_retried_with_backoff(self, settings):
+        settings.EMAIL_BACKEND = 'tests.test_mail_queue.BrokenBackend'
+        settings.MAIL_MAX_ATTEMPTS = 2
+        message = enqueue_message('Code', 'x', 'user@yamdb.fake')
+
+        assert send_queued_mail() == (0, 1)
+        message.refresh_from_db()
+        assert message.status == MailStatus.PENDING
+        assert message.next_attempt_at > timezone.now(), (
+            'Проверьте, что повторная отправка откладывается'
+        )
+        assert send_queued_mail() == (0, 0)
+
+        OutboxMessage.objects.update(next_attempt_at=timezone.now())
+        assert send_queued_mail() == (0, 1)
+        message.refresh_from_db()
+        assert (message.status, message.attempts) == (MailStatus.FAILED, 2)
+        assert 'SMTPRecipientsRefused' in message.last_error
+
+    def test_results_are_saved_per_message(self, monkeypatch):
+        first = enqueue_message('Code', 'code 1', 'first@yamdb.fake')
+        second = enqueue_message('Code', 'code 2', 'second@yamdb.fake')
+        sends = []
+
+        def send(sender, message):
+            if sends:
+                raise RuntimeError('worker died')
+            sends.append(message.pk)
+
+        monkeypatch.setattr('api.mail._Sender.send', send)
+        with pytest.raises(RuntimeError):
+            send_queued_mail()
+
+        first.refresh_from_db()
+        assert (first.status, first.body) == (MailStatus.SENT, ''), (
+            'Проверьте, что отправленное письмо отмечается сразу, '
+            'а код из него стирается'
+        )
+        second.refresh_from_db()
+        assert second.status == MailStatus.SENDING
+        assert send_queued_mail() == (0, 0), (
+            'Проверьте, что взятое письмо не отправляется повторно '
+            'до истечения MAIL_CLAIM_TIMEOUT'
+        )
+        OutboxMessage.objects.filter(pk=second.pk).update(
+            next_attempt_at=timezone.now()
+        )
+        monkeypatch.undo()
+        assert send_queued_mail() == (1, 0)
+        assert [sent.to for sent in mail.outbox] == [['second@yamdb.fake']]
+
+    def test_old_messages_are_purged(self, settings):
+        settings.MAIL_OUTBOX_RETENTION = 60
+        old = enqueue_message('Code', 'x', 'old@yamdb.fake')
+        enqueue_message('Code', 'x', 'new@yamdb.fake')
+        send_queued_mail()
+        OutboxMessage.objects.filter(pk=old.pk).update(
+            created_at=timezone.now() - timezone.timedelta(minutes=2)
+        )
+        waiting = enqueue_message('Code', 'x', 'waiting@yamdb.fake')
+        OutboxMessage.objects.filter(pk=waiting.pk).update(
+            created_at=timezone.now() - timezone.timedelta(minutes=2),
+            next_attempt_at=timezone.now() + timezone.timedelta(hours=1),
+        )
+
+        call_command('send_queued_mail')
+        assert sorted(OutboxMessage.objects.values_list('to', flat=True)) == [
+            'new@yamdb.fake', 'waiting@yamdb.fake'
+        ], 'Проверьте, что старые отправленные письма удаляются'
@@ -0,0 +1,83 @@
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from api.metrics import registry
+from titles.models import Title
+
+User = get_user_model()
+
+
+@pytest.fixture
+def metrics_enabled(settings):
+    settings.PERF_METRICS_ENABLED = True
+    registry.reset()
+    yield
+    registry.reset()
+
+
+@pytest.fixture
+def scraper_client(settings):
+    settings.METRICS_TOKEN = 'scraper-secret'
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION='Bearer scraper-secret')
+    return client
+
+
+def spans(response):
+    return {
+        span.split(';')[0].strip(): span
+        for span in response['Server-Timing'].split(',')
+    }
+
+
+@pytest.mark.django_db
+class TestPerformanceMiddleware:
+
+    def test_server_timing(self, metrics_enabled):
+        Title.objects.create(name='Крестный отец', year=1972)
+        response = APIClient().get('/api/v1/titles/')
+        assert set(spans(response)) == {'db', 'serialize', 'total'}, (
+            'Проверьте, что ответ содержит заголовок Server-Timing'
+        )
+        assert 'queries"' in spans(response)['db']
+        assert 'serialize' not in spans(APIClient().get('/redoc/'))
+
+    def test_histograms_per_route(self, metrics_enabled, scraper_client):
+        for _ in range(3):
+            APIClient().get('/api/v1/genres/')
+        text = scraper_client.get('/api/v1/metrics/').content.decode()
+        assert (
+            'yamdb_request_duration_seconds_count'
+            '{route="genres-list",method="GET"} 3'
+        ) in text, 'Проверьте, что метрики собираются по маршрутам'
+        assert (
+            'yamdb_db_queries_bucket'
+            '{route="genres-list",method="GET",le="+Inf"} 3'
+        ) in text
+        assert 'yamdb_catalog_cache_events_total{event="hit"} 2' in text
+        assert 'yamdb_throttle_rejections_total{scope="anon"} 0' in text
+
+    def test_metrics_require_the_token(self, settings):
+        admin = APIClient()
+        admin.force_authenticate(User.objects.create(
+            username='root', email='root@yamdb.fake', role='admin'
+        ))
+        assert admin.get('/api/v1/metrics/').status_code == 403, (
+            'Проверьте, что без METRICS_TOKEN метрики закрыты'
+        )
+        settings.METRICS_TOKEN = 'scraper-secret'
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION='Bearer wrong')
+        assert client.get('/api/v1/metrics/').status_code == 403
+        client.credentials(HTTP_AUTHORIZATION='Bearer scraper-secret')
+        assert client.get('/api/v1/metrics/').status_code == 200, (
+            'Проверьте, что метрики отдаются по статическому токену'
+        )
+
+    def test_disabled_by_default(self, settings):
+        assert settings.PERF_METRICS_ENABLED is False
+        response = APIClient().get('/api/v1/genres/')
+        assert not response.has_header('Server-Timing'), (
+            'Проверьте, что без настройки middleware отключается'
+        )
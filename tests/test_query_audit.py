@@ -0,0 +1,81 @@
+import logging
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from rest_framework.test import APIClient
+
+from api.audit import QueryAuditor, fingerprint
+from titles.models import Review, Title
+
+User = get_user_model()
+
+
+@pytest.fixture
+def reviews():
+    title = Title.objects.create(name='Крестный отец', year=1972)
+    for number in range(4):
+        Review.objects.create(
+            title=title, text='text', score=5,
+            author=User.objects.create(
+                username=f'author{number}', email=f'a{number}@yamdb.fake'
+            ),
+        )
+    return title
+
+
+class TestFingerprint:
+
+    def test_literals_and_in_lists(self):
+        assert fingerprint(
+            "SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = 'x'"
+        ) == fingerprint(
+            "SELECT  * FROM t WHERE id IN (%s) AND name = 'it''s'"
+        ) == 'SELECT * FROM t WHERE id IN (...) AND name = ?', (
+            'Проверьте, что запросы с разными параметрами совпадают'
+        )
+
+
+@pytest.mark.django_db
+class TestQueryAudit:
+
+    def test_finds_n_plus_one(self, reviews, query_audit):
+        with pytest.raises(AssertionError) as error:
+            with query_audit():
+                for review in Review.objects.all():
+                    review.author.username
+        assert 'x4 SELECT' in str(error.value), (
+            'Проверьте, что повторяющиеся запросы обнаруживаются'
+        )
+        assert 'test_query_audit.py' in str(error.value), (
+            'Проверьте, что в отчёт попадает место вызова запроса'
+        )
+
+    @pytest.mark.parametrize('url, budget', [
+        ('/api/v1/titles/', 4),
+        ('/api/v1/titles/{id}/reviews/', 5),
+    ])
+    def test_endpoint_budgets(self, reviews, query_audit, url, budget):
+        client = APIClient()
+        with query_audit(max_queries=budget):
+            response = client.get(url.format(id=reviews.id))
+        assert response.status_code == 200
+
+    def test_middleware_logs_with_view_name(self, settings, reviews,
+                                            caplog):
+        settings.QUERY_AUDIT_ENABLED = True
+        settings.QUERY_AUDIT_SLOW_MS = 0
+        with caplog.at_level(logging.WARNING, logger='api.audit'):
+            APIClient().get(f'/api/v1/titles/{reviews.id}/reviews/')
+        messages = [record.getMessage() for record in caplog.records]
+        assert messages and all(
+            'title_reviews-list' in message for message in messages
+        ), 'Проверьте, что в лог попадает имя представления'
+
+    def test_auditor_counts(self, reviews):
+        auditor = QueryAuditor(duplicate_threshold=2, slow_ms=10 ** 6)
+        with connection.execute_wrapper(auditor):
+            list(Title.objects.all())
+            list(Title.objects.all())
+        assert auditor.total == 2
+        assert [count for count, _, _ in auditor.duplicates] == [2]
@@ -0,0 +1,125 @@
+import itertools
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.urls import v1_router
+from titles.models import Category, Comment, Genre, Review, Title
+
+User = get_user_model()
+
+SMALL_PAGE = 2
+LARGE_PAGE = 8
+
+_counter = itertools.count()
+
+
+def make_user(role='user'):
+    number = next(_counter)
+    return User.objects.create(
+        username=f'user{number}', email=f'user{number}@yamdb.fake', role=role
+    )
+
+
+def make_title():
+    number = next(_counter)
+    category = Category.objects.create(
+        name=f'category{number}', slug=f'category{number}'
+    )
+    title = Title.objects.create(
+        name=f'title{number}', year=2000, category=category
+    )
+    for genre_number in range(2):
+        title.genre.add(Genre.objects.create(
+            name=f'genre{number}', slug=f'genre{number}-{genre_number}'
+        ))
+    return title
+
+
+def make_review(title):
+    return Review.objects.create(
+        title=title, author=make_user(), text='text', score=5
+    )
+
+
+class Endpoint:
+    """A list endpoint with a way to add one more row to its page."""
+
+    def __init__(self, url, add_row):
+        self.url = url
+        self.add_row = add_row
+
+
+def build_endpoints():
+    title = make_title()
+    review = make_review(title)
+    return {
+        'users': Endpoint('/api/v1/users/', make_user),
+        'title_reviews': Endpoint(
+            f'/api/v1/titles/{title.id}/reviews/',
+            lambda: make_review(title),
+        ),
+        'review_comments': Endpoint(
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/',
+            lambda: Comment.objects.create(
+                review=review, author=make_user(), text='text'
+            ),
+        ),
+        'categories': Endpoint(
+            '/api/v1/categories/',
+            lambda: Category.objects.create(
+                name=f'extra{next(_counter)}', slug=f'extra{next(_counter)}'
+            ),
+        ),
+        'genres': Endpoint(
+            '/api/v1/genres/',
+            lambda: Genre.objects.create(
+                name='extra', slug=f'extra{next(_counter)}'
+            ),
+        ),
+        'titles': Endpoint('/api/v1/titles/', make_title),
+    }
+
+
+def count_queries(client, url, rows):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(
+            url, {'limit': rows, 'page_size': rows}
+        )
+    assert response.status_code == 200, response.content
+    return len(context)
+
+
+@pytest.mark.django_db
+class TestQueryCounts:
+
+    def test_all_endpoints_are_covered(self):
+        registered = {basename for _, _, basename in v1_router.registry}
+        assert registered == set(build_endpoints()), (
+            'Проверьте, что для каждого эндпоинта из api/urls.py '
+            'задан сценарий проверки числа запросов'
+        )
+
+    @pytest.mark.parametrize('basename', [
+        basename for _, _, basename in v1_router.registry
+    ])
+    def test_queries_do_not_grow_with_page(self, basename):
+        endpoint = build_endpoints()[basename]
+        client = APIClient()
+        client.force_authenticate(make_user(role='admin'))
+
+        for _ in range(SMALL_PAGE):
+            endpoint.add_row()
+        small = count_queries(client, endpoint.url, SMALL_PAGE)
+        for _ in range(LARGE_PAGE - SMALL_PAGE):
+            endpoint.add_row()
+        large = count_queries(client, endpoint.url, LARGE_PAGE)
+
+        assert small == large, (
+            f'Проверьте, что число запросов к {endpoint.url} не растёт '
+            f'с размером страницы: {small} для {SMALL_PAGE} строк, '
+            f'{large} для {LARGE_PAGE} строк'
+        )
@@ -0,0 +1,161 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.db.models.signals import post_delete
+from rest_framework.test import APIClient
+
+from titles.models import Review, Title
+from titles.ratings import inconsistent_ratings
+
+User = get_user_model()
+
+
+@pytest.fixture
+def title():
+    return Title.objects.create(name='Побег из Шоушенка', year=1994)
+
+
+@pytest.fixture
+def authors():
+    return [
+        User.objects.create(username=f'author{i}', email=f'a{i}@yamdb.fake')
+        for i in range(3)
+    ]
+
+
+def refreshed(title):
+    title.refresh_from_db()
+    return title.rating_sum, title.rating_count, title.rating
+
+
+@pytest.mark.django_db
+class TestTitleRating:
+
+    def test_counters_follow_reviews(self, title, authors):
+        first = Review.objects.create(
+            title=title, author=authors[0], text='text', score=10
+        )
+        Review.objects.create(
+            title=title, author=authors[1], text='text', score=5
+        )
+        assert refreshed(title) == (15, 2, 7.5), (
+            'Проверьте, что счётчики рейтинга растут при создании отзыва'
+        )
+
+        first.score = 1
+        first.save()
+        assert refreshed(title) == (6, 2, 3.0), (
+            'Проверьте, что изменение оценки пересчитывает рейтинг'
+        )
+
+        first.delete()
+        assert refreshed(title) == (5, 1, 5.0), (
+            'Проверьте, что удаление отзыва пересчитывает рейтинг'
+        )
+
+        Review.objects.filter(title=title).delete()
+        assert refreshed(title) == (0, 0, None), (
+            'Проверьте, что массовое удаление отзывов обнуляет рейтинг'
+        )
+
+    def test_cascade_delete_of_author(self, title, authors):
+        for author in authors:
+            Review.objects.create(
+                title=title, author=author, text='text', score=4
+            )
+        authors[0].delete()
+        assert refreshed(title) == (8, 2, 4.0), (
+            'Проверьте, что каскадное удаление учитывается в рейтинге'
+        )
+
+    def test_failed_title_delete(self, title, authors):
+        review = Review.objects.create(
+            title=title, author=authors[0], text='text', score=4
+        )
+
+        def fail(**kwargs):
+            raise RuntimeError('delete failed')
+
+        post_delete.connect(fail, sender=Review)
+        try:
+            with pytest.raises(RuntimeError), transaction.atomic():
+                title.delete()
+        finally:
+            post_delete.disconnect(fail, sender=Review)
+
+        review.delete()
+        assert refreshed(title) == (0, 0, None), (
+            'Проверьте, что неудачное удаление произведения не отключает '
+            'пересчёт его рейтинга'
+        )
+
+    def test_api_rating_is_not_truncated(self, title, authors):
+        for author, score in zip(authors, (7, 8)):
+            Review.objects.create(
+                title=title, author=author, text='text', score=score
+            )
+        client = APIClient()
+        listed = client.get('/api/v1/titles/').json()['results'][0]
+        detail = client.get(f'/api/v1/titles/{title.id}/').json()
+        assert listed['rating'] == detail['rating'] == 7.5, (
+            'Проверьте, что рейтинг отдаётся дробным числом'
+        )
+
+    def test_rebuild_repairs_counters(self, title, authors):
+        Review.objects.create(
+            title=title, author=authors[0], text='text', score=8
+        )
+        Review.objects.filter(title=title).update(score=2)
+        assert inconsistent_ratings(Title.objects.all()).exists(), (
+            'Проверьте, что проверка находит рассогласованные рейтинги'
+        )
+
+        call_command('check_ratings', '--fix')
+        assert refreshed(title) == (2, 1, 2.0), (
+            'Проверьте, что check_ratings --fix пересчитывает рейтинг'
+        )
+        assert not inconsistent_ratings(Title.objects.all()).exists()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestUniqueReviewMigration:
+    before = [('titles', '0004_title_rating_counters')]
+    after = [('titles', '0005_review_unique_author_title')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def test_repeated_reviews_stop_the_migration(self):
+        apps = self.migrate(self.before)
+        try:
+            HistoricalTitle = apps.get_model('titles', 'Title')
+            HistoricalReview = apps.get_model('titles', 'Review')
+            author = apps.get_model('users', 'User').objects.create(
+                username='twice', email='twice@yamdb.fake'
+            )
+            title = HistoricalTitle.objects.create(name='Сталкер', year=1979)
+            pks = [
+                HistoricalReview.objects.create(
+                    title=title, author=author, text='text', score=score
+                ).pk
+                for score in (9, 3, 5)
+            ]
+
+            with pytest.raises(RuntimeError) as error:
+                self.migrate(self.after)
+            assert f'reviews {pks[0]}, {pks[1]}, {pks[2]}' in str(
+                error.value
+            ), 'Проверьте, что миграция перечисляет повторные отзывы'
+            assert HistoricalReview.objects.count() == 3, (
+                'Проверьте, что миграция не удаляет отзывы пользователей'
+            )
+
+            HistoricalReview.objects.filter(pk__in=pks[1:]).delete()
+            self.migrate(self.after)
+        finally:
+            self.migrate(MigrationExecutor(connection).loader.graph
+                         .leaf_nodes())
@@ -0,0 +1,113 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import OperationalError, connections
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from api import routing
+from api.models import OutboxMessage
+from titles.models import Category, Genre, Title
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def replica():
+    routing._down_until.clear()
+    with override_settings(REPLICA_DATABASES=['replica']):
+        yield
+
+
+@pytest.fixture
+def admin_client():
+    client = APIClient()
+    client.force_authenticate(User.objects.create(
+        username='root', email='root@yamdb.fake', is_superuser=True
+    ))
+    return client
+
+
+@pytest.fixture
+def new_title():
+    Category.objects.create(name='Фильм', slug='film')
+    Genre.objects.create(name='Драма', slug='drama')
+    return {'name': 'Новое', 'year': 2001, 'category': 'film',
+            'genre': ['drama']}
+
+
+@pytest.mark.django_db(databases=['default', 'replica'])
+class TestReplicaRouting:
+
+    def test_safe_requests_read_replica(self):
+        Title.objects.create(name='На первичной', year=2000)
+        Title.objects.using('replica').create(name='На реплике', year=2000)
+        data = APIClient().get('/api/v1/titles/').json()
+        assert [row['name'] for row in data['results']] == ['На реплике'], (
+            'Проверьте, что GET-запросы к вьюсетам читают с реплики'
+        )
+
+    def test_writes_go_to_primary_and_pin_client(self, admin_client,
+                                                 new_title):
+        response = admin_client.post(
+            '/api/v1/titles/', new_title, format='json'
+        )
+        assert response.status_code == 201
+        assert Title.objects.using('default').filter(name='Новое').exists()
+        assert not Title.objects.using('replica').exists()
+        assert routing.PIN_COOKIE in response.cookies, (
+            'Проверьте, что после записи клиент закрепляется за основной '
+            'базой'
+        )
+        data = admin_client.get('/api/v1/titles/').json()
+        assert [row['name'] for row in data['results']] == ['Новое'], (
+            'Проверьте, что клиент видит свою запись сразу после неё'
+        )
+
+    def test_pin_follows_user_without_cookies(self, admin_client,
+                                              new_title):
+        admin_client.post('/api/v1/titles/', new_title, format='json')
+        admin_client.cookies.clear()
+        data = admin_client.get('/api/v1/titles/').json()
+        assert data['count'] == 1
+
+    def test_new_user_reads_own_profile(self):
+        email = 'new@yamdb.fake'
+        APIClient().post('/api/v1/auth/email/', {'email': email})
+        code = OutboxMessage.objects.filter(to=email).latest('id').body
+        token = APIClient().post('/api/v1/auth/token/', {
+            'email': email, 'confirmation_code': code, 'username': 'newbie',
+        }).json()['access']
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        response = client.get('/api/v1/users/me/')
+        assert response.json().get('username') == 'newbie', (
+            'Проверьте, что новый пользователь читает свой профиль с '
+            'основной базы'
+        )
+
+    def test_fails_over_to_primary(self, monkeypatch):
+        Title.objects.create(name='На первичной', year=2000)
+
+        def refuse():
+            raise OperationalError('connection refused')
+
+        monkeypatch.setattr(
+            connections['replica'], 'ensure_connection', refuse
+        )
+        data = APIClient().get('/api/v1/titles/').json()
+        assert [row['name'] for row in data['results']] == ['На первичной'], (
+            'Проверьте, что при недоступной реплике чтение идёт с основной '
+            'базы'
+        )
+        assert routing.choose_replica() is None
+
+    def test_cache_misses_read_primary(self):
+        Category.objects.create(name='Фильм', slug='film')
+        Genre.objects.using('replica').create(name='Драма', slug='drama')
+        data = APIClient().get('/api/v1/categories/').json()
+        assert [row['slug'] for row in data['results']] == ['film']
+
+    def test_round_robin(self):
+        with override_settings(REPLICA_DATABASES=['replica', 'default']):
+            chosen = {routing.choose_replica() for _ in range(4)}
+        assert chosen == {'replica', 'default'}
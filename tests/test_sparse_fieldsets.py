@@ -0,0 +1,122 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from titles.models import Category, Genre, Review, Title
+
+User = get_user_model()
+
+
+@pytest.fixture
+def title():
+    film = Category.objects.create(name='Фильм', slug='film')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    comedy = Genre.objects.create(name='Комедия', slug='comedy')
+    title = Title.objects.create(
+        name='Сталкер', year=1979, category=film, description='Зона'
+    )
+    title.genre.set([drama, comedy])
+    for number in range(3):
+        author = User.objects.create(
+            username=f'author{number}', email=f'a{number}@yamdb.fake'
+        )
+        Review.objects.create(
+            title=title, author=author, text='Текст', score=8
+        )
+    return title
+
+
+def get(url):
+    with CaptureQueriesContext(connection) as context:
+        response = APIClient().get(url)
+    return response, [query['sql'] for query in context.captured_queries]
+
+
+@pytest.mark.django_db
+class TestSparseFieldsets:
+
+    def test_fields_trim_output_and_sql(self, title):
+        response, queries = get('/api/v1/titles/?fields=id,name,rating')
+        assert response.json()['results'] == [
+            {'id': title.id, 'rating': 8, 'name': 'Сталкер'},
+        ], 'Проверьте, что ?fields= оставляет только перечисленные поля'
+        assert not any('description' in sql for sql in queries), (
+            'Проверьте, что ненужные колонки не выбираются из базы'
+        )
+        assert not any('titles_genre' in sql for sql in queries), (
+            'Проверьте, что жанры не загружаются, если их не запросили'
+        )
+
+    def test_expand_collapses_nested_objects(self, title):
+        data = APIClient().get(
+            '/api/v1/titles/?fields=category,genre&expand='
+        ).json()
+        assert data['results'] == [
+            {'category': 'film', 'genre': ['comedy', 'drama']},
+        ], 'Проверьте, что без expand вложенные объекты заменяются slug'
+        data = APIClient().get(
+            '/api/v1/titles/?fields=category,genre&expand=category'
+        ).json()
+        assert data['results'][0]['category'] == {
+            'name': 'Фильм', 'slug': 'film',
+        }
+        assert data['results'][0]['genre'] == ['comedy', 'drama']
+
+    @pytest.mark.parametrize('query', [
+        'fields=id,name', 'fields=genre,year&expand=',
+        'expand=genre', 'fields=category&expand=category',
+    ])
+    def test_fast_path_matches_serializers(self, title, query):
+        bodies = []
+        for enabled in (True, False):
+            cache.clear()
+            with override_settings(FAST_LIST_SERIALIZERS=enabled):
+                bodies.append(APIClient().get(
+                    f'/api/v1/titles/?{query}'
+                ).content)
+        assert bodies[0] == bodies[1]
+
+    def test_retrieve_loads_only_needed_columns(self, title):
+        response, queries = get(f'/api/v1/titles/{title.id}/?fields=name')
+        assert response.json() == {'name': 'Сталкер'}
+        assert len(queries) == 1, (
+            'Проверьте, что для ответа с ?fields= нужен один запрос'
+        )
+
+    def test_reviews_with_cursor(self, title):
+        data = APIClient().get(
+            f'/api/v1/titles/{title.id}/reviews/'
+            f'?fields=author&pagination=cursor&page_size=2'
+        ).json()
+        assert data['results'] == [{'author': 'author2'},
+                                   {'author': 'author1'}]
+        assert data['next'] is not None
+
+    @pytest.mark.parametrize('query', ['fields=id,unknown', 'expand=name'])
+    def test_unknown_names(self, title, query):
+        response = APIClient().get(f'/api/v1/titles/?{query}')
+        assert response.status_code == 400, (
+            'Проверьте, что неизвестные поля в ?fields= и ?expand= '
+            'возвращают 400'
+        )
+
+    def test_categories(self, title):
+        data = APIClient().get('/api/v1/categories/?fields=slug').json()
+        assert data['results'] == [{'slug': 'film'}]
+
+    def test_own_profile(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create(
+            username='reader', email='reader@yamdb.fake'
+        ))
+        response = client.get('/api/v1/users/me/?fields=username')
+        assert response.json() == {'username': 'reader'}, (
+            'Проверьте, что /users/me/ учитывает ?fields='
+        )
+        assert client.get(
+            '/api/v1/users/me/?fields=password'
+        ).status_code == 400
@@ -0,0 +1,133 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.checks import run_checks
+from rest_framework.test import APIClient
+
+from api.throttling import LocalBucketStore, refill
+
+User = get_user_model()
+
+STORES = ('api.throttling.CacheBucketStore',
+          'api.throttling.LocalBucketStore')
+
+
+@pytest.fixture(params=STORES)
+def store(request, settings):
+    settings.THROTTLE_BUCKET_STORE = request.param
+    LocalBucketStore.clear()
+    yield request.param
+    LocalBucketStore.clear()
+
+
+def request_code(email, ip='10.0.0.1', **headers):
+    return APIClient().post(
+        '/api/v1/auth/email/', {'email': email}, REMOTE_ADDR=ip, **headers
+    )
+
+
+class TestTokenBucket:
+
+    def test_refill(self):
+        state = None
+        for _ in range(3):
+            allowed, state = refill(state, 100.0, capacity=3, rate=0.5)
+            assert allowed
+        assert refill(state, 100.0, 3, 0.5)[0] is False, (
+            'Проверьте, что пустое ведро отклоняет запрос'
+        )
+        allowed, state = refill(state, 102.0, 3, 0.5)
+        assert allowed and state == (0, 102.0), (
+            'Проверьте, что токены восстанавливаются со временем'
+        )
+        assert refill((0, 0.0), 1000.0, 3, 0.5)[1] == (2, 1000.0)
+
+
+@pytest.mark.django_db
+class TestAuthThrottling:
+
+    def test_per_email(self, store):
+        for _ in range(5):
+            assert request_code('new@yamdb.fake').status_code == 200
+        for ip in ('10.0.0.2', '10.0.0.3'):
+            response = request_code('NEW@yamdb.fake', ip=ip)
+            assert response.status_code == 429, (
+                'Проверьте, что запросы на один email ограничены с любых IP'
+            )
+        assert 0 < int(response['Retry-After']) <= 12
+        assert request_code('other@yamdb.fake').status_code == 200
+
+    def test_per_ip(self, store):
+        for number in range(20):
+            assert request_code(f'u{number}@yamdb.fake').status_code == 200
+        assert request_code('late@yamdb.fake').status_code == 429, (
+            'Проверьте, что запросы с одного IP ограничены'
+        )
+        assert request_code('late@yamdb.fake', ip='10.0.0.9'
+                            ).status_code == 200
+
+    def test_body_that_is_not_an_object(self, store):
+        for body in (['new@yamdb.fake'], 'new@yamdb.fake'):
+            response = APIClient().post(
+                '/api/v1/auth/email/', body, format='json'
+            )
+            assert response.status_code == 400, (
+                'Проверьте, что тело запроса не объектом не вызывает 500'
+            )
+
+    def test_forwarded_for_is_not_spoofed(self, store):
+        codes = [
+            request_code(
+                f'u{number}@yamdb.fake', ip='172.18.0.5',
+                HTTP_X_FORWARDED_FOR=f'10.1.0.{number}, 10.0.0.1',
+            ).status_code
+            for number in range(21)
+        ]
+        assert codes == [200] * 20 + [429], (
+            'Проверьте, что адрес клиента берётся из записи nginx, а не '
+            'из подставленного клиентом X-Forwarded-For'
+        )
+        assert request_code(
+            'late@yamdb.fake', ip='172.18.0.5',
+            HTTP_X_FORWARDED_FOR='10.0.0.2',
+        ).status_code == 200
+
+    def test_disabled(self, store, settings):
+        settings.THROTTLING_ENABLED = False
+        for _ in range(7):
+            assert request_code('new@yamdb.fake').status_code == 200, (
+                'Проверьте, что THROTTLING=false отключает ограничения'
+            )
+
+    def test_rejections_are_counted(self, store):
+        for _ in range(7):
+            request_code('new@yamdb.fake')
+        client = APIClient()
+        client.force_authenticate(User.objects.create(
+            username='root', email='root@yamdb.fake', is_staff=True
+        ))
+        stats = client.get('/api/v1/throttle/stats/').json()
+        assert stats['auth_email'] == 2, (
+            'Проверьте, что отклонённые запросы попадают в метрики'
+        )
+        assert stats['anon'] == 0
+
+
+class TestSharedCacheCheck:
+
+    def test_process_local_cache_fails_deploy_check(self, settings):
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }}
+        errors = run_checks(include_deployment_checks=True)
+        assert 'api.E001' in [error.id for error in errors], (
+            'Проверьте, что check --deploy не пропускает кэш, '
+            'свой у каждого процесса'
+        )
+
+    def test_memcached_passes_deploy_check(self, settings):
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+            'LOCATION': 'memcached:11211',
+        }}
+        errors = run_checks(include_deployment_checks=True)
+        assert 'api.E001' not in [error.id for error in errors]
@@ -0,0 +1,55 @@
+import pytest
+from rest_framework.test import APIClient
+
+from titles.models import Title
+
+
+@pytest.fixture
+def titles():
+    return {
+        'shawshank': Title.objects.create(
+            name='Побег из Шоушенка', year=1994,
+            description='Банкир попадает в тюрьму',
+        ),
+        'godfather': Title.objects.create(
+            name='Крестный отец', year=1972,
+            description='Семья Корлеоне',
+        ),
+        'prison': Title.objects.create(
+            name='Зеленая миля', year=1999,
+            description='Надзиратели тюрьмы и крестный путь',
+        ),
+    }
+
+
+def search(query):
+    response = APIClient().get('/api/v1/titles/', {'q': query})
+    assert response.status_code == 200
+    return [row['name'] for row in response.json()['results']]
+
+
+@pytest.mark.django_db
+class TestTitleSearch:
+
+    def test_stemming_and_prefix(self, titles):
+        assert search('крестного отец') == ['Крестный отец'], (
+            'Проверьте, что поиск учитывает словоформы'
+        )
+        assert search('шоуш') == ['Побег из Шоушенка'], (
+            'Проверьте, что поиск находит слова по префиксу'
+        )
+
+    def test_name_ranks_above_description(self, titles):
+        assert search('крестный') == ['Крестный отец', 'Зеленая миля'], (
+            'Проверьте, что совпадение в названии важнее описания'
+        )
+
+    def test_index_follows_changes(self, titles):
+        assert search('тюрьма') == ['Побег из Шоушенка', 'Зеленая миля']
+        titles['prison'].description = 'Надзиратели'
+        titles['prison'].save()
+        assert search('тюрьма') == ['Побег из Шоушенка'], (
+            'Проверьте, что индекс обновляется при сохранении произведения'
+        )
+        titles['shawshank'].delete()
+        assert search('тюрьма') == []
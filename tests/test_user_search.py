@@ -0,0 +1,28 @@
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestUserSearch:
+
+    def test_search_parameter(self):
+        admin = User.objects.create(
+            username='capt_obvious', email='capt@yamdb.fake', role='admin'
+        )
+        for username in ('bingobongo', 'bongo', 'mrbongo'):
+            User.objects.create(
+                username=username, email=f'{username}@yamdb.fake'
+            )
+        client = APIClient()
+        client.force_authenticate(admin)
+
+        response = client.get('/api/v1/users/', {'search': 'bongo'})
+
+        usernames = [row['username'] for row in response.json()['results']]
+        assert usernames == ['bongo', 'bingobongo', 'mrbongo'], (
+            'Проверьте, что ?search= находит пользователей по подстроке '
+            'и ставит совпадения по префиксу первыми'
+        )
@@ -2,6 +2,8 @@ from django.contrib import admin
 from django.contrib.admin import AdminSite
 from django.contrib.auth import get_user_model
 
+from users.search import search_users
+
 from .models import Category, Comment, Genre, Review, Title
 
 User = get_user_model()
@@ -34,7 +36,8 @@ class GenreAdmin(admin.ModelAdmin):
 class TitleAdmin(admin.ModelAdmin):
     """Managing titles in the admin area.
        Inherited from admin.ModelAdmin."""
-    list_display = ('pk', 'name', 'year', 'category',)
+    list_display = ('pk', 'name', 'year', 'category', 'rating',)
+    readonly_fields = ('rating', 'rating_count',)
     search_fields = ('name', 'year', 'category',)
     list_filter = ('year', 'category',)
     empty_value_display = '-empty-'
@@ -77,3 +80,9 @@ class UserAdmin(admin.ModelAdmin):
     search_fields = ('username', 'email', 'role',)
     list_filter = ('role', 'is_active',)
     empty_value_display = '-empty-'
+
+    def get_search_results(self, request, queryset, search_term):
+        queryset = search_users(
+            queryset, search_term.split(), self.search_fields
+        )
+        return queryset, False
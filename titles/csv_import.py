@@ -0,0 +1,314 @@
+import csv
+import io
+import time
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.core.management.color import no_style
+from django.db import connections, transaction
+from django.utils.dateparse import parse_datetime
+
+from .models import Category, Comment, Genre, Review, Title
+
+User = get_user_model()
+
+
+class IdSet:
+    """Compact set of positive integer ids kept as a bit array.
+
+    Ten million ids take about a megabyte, so foreign keys of huge files
+    are checked in bounded memory.
+    """
+
+    def __init__(self):
+        self.bits = bytearray()
+
+    def add(self, value):
+        index, bit = divmod(value, 8)
+        if index >= len(self.bits):
+            self.bits.extend(bytes(index - len(self.bits) + 1))
+        self.bits[index] |= 1 << bit
+
+    def __contains__(self, value):
+        index, bit = divmod(value, 8)
+        return index < len(self.bits) and bool(self.bits[index] & 1 << bit)
+
+    @classmethod
+    def from_queryset(cls, queryset):
+        ids = cls()
+        for pk in queryset.values_list('pk', flat=True).iterator():
+            ids.add(pk)
+        return ids
+
+
+def _int(value):
+    return int(value) if value not in (None, '') else None
+
+
+def _date(value):
+    return parse_datetime(value) if value else None
+
+
+class Table:
+    """How one CSV file is turned into model instances."""
+
+    def __init__(self, filename, model, build, references=(), required=()):
+        self.filename = filename
+        self.model = model
+        self.build = build
+        # (csv column, model whose ids it must point to)
+        self.references = references
+        # Columns a row without a value is skipped for.
+        self.required = required
+
+
+TABLES = (
+    Table('users.csv', User, lambda row: User(
+        id=int(row['id']), username=row['username'], email=row['email'],
+        role=row['role'] or 'user', bio=row['description'] or '',
+        first_name=row['first_name'] or '', last_name=row['last_name'] or '',
+    )),
+    Table('category.csv', Category, lambda row: Category(
+        id=int(row['id']), name=row['name'], slug=row['slug'],
+    )),
+    Table('genre.csv', Genre, lambda row: Genre(
+        id=int(row['id']), name=row['name'], slug=row['slug'],
+    )),
+    Table('titles.csv', Title, lambda row: Title(
+        id=int(row['id']), name=row['name'], year=int(row['year']),
+        category_id=_int(row['category']),
+    ), references=(('category', Category),)),
+    Table('genre_title.csv', Title.genre.through, lambda row: (
+        Title.genre.through(
+            id=int(row['id']), title_id=int(row['title_id']),
+            genre_id=int(row['genre_id']),
+        )
+    ), references=(('title_id', Title), ('genre_id', Genre))),
+    Table('review.csv', Review, lambda row: Review(
+        id=int(row['id']), title_id=int(row['title_id']), text=row['text'],
+        author_id=int(row['author']), score=int(row['score']),
+        pub_date=_date(row['pub_date']),
+    ), references=(('title_id', Title), ('author', User)),
+        required=('pub_date',)),
+    Table('comments.csv', Comment, lambda row: Comment(
+        id=int(row['id']), review_id=int(row['review_id']), text=row['text'],
+        author_id=_int(row['author']), pub_date=_date(row['pub_date']),
+    ), references=(('review_id', Review), ('author', User)),
+        required=('pub_date',)),
+)
+
+
+@contextmanager
+def keep_dates(model):
+    """Store the dates from the file instead of auto_now(_add) ones."""
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class BulkCreateWriter:
+    """Write instances with bulk_create; no model signals are sent.
+
+    Rows breaking a unique constraint are left out; ``write`` returns
+    the pks of the inserted ones.
+    """
+
+    def __init__(self, model, using):
+        self.model = model
+        self.using = using
+
+    def write(self, instances):
+        manager = self.model.objects.using(self.using)
+        manager.bulk_create(instances, ignore_conflicts=True)
+        # The importer skips existing pks, so the ones found were inserted.
+        pks = {instance.pk for instance in instances}
+        return [
+            pk for pk in manager.filter(pk__range=(min(pks), max(pks)))
+            .values_list('pk', flat=True).iterator()
+            if pk in pks
+        ]
+
+
+class CopyWriter:
+    """Write instances with PostgreSQL COPY FROM STDIN in CSV format.
+
+    Batches are copied into a temporary table and moved on with
+    INSERT ... ON CONFLICT DO NOTHING, so rows breaking a unique
+    constraint are left out; ``write`` returns the pks of the inserted
+    ones.
+    """
+
+    def __init__(self, model, using):
+        self.model = model
+        self.connection = connections[using]
+        self.fields = [
+            field for field in model._meta.concrete_fields
+            if field.name != 'search_vector'
+        ]
+        quote = self.connection.ops.quote_name
+        table = quote(model._meta.db_table)
+        staging = quote(f'import_{model._meta.db_table}')
+        columns = ', '.join(quote(field.column) for field in self.fields)
+        self.statements = (
+            f'CREATE TEMPORARY TABLE IF NOT EXISTS {staging} '
+            f'(LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP',
+            f'COPY {staging} ({columns}) FROM STDIN WITH (FORMAT csv)',
+            f'INSERT INTO {table} ({columns}) SELECT {columns} '
+            f'FROM {staging} ON CONFLICT DO NOTHING '
+            f'RETURNING {quote(model._meta.pk.column)}',
+            f'TRUNCATE {staging}',
+        )
+
+    def format(self, value):
+        if value is None:
+            return ''
+        if isinstance(value, (bool, int, float)):
+            return str(value)
+        text = value.isoformat() if hasattr(value, 'isoformat') else value
+        return '"{}"'.format(str(text).replace('"', '""'))
+
+    def write(self, instances):
+        buffer = io.StringIO()
+        for instance in instances:
+            values = (
+                field.get_db_prep_save(
+                    field.pre_save(instance, True), self.connection
+                )
+                for field in self.fields
+            )
+            buffer.write(','.join(self.format(value) for value in values))
+            buffer.write('\n')
+        buffer.seek(0)
+        create, copy, insert, truncate = self.statements
+        with self.connection.cursor() as cursor:
+            cursor.execute(create)
+            cursor.cursor.copy_expert(copy, buffer)
+            cursor.execute(insert)
+            inserted = [pk for pk, in cursor.fetchall()]
+            cursor.execute(truncate)
+        return inserted
+
+
+class Importer:
+    """Stream the CSV files into the database in batches.
+
+    Ids and foreign keys are checked against in-memory id sets seeded
+    from the database: rows already imported or pointing to unknown
+    objects are skipped, so an interrupted import can be run again. So
+    are rows missing a required value, e.g. a review without a date.
+    Rows breaking a unique constraint, e.g. a second review of an author
+    on a title, are left out by the database. Derived data (ratings,
+    search vectors, caches) is rebuilt once at the end.
+    """
+
+    def __init__(self, directory, batch_size=5000, method='auto',
+                 using='default', log=print):
+        self.directory = directory
+        self.batch_size = batch_size
+        self.using = using
+        self.log = log
+        if method == 'auto':
+            method = ('copy' if connections[using].vendor == 'postgresql'
+                      else 'bulk')
+        self.writer_class = {
+            'copy': CopyWriter, 'bulk': BulkCreateWriter,
+        }[method]
+        self.ids = {}
+
+    def known_ids(self, model):
+        if model not in self.ids:
+            self.ids[model] = IdSet.from_queryset(
+                model.objects.using(self.using)
+            )
+        return self.ids[model]
+
+    def run(self, tables=TABLES):
+        """Import the files in order; each file is its own transaction."""
+        started = time.perf_counter()
+        total = 0
+        for table in tables:
+            total += self.import_table(table)
+        self.rebuild_derived_data()
+        self.reset_sequences(tables)
+        elapsed = time.perf_counter() - started
+        self.log(f'Imported {total} rows in {elapsed:.1f}s '
+                 f'({total / max(elapsed, 1e-9):.0f} rows/s)')
+        return total
+
+    def rows(self, table):
+        path = f'{self.directory}/{table.filename}'
+        with open(path, encoding='utf-8', newline='') as csv_file:
+            yield from csv.DictReader(csv_file)
+
+    def valid(self, table, row):
+        if int(row['id']) in self.known_ids(table.model):
+            return False
+        if not all(row[column] for column in table.required):
+            return False
+        for column, model in table.references:
+            value = _int(row[column])
+            if value is not None and value not in self.known_ids(model):
+                return False
+        return True
+
+    def import_table(self, table):
+        started = time.perf_counter()
+        writer = self.writer_class(table.model, self.using)
+        read = written = 0
+        batch = []
+        with transaction.atomic(using=self.using), keep_dates(table.model):
+            for row in self.rows(table):
+                read += 1
+                if not self.valid(table, row):
+                    continue
+                batch.append(table.build(row))
+                if len(batch) >= self.batch_size:
+                    written += self.write(table, writer, batch)
+                    batch = []
+            if batch:
+                written += self.write(table, writer, batch)
+        elapsed = time.perf_counter() - started
+        self.log(f'{table.filename}: {written} rows, {read - written} '
+                 f'skipped, {written / max(elapsed, 1e-9):.0f} rows/s')
+        return written
+
+    def write(self, table, writer, batch):
+        """Write a batch; only inserted rows can be referenced later."""
+        own_ids = self.known_ids(table.model)
+        inserted = writer.write(batch)
+        for pk in inserted:
+            own_ids.add(pk)
+        return len(inserted)
+
+    def rebuild_derived_data(self):
+        from api.cache import invalidate_catalog
+        from api.conditional import touch_model
+        from .ratings import rebuild_ratings
+        from .search import update_search_vectors
+
+        titles = Title.objects.using(self.using)
+        rebuild_ratings(titles)
+        update_search_vectors(titles)
+        invalidate_catalog(Category)
+        invalidate_catalog(Genre)
+        for model in (Category, Genre, Title, Review, Comment):
+            touch_model(model)
+
+    def reset_sequences(self, tables):
+        """Move id sequences past the explicitly inserted ids."""
+        connection = connections[self.using]
+        statements = connection.ops.sequence_reset_sql(
+            no_style(), [table.model for table in tables]
+        )
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from titles.models import Title
+from titles.ratings import inconsistent_ratings, rebuild_ratings
+
+
+class Command(BaseCommand):
+    help = ('Compare the stored rating counters of titles with reviews '
+            'and optionally repair the differing ones.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix', action='store_true',
+            help='Rebuild the counters of inconsistent titles.',
+        )
+
+    def handle(self, *args, **options):
+        broken = inconsistent_ratings(Title.objects.all())
+        broken_ids = []
+        for title in broken.iterator():
+            broken_ids.append(title.pk)
+            self.stdout.write(
+                f'Title {title.pk}: stored {title.rating_sum}/'
+                f'{title.rating_count}, actual {title.actual_sum}/'
+                f'{title.actual_count}'
+            )
+        if not broken_ids:
+            self.stdout.write(
+                self.style.SUCCESS('All ratings are consistent.')
+            )
+            return
+        if not options['fix']:
+            raise CommandError(
+                f'{len(broken_ids)} titles have inconsistent ratings.'
+            )
+        rebuild_ratings(Title.objects.filter(pk__in=broken_ids))
+        self.stdout.write(
+            self.style.SUCCESS(f'Fixed ratings of {len(broken_ids)} titles.')
+        )
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from titles.csv_import import Importer
+
+
+class Command(BaseCommand):
+    help = ('Load users, categories, genres, titles, reviews and comments '
+            'from CSV files in batches, keeping their ids.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--data-dir', default='data')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--method', choices=('auto', 'bulk', 'copy'), default='auto',
+            help='bulk_create, PostgreSQL COPY or the best available one.',
+        )
+
+    def handle(self, *args, **options):
+        Importer(
+            options['data_dir'],
+            batch_size=options['batch_size'],
+            method=options['method'],
+            log=self.stdout.write,
+        ).run()
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from titles.models import Title
+from titles.ratings import rebuild_ratings
+
+
+class Command(BaseCommand):
+    help = 'Recalculate the stored rating counters of titles from reviews.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'title_ids', nargs='*', type=int,
+            help='Rebuild only these titles (all titles by default).',
+        )
+
+    def handle(self, *args, **options):
+        queryset = Title.objects.all()
+        if options['title_ids']:
+            queryset = queryset.filter(pk__in=options['title_ids'])
+        updated = rebuild_ratings(queryset)
+        self.stdout.write(
+            self.style.SUCCESS(f'Rebuilt ratings of {updated} titles.')
+        )
@@ -0,0 +1,58 @@
+from django.db import migrations, models
+from django.db.models import (Avg, Count, FloatField, IntegerField, OuterRef,
+                              Subquery, Sum)
+from django.db.models.functions import Coalesce
+
+
+def fill_rating_counters(apps, schema_editor):
+    alias = schema_editor.connection.alias
+    Title = apps.get_model('titles', 'Title')
+    Review = apps.get_model('titles', 'Review')
+    scores = (Review.objects.using(alias)
+              .filter(title=OuterRef('pk'))
+              .order_by()
+              .values('title'))
+    Title.objects.using(alias).update(
+        rating_sum=Coalesce(Subquery(
+            scores.annotate(total=Sum('score')).values('total'),
+            output_field=IntegerField(),
+        ), 0),
+        rating_count=Coalesce(Subquery(
+            scores.annotate(total=Count('id')).values('total'),
+            output_field=IntegerField(),
+        ), 0),
+        rating=Subquery(
+            scores.annotate(average=Avg('score')).values('average'),
+            output_field=FloatField(),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('titles', '0003_auto_20210320_2011'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Сумма оценок'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество оценок'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.FloatField(editable=False, null=True, verbose_name='Рейтинг'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['-year'], name='title_year_idx'),
+        ),
+        migrations.RunPython(fill_rating_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def refuse_repeated_reviews(apps, schema_editor):
+    """Stop before the constraint while an author has repeated reviews.
+
+    Databases filled by the racy check of the old views may have them.
+    Which one to keep, and what to do with their comments, is for the
+    administrators to decide, so none of them is deleted here.
+    """
+    Review = apps.get_model('titles', 'Review')
+    reviews = Review.objects.using(schema_editor.connection.alias)
+    repeated = (reviews.order_by()
+                .values('author', 'title')
+                .annotate(total=Count('pk'))
+                .filter(total__gt=1))
+    listing = [
+        f'author {group["author"]}, title {group["title"]}: reviews '
+        + ', '.join(map(str, reviews.filter(
+            author=group['author'], title=group['title']
+        ).order_by('pk').values_list('pk', flat=True)))
+        for group in repeated
+    ]
+    if listing:
+        raise RuntimeError(
+            'Authors have repeated reviews of a title, keep one of each '
+            'and migrate again:\n' + '\n'.join(listing)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('titles', '0004_title_rating_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            refuse_repeated_reviews, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name='review',
+            constraint=models.UniqueConstraint(fields=('author', 'title'), name='unique_review_author_title'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+from django.db import migrations, models
+
+
+def fill_review_pub_date(apps, schema_editor):
+    """Keyset pagination needs a date on every review."""
+    Review = apps.get_model('titles', 'Review')
+    (Review.objects
+     .using(schema_editor.connection.alias)
+     .filter(pub_date__isnull=True)
+     .update(pub_date=models.F('updated_at')))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('titles', '0006_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_review_pub_date, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['title', '-pub_date', '-id'], name='review_title_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['review', 'pub_date', 'id'], name='comment_review_pub_date_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+def fill_review_pub_date(apps, schema_editor):
+    """Reviews imported without a date since 0007 get one as well."""
+    Review = apps.get_model('titles', 'Review')
+    (Review.objects
+     .using(schema_editor.connection.alias)
+     .filter(pub_date__isnull=True)
+     .update(pub_date=models.F('updated_at')))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('titles', '0008_title_search_vector'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_review_pub_date, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='review',
+            name='pub_date',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Дата отзыва'),
+        ),
+    ]
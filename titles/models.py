@@ -1,4 +1,5 @@
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 
@@ -37,6 +38,15 @@ class Genre(models.Model):
         return self.name
 
 
+class TitleQuerySet(models.QuerySet):
+    """Deletes of titles clean up after the rating signals."""
+
+    def delete(self):
+        from .signals import deleting_titles
+        with deleting_titles():
+            return super().delete()
+
+
 class Title(models.Model):
     """The model of title. Inherited from models.Model."""
     name = models.CharField(max_length=200, verbose_name='Имя')
@@ -59,15 +69,46 @@ class Title(models.Model):
         verbose_name='Категория',
     )
     genre = models.ManyToManyField(Genre, related_name='titles')
+    rating_sum = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Сумма оценок',
+    )
+    rating_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество оценок',
+    )
+    rating = models.FloatField(
+        null=True,
+        editable=False,
+        verbose_name='Рейтинг',
+    )
+    updated_at = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True,
+        db_index=True,
+    )
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
         ordering = ['-year', ]
+        indexes = [
+            models.Index(fields=['-year'], name='title_year_idx'),
+        ]
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
 
     def __str__(self):
         return self.name
 
+    def delete(self, *args, **kwargs):
+        from .signals import deleting_titles
+        with deleting_titles():
+            return super().delete(*args, **kwargs)
+
 
 class Review(models.Model):
     """The model of titles review. Inherited from models.Model."""
@@ -96,12 +137,24 @@ class Review(models.Model):
     pub_date = models.DateTimeField(
         'Дата отзыва',
         auto_now_add=True,
-        db_index=True,
-        null=True
+        db_index=True
     )
+    updated_at = models.DateTimeField('Дата изменения', auto_now=True)
 
     class Meta:
         ordering = ['-pub_date', ]
+        indexes = [
+            models.Index(
+                fields=['title', '-pub_date', '-id'],
+                name='review_title_pub_date_idx',
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['author', 'title'],
+                name='unique_review_author_title',
+            ),
+        ]
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
 
@@ -137,9 +190,16 @@ class Comment(models.Model):
         auto_now_add=True,
         db_index=True
     )
+    updated_at = models.DateTimeField('Дата изменения', auto_now=True)
 
     class Meta:
         ordering = ['pub_date', ]
+        indexes = [
+            models.Index(
+                fields=['review', 'pub_date', 'id'],
+                name='comment_review_pub_date_idx',
+            ),
+        ]
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
 
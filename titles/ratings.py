@@ -0,0 +1,87 @@
+from django.db.models import (Avg, Count, F, FloatField, IntegerField,
+                              OuterRef, Subquery, Sum)
+from django.db.models.functions import Cast, Coalesce, Now, NullIf
+
+
+def rating_expression(sum_expression, count_expression):
+    """Build the average score expression from the sum and the count."""
+    return (
+        Cast(sum_expression, FloatField())
+        / NullIf(count_expression, 0)
+    )
+
+
+def rating_delta(score_delta, count_delta):
+    """Return update kwargs shifting the stored counters of a title.
+
+    All the right hand sides are evaluated against the old row values,
+    so the derived rating is consistent with the new counters.
+    """
+    new_sum = F('rating_sum') + score_delta
+    new_count = F('rating_count') + count_delta
+    return {
+        'rating_sum': new_sum,
+        'rating_count': new_count,
+        'rating': rating_expression(new_sum, new_count),
+        'updated_at': Now(),
+    }
+
+
+def apply_rating_delta(title_model, title_id, score_delta, count_delta):
+    """Shift the counters of a single title by one UPDATE statement."""
+    if not score_delta and not count_delta:
+        return 0
+    return title_model.objects.filter(pk=title_id).update(
+        **rating_delta(score_delta, count_delta)
+    )
+
+
+def _actual_counters(title_model):
+    """Correlated subqueries with the real sum and count of scores."""
+    review_model = title_model._meta.get_field('reviews').related_model
+    reviews = (review_model.objects
+               .filter(title=OuterRef('pk'))
+               .order_by()
+               .values('title'))
+    actual_sum = Coalesce(
+        Subquery(
+            reviews.annotate(total=Sum('score')).values('total'),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+    actual_count = Coalesce(
+        Subquery(
+            reviews.annotate(total=Count('id')).values('total'),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+    actual_rating = Subquery(
+        reviews.annotate(average=Avg('score')).values('average'),
+        output_field=FloatField(),
+    )
+    return actual_sum, actual_count, actual_rating
+
+
+def rebuild_ratings(queryset):
+    """Recalculate the counters of the titles from scratch."""
+    actual_sum, actual_count, actual_rating = _actual_counters(
+        queryset.model
+    )
+    return queryset.order_by().update(
+        rating_sum=actual_sum,
+        rating_count=actual_count,
+        rating=actual_rating,
+        updated_at=Now(),
+    )
+
+
+def inconsistent_ratings(queryset):
+    """Return the titles whose stored counters differ from the reviews."""
+    actual_sum, actual_count, _ = _actual_counters(queryset.model)
+    return (queryset
+            .annotate(actual_sum=actual_sum, actual_count=actual_count)
+            .exclude(rating_sum=F('actual_sum'),
+                     rating_count=F('actual_count'))
+            .order_by('pk'))
@@ -0,0 +1,232 @@
+import bisect
+import re
+import threading
+from collections import defaultdict
+
+from django.contrib.postgres.search import (SearchQuery, SearchRank,
+                                            SearchVector)
+from django.db import connections
+from django.db.models import Case, F, IntegerField, When
+
+SEARCH_CONFIG = 'russian'
+NAME_WEIGHT = 1.0
+DESCRIPTION_WEIGHT = 0.4
+
+TOKEN_RE = re.compile(r'\w+')
+VOWELS = 'аеиоуыэюя'
+
+PERFECTIVE_GERUND = (
+    ('в', 'вши', 'вшись'),
+    ('ив', 'ивши', 'ившись', 'ыв', 'ывши', 'ывшись'),
+)
+ADJECTIVE = (
+    'ее', 'ие', 'ые', 'ое', 'ими', 'ыми', 'ей', 'ий', 'ый', 'ой', 'ем',
+    'им', 'ым', 'ом', 'его', 'ого', 'ему', 'ому', 'их', 'ых', 'ую', 'юю',
+    'ая', 'яя', 'ою', 'ею',
+)
+PARTICIPLE = (
+    ('ем', 'нн', 'вш', 'ющ', 'щ'),
+    ('ивш', 'ывш', 'ующ'),
+)
+REFLEXIVE = ('ся', 'сь')
+VERB = (
+    ('ла', 'на', 'ете', 'йте', 'ли', 'й', 'л', 'ем', 'н', 'ло', 'но', 'ет',
+     'ют', 'ны', 'ть', 'ешь', 'нно'),
+    ('ила', 'ыла', 'ена', 'ейте', 'уйте', 'ите', 'или', 'ыли', 'ей', 'уй',
+     'ил', 'ыл', 'им', 'ым', 'ен', 'ило', 'ыло', 'ено', 'ят', 'ует', 'уют',
+     'ит', 'ыт', 'ены', 'ить', 'ыть', 'ишь', 'ую', 'ю'),
+)
+NOUN = (
+    'а', 'ев', 'ов', 'ие', 'ье', 'е', 'иями', 'ями', 'ами', 'еи', 'ии', 'и',
+    'ией', 'ей', 'ой', 'ий', 'й', 'иям', 'ям', 'ием', 'ем', 'ам', 'ом', 'о',
+    'у', 'ах', 'иях', 'ях', 'ы', 'ь', 'ию', 'ью', 'ю', 'ия', 'ья', 'я',
+)
+DERIVATIONAL = ('ост', 'ость')
+SUPERLATIVE = ('ейш', 'ейше')
+
+
+def _longest(word, endings):
+    found = [ending for ending in endings if word.endswith(ending)]
+    return max(found, key=len) if found else None
+
+
+def _strip(word, groups):
+    """Remove the longest ending of (preceded by а/я, any) groups."""
+    first, second = groups
+    ending = _longest(word, second)
+    preceded = _longest(word, first)
+    if preceded and (not ending or len(preceded) > len(ending)):
+        if word[:-len(preceded)][-1:] in ('а', 'я'):
+            return word[:-len(preceded)]
+    if ending:
+        return word[:-len(ending)]
+    return None
+
+
+def _region(word):
+    for position in range(1, len(word)):
+        if word[position - 1] in VOWELS and word[position] not in VOWELS:
+            return position + 1
+    return len(word)
+
+
+def _remove_inflection(rv):
+    stripped = _strip(rv, PERFECTIVE_GERUND)
+    if stripped is not None:
+        return stripped
+    reflexive = _longest(rv, REFLEXIVE)
+    if reflexive:
+        rv = rv[:-len(reflexive)]
+    adjective = _longest(rv, ADJECTIVE)
+    if adjective:
+        rv = rv[:-len(adjective)]
+        participle = _strip(rv, PARTICIPLE)
+        return rv if participle is None else participle
+    verb = _strip(rv, VERB)
+    if verb is not None:
+        return verb
+    noun = _longest(rv, NOUN)
+    return rv[:-len(noun)] if noun else rv
+
+
+def _undouble(rv):
+    if rv.endswith('нн'):
+        return rv[:-1]
+    superlative = _longest(rv, SUPERLATIVE)
+    if superlative:
+        rv = rv[:-len(superlative)]
+        return rv[:-1] if rv.endswith('нн') else rv
+    return rv[:-1] if rv.endswith('ь') else rv
+
+
+def stem(word):
+    """Compact Russian Snowball stemmer, as used by PostgreSQL FTS."""
+    word = word.lower().replace('ё', 'е')
+    start = next(
+        (position + 1 for position, letter in enumerate(word)
+         if letter in VOWELS),
+        None,
+    )
+    if start is None:
+        return word
+    head, rv = word[:start], word[start:]
+    r1 = _region(word)
+    r2 = r1 + _region(word[r1:]) if r1 < len(word) else len(word)
+
+    rv = _remove_inflection(rv)
+    if rv.endswith('и'):
+        rv = rv[:-1]
+    derivational = _longest(rv, DERIVATIONAL)
+    if derivational and len(head) + len(rv) - len(derivational) >= r2:
+        rv = rv[:-len(derivational)]
+    return head + _undouble(rv)
+
+
+def tokenize(text):
+    return TOKEN_RE.findall((text or '').lower())
+
+
+def search_vector():
+    return (
+        SearchVector('name', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('description', weight='B', config=SEARCH_CONFIG)
+    )
+
+
+def update_search_vectors(queryset):
+    """Refresh the stored tsvector of the titles on PostgreSQL.
+
+    On other databases the in-process index is dropped instead and built
+    again on the next search.
+    """
+    if connections[queryset.db].vendor != 'postgresql':
+        LocalSearchIndex.invalidate()
+        return 0
+    return queryset.order_by().update(search_vector=search_vector())
+
+
+class LocalSearchIndex:
+    """In-process inverted index of titles for databases without FTS.
+
+    Meant for SQLite test runs: every process builds it from the table on
+    the first search and drops it whenever a title changes.
+    """
+    _current = None
+    _lock = threading.Lock()
+
+    def __init__(self, rows):
+        postings = defaultdict(dict)
+        for pk, name, description in rows:
+            for weight, text in ((NAME_WEIGHT, name),
+                                 (DESCRIPTION_WEIGHT, description)):
+                for token in tokenize(text):
+                    scores = postings[stem(token)]
+                    scores[pk] = scores.get(pk, 0) + weight
+        self.postings = dict(postings)
+        self.terms = sorted(self.postings)
+
+    @classmethod
+    def get(cls, model):
+        with cls._lock:
+            if cls._current is None:
+                cls._current = cls(
+                    model.objects.values_list('pk', 'name', 'description')
+                    .iterator()
+                )
+            return cls._current
+
+    @classmethod
+    def invalidate(cls):
+        with cls._lock:
+            cls._current = None
+
+    def matches(self, token):
+        """Scores of titles having a term that starts with the stem."""
+        prefix = stem(token)
+        scores = defaultdict(float)
+        position = bisect.bisect_left(self.terms, prefix)
+        while (position < len(self.terms)
+               and self.terms[position].startswith(prefix)):
+            for pk, score in self.postings[self.terms[position]].items():
+                scores[pk] = max(scores[pk], score)
+            position += 1
+        return scores
+
+    def search(self, tokens):
+        """Primary keys matching every token, best ranked first."""
+        total = None
+        for token in tokens:
+            scores = self.matches(token)
+            if total is None:
+                total = scores
+            else:
+                total = {
+                    pk: score + scores[pk]
+                    for pk, score in total.items() if pk in scores
+                }
+        return sorted(total or {}, key=lambda pk: (-total[pk], pk))
+
+
+def search_titles(queryset, text):
+    """Filter titles by a full-text query with prefix matching, by rank."""
+    tokens = tokenize(text)
+    if not tokens:
+        return queryset
+    if connections[queryset.db].vendor == 'postgresql':
+        query = SearchQuery(
+            ' & '.join(f'{token}:*' for token in tokens),
+            config=SEARCH_CONFIG,
+            search_type='raw',
+        )
+        return (queryset
+                .filter(search_vector=query)
+                .annotate(rank=SearchRank(F('search_vector'), query))
+                .order_by('-rank', '-year', 'pk'))
+    ranked = LocalSearchIndex.get(queryset.model).search(tokens)
+    return (queryset
+            .filter(pk__in=ranked)
+            .order_by(Case(
+                *[When(pk=pk, then=position)
+                  for position, pk in enumerate(ranked)],
+                output_field=IntegerField(),
+            )))
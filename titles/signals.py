@@ -0,0 +1,117 @@
+import threading
+from contextlib import contextmanager
+
+from django.db.models.signals import (post_delete, post_init, post_save,
+                                      pre_delete)
+from django.dispatch import Signal, receiver
+
+from .models import Review, Title
+from .ratings import apply_rating_delta, rebuild_ratings
+from .search import LocalSearchIndex, update_search_vectors
+
+_state = threading.local()
+
+# Sent with ``instances`` after objects are written by bulk queries,
+# which don't send post_save.
+post_bulk_save = Signal()
+
+
+def _titles_being_deleted():
+    if not hasattr(_state, 'title_ids'):
+        _state.title_ids = set()
+    return _state.title_ids
+
+
+@contextmanager
+def deleting_titles():
+    """Forget the titles marked by pre_delete in the block, even if
+    the delete fails before their post_delete."""
+    title_ids = _titles_being_deleted()
+    marked = set(title_ids)
+    try:
+        yield
+    finally:
+        title_ids.intersection_update(marked)
+
+
+def _remember_score(review):
+    """Keep the persisted title and score to compute deltas on save.
+
+    Values are read from __dict__ so deferred fields are never loaded.
+    """
+    review._rating_snapshot = (
+        review.__dict__.get('title_id'),
+        review.__dict__.get('score'),
+    )
+
+
+def _rebuild_title(title_id):
+    rebuild_ratings(Title.objects.filter(pk=title_id))
+
+
+@receiver(post_init, sender=Review)
+def remember_review_score(sender, instance, **kwargs):
+    _remember_score(instance)
+
+
+@receiver(post_save, sender=Review)
+def add_review_score(sender, instance, created, raw=False, **kwargs):
+    """Apply a created or changed review to the title counters."""
+    if raw:
+        return
+    old_title_id, old_score = getattr(
+        instance, '_rating_snapshot', (None, None)
+    )
+    if created:
+        apply_rating_delta(Title, instance.title_id, instance.score, 1)
+    elif old_score is None:
+        _rebuild_title(instance.title_id)
+    elif old_title_id != instance.title_id:
+        apply_rating_delta(Title, old_title_id, -old_score, -1)
+        apply_rating_delta(Title, instance.title_id, instance.score, 1)
+    else:
+        apply_rating_delta(
+            Title, instance.title_id, instance.score - old_score, 0
+        )
+    _remember_score(instance)
+
+
+@receiver(post_delete, sender=Review)
+def remove_review_score(sender, instance, **kwargs):
+    """Withdraw a deleted review, including bulk and cascade deletes."""
+    title_id = instance.__dict__.get('title_id')
+    if title_id in _titles_being_deleted():
+        return
+    score = instance.__dict__.get('score')
+    if score is None:
+        _rebuild_title(title_id)
+        return
+    apply_rating_delta(Title, title_id, -score, -1)
+
+
+@receiver(pre_delete, sender=Title)
+def skip_deleted_title(sender, instance, **kwargs):
+    """Don't update the counters of a title removed with its reviews."""
+    _titles_being_deleted().add(instance.pk)
+
+
+@receiver(post_delete, sender=Title)
+def forget_deleted_title(sender, instance, **kwargs):
+    _titles_being_deleted().discard(instance.pk)
+    LocalSearchIndex.invalidate()
+
+
+@receiver(post_save, sender=Title)
+def index_title(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Keep the full-text search data of a saved title current."""
+    if raw or (update_fields is not None
+               and not {'name', 'description'} & set(update_fields)):
+        return
+    update_search_vectors(Title.objects.filter(pk=instance.pk))
+
+
+@receiver(post_bulk_save, sender=Title)
+def index_titles(sender, instances, **kwargs):
+    update_search_vectors(
+        Title.objects.filter(pk__in=[title.pk for title in instances])
+    )
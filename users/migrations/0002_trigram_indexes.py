@@ -0,0 +1,37 @@
+from django.db import migrations
+
+TRIGRAM_INDEXES = {
+    'users_username_trgm_idx': 'UPPER(username::text) gin_trgm_ops',
+    'users_email_trgm_idx': 'UPPER(email::text) gin_trgm_ops',
+    'users_username_similarity_idx': 'username gin_trgm_ops',
+}
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """pg_trgm GIN indexes for user search, PostgreSQL only."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, expression in TRIGRAM_INDEXES.items():
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} '
+            f'ON users_user USING gin ({expression})'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
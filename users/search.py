@@ -0,0 +1,55 @@
+from functools import reduce
+from operator import and_, or_
+
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import connections
+from django.db.models import Case, IntegerField, Q, Value, When
+
+from .models import Role
+
+
+def _term_condition(term, fields, fuzzy):
+    condition = reduce(or_, (
+        Q(**{f'{field}__icontains': term})
+        for field in fields if field != 'role'
+    ), Q(pk__in=[]))
+    if fuzzy and 'username' in fields:
+        condition |= Q(username__trigram_similar=term)
+    if 'role' in fields and term in Role.values:
+        condition |= Q(role=term)
+    return condition
+
+
+def search_users(queryset, terms, fields=('username',)):
+    """Find users whose fields contain every term, best matches first.
+
+    On PostgreSQL the substring lookups use the pg_trgm indexes of
+    username and email, usernames with a typo are found by trigram
+    similarity, and rows are ordered by that similarity. Elsewhere the
+    plain lookups are used and prefix matches come first.
+    """
+    terms = [term for term in terms if term]
+    if not terms:
+        return queryset
+    text_fields = [field for field in fields if field != 'role']
+    fuzzy = connections[queryset.db].vendor == 'postgresql'
+    queryset = queryset.filter(reduce(and_, (
+        _term_condition(term, fields, fuzzy) for term in terms
+    )))
+    if fuzzy:
+        return (queryset
+                .annotate(similarity=TrigramSimilarity(
+                    'username', ' '.join(terms)
+                ))
+                .order_by('-similarity', 'username'))
+    if not text_fields:
+        return queryset
+    return queryset.order_by(
+        Case(
+            When(**{f'{text_fields[0]}__istartswith': terms[0]},
+                 then=Value(0)),
+            default=Value(1),
+            output_field=IntegerField(),
+        ),
+        text_fields[0],
+    )